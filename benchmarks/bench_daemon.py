@@ -0,0 +1,96 @@
+"""Benchmarks for pydocstring.daemon.
+
+Run with `python benchmarks/bench_daemon.py` after installing pydocstring.
+
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+FUNCTION_TEMPLATE = '''
+def function{index}(x):
+    """Summary of the function {index}.
+
+    Parameters
+    ----------
+    x : int
+        Some parameter.
+
+    """
+'''
+
+CLIENT_SCRIPT = '''
+import sys
+import pydocstring.daemon
+sys.exit(pydocstring.daemon.client_main(sys.argv[1:]))
+'''
+
+SERVER_SCRIPT = '''
+import sys
+import pydocstring.daemon
+pydocstring.daemon.serve(sys.argv[1])
+'''
+
+
+def percentiles(times, points=(50, 90, 99)):
+    """Return the given percentiles (in ms) of the times (in seconds)."""
+    times = sorted(times)
+    return [1000 * times[min(len(times) - 1, len(times) * point // 100)] for point in points]
+
+
+def bench_round_trip(num_requests=200, num_processes=20, num_functions=20):
+    """Time the requests to the daemon and the client commands with and without the daemon.
+
+    Converted file is checked with `--nowrite`, so every request does the same work.
+    """
+    import pydocstring.daemon
+    print('Latency of a request for a file with {0} functions'.format(num_functions))
+    print('{0:<28}{1:>10}{2:>10}{3:>10}'.format('method', 'p50 (ms)', 'p90 (ms)', 'p99 (ms)'))
+    with tempfile.TemporaryDirectory() as dirname:
+        filename = os.path.join(dirname, 'bench_daemon_module.py')
+        with open(filename, 'w') as f:
+            f.write(''.join(FUNCTION_TEMPLATE.format(index=i) for i in range(num_functions)))
+        socket_path = os.path.join(dirname, 'daemon.sock')
+        argv = [filename, '--nowrite', '--cache-dir', os.path.join(dirname, 'cache')]
+        environ = dict(os.environ, PYDOCSTRING_SOCKET=socket_path)
+
+        def client_command():
+            subprocess.check_call([sys.executable, '-c', CLIENT_SCRIPT] + argv, env=environ,
+                                  stdout=subprocess.DEVNULL)
+
+        def timed(function, repeat):
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                function()
+                times.append(time.perf_counter() - start)
+            return times
+
+        rows = [('client command (no daemon)', timed(client_command, num_processes))]
+        server = subprocess.Popen([sys.executable, '-c', SERVER_SCRIPT, socket_path])
+        try:
+            while True:
+                try:
+                    pydocstring.daemon.request({'command': 'ping'}, socket_path=socket_path)
+                    break
+                except OSError:
+                    time.sleep(0.01)
+            rows.append(('client command (daemon)', timed(client_command, num_processes)))
+            rows.append(('round trip', timed(
+                lambda: pydocstring.daemon.request({'argv': argv, 'cwd': dirname},
+                                                   socket_path=socket_path),
+                num_requests
+            )))
+        finally:
+            pydocstring.daemon.request({'command': 'stop'}, socket_path=socket_path)
+            server.wait()
+        for label, times in rows:
+            print('{0:<28}{1:>10.2f}{2:>10.2f}{3:>10.2f}'.format(label, *percentiles(times)))
+    print()
+
+
+if __name__ == '__main__':
+    bench_round_trip()
@@ -0,0 +1,99 @@
+"""Benchmarks for pydocstring.docstring.
+
+Run with `python benchmarks/bench_docstring.py` after installing pydocstring.
+
+"""
+import copyreg
+import io
+import json
+import pickle
+import timeit
+from pydocstring.docstring import Docstring, TabbedInfo
+
+
+def make_docstring(num_entries=50):
+    """Return a Docstring instance with the given number of entries in each tabbed section."""
+    return Docstring(
+        summary='Summary of the object.',
+        extended=['Extended description of the object number {0}.'.format(i) for i in range(5)],
+        parameters=[{'name': 'param{0}'.format(i), 'types': ['int', 'float'],
+                     'descs': ['Description of the parameter.', 'Default is 0.']}
+                    for i in range(num_entries)],
+        methods=[{'name': 'method{0}'.format(i), 'signature': '(self, x, y)',
+                  'descs': 'Description of the method.'}
+                 for i in range(num_entries)],
+        returns={'name': 'output', 'types': 'int', 'descs': 'Returned value.'},
+        notes=['Some notes.'],
+    )
+
+
+class DefaultPickler(pickle.Pickler):
+    """Pickler that ignores the custom reduction of Docstring and TabbedInfo."""
+    def reducer_override(self, obj):
+        if isinstance(obj, (Docstring, TabbedInfo)):
+            return (copyreg.__newobj__, (type(obj),), obj.__dict__)
+        return NotImplemented
+
+
+def default_pickle(obj):
+    """Pickle the object without the custom reduction."""
+    stream = io.BytesIO()
+    DefaultPickler(stream, pickle.HIGHEST_PROTOCOL).dump(obj)
+    return stream.getvalue()
+
+
+def bench(stmt, number):
+    """Return the time per call (in microseconds)."""
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def bench_serialization(num_entries=50, number=200):
+    """Compare encoding/decoding throughput and payload size of the serialization methods."""
+    doc = make_docstring(num_entries)
+    methods = {
+        'to_bytes': (doc.to_bytes, Docstring.from_bytes),
+        'pickle (compact)': (lambda: pickle.dumps(doc, pickle.HIGHEST_PROTOCOL), pickle.loads),
+        'pickle (default)': (lambda: default_pickle(doc), pickle.loads),
+        'json (to_dict)': (lambda: json.dumps(doc.to_dict()),
+                           lambda data: Docstring.from_dict(json.loads(data))),
+    }
+    print('Serialization of Docstring with {0} entries per section'.format(num_entries))
+    print('{0:<20}{1:>12}{2:>14}{3:>14}'.format('method', 'size (B)', 'encode (us)',
+                                                 'decode (us)'))
+    for name, (encode, decode) in methods.items():
+        data = encode()
+        print('{0:<20}{1:>12}{2:>14.1f}{3:>14.1f}'.format(name, len(data),
+                                                           bench(encode, number),
+                                                           bench(lambda: decode(data), number)))
+
+
+def bench_lookup(num_entries=5000, number=5):
+    """Compare looking up every entry of a section by scanning and by Docstring.get_entry."""
+    doc = make_docstring(num_entries)
+    names = ['param{0}'.format(i) for i in range(num_entries)]
+
+    def scan():
+        for name in names:
+            next(entry for entry in doc.info['parameters'] if entry.name == name)
+
+    def index():
+        for name in names:
+            doc.get_entry('parameters', name)
+
+    other = make_docstring(num_entries)
+
+    def inherit():
+        Docstring(parameters=list(doc.info['parameters'])).inherit(other)
+
+    print('Lookup of {0} entries in a section with {0} entries'.format(num_entries))
+    print('{0:<20}{1:>14}'.format('method', 'time (ms)'))
+    print('{0:<20}{1:>14.2f}'.format('linear scan', bench(scan, 1) / 1e3))
+    print('{0:<20}{1:>14.2f}'.format('get_entry', bench(index, number) / 1e3))
+    print('{0:<20}{1:>14.2f}'.format('inherit', bench(inherit, number) / 1e3))
+
+
+if __name__ == '__main__':
+    bench_serialization(num_entries=5)
+    bench_serialization(num_entries=500, number=20)
+    bench_lookup(num_entries=1000)
+    bench_lookup(num_entries=5000)
@@ -0,0 +1,381 @@
+"""Benchmarks for pydocstring.scripts.
+
+Run with `python benchmarks/bench_scripts.py` after installing pydocstring.
+
+"""
+import contextlib
+import io
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+
+FUNCTION_TEMPLATE = '''
+def function{index}(x, y=1):
+    """Summary of the function {index}.
+
+    Parameters
+    ----------
+    x : int
+        Some parameter.
+    y : int
+        Another parameter.
+
+    Returns
+    -------
+    z : int
+        Some value.
+    """
+    # add the parameters
+    z = x + y
+    return z
+
+'''
+
+
+def replace_docstrings_regex(filename, width=100, tabsize=4):
+    """Return the code of the file with its numpy docstrings (previous implementation).
+
+    Each docstring is searched and substituted with a regular expression over the whole file.
+    """
+    import pydocstring.docstring
+    import pydocstring.numpy_docstring
+    from pydocstring.scripts.pydocstring_to_instance import extract_docstring
+    with open(filename, 'r') as f:
+        code = f.read()
+    for old in extract_docstring(filename):
+        doc_instance = pydocstring.docstring.Docstring(
+            **pydocstring.numpy_docstring.parse_numpy(old)
+        )
+        re_old = r'( *)(r)?([\'"]+{0}\s*[\'"]+)'.format(re.escape(old))
+        details = re.search(re_old, code)
+        new = doc_instance.make_numpy(width=width, indent_level=len(details.group(1)) // tabsize,
+                                      tabsize=tabsize, is_raw=details.group(2) == 'r')
+        code = re.sub(re_old, new, code)
+    return code
+
+
+def replace_docstrings_splice(filename):
+    """Return the code of the file with its docstrings in the numpy format."""
+    from pydocstring.scripts.pydocstring_to_instance import replace_docstrings
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        replace_docstrings(filename, 'numpy', write=False)
+    return output.getvalue()
+
+
+def bench_replace_docstrings(num_functions=1000):
+    """Time the conversion of the docstrings of a file with many functions."""
+    with tempfile.TemporaryDirectory() as dirname:
+        filename = os.path.join(dirname, 'bench_replace.py')
+        with open(filename, 'w') as f:
+            f.write(''.join(FUNCTION_TEMPLATE.format(index=i) for i in range(num_functions)))
+        with open(filename) as f:
+            num_lines = len(f.readlines())
+        print('Conversion of a file with {0} lines and {1} docstrings'.format(num_lines,
+                                                                             num_functions))
+        print('{0:<12}{1:>12}'.format('method', 'time (ms)'))
+        for label, function in [('regex', replace_docstrings_regex),
+                                ('splice', replace_docstrings_splice)]:
+            start = time.perf_counter()
+            function(filename)
+            print('{0:<12}{1:>12.1f}'.format(label, 1000 * (time.perf_counter() - start)))
+    print()
+
+
+def bench_convert_files(num_files=200, max_functions=40, jobs=(1, 2, 4)):
+    """Time the conversion of a directory of files of different sizes with different workers."""
+    from pydocstring.scripts.pydocstring_to_instance import convert_files, find_files, summarize
+    print('Conversion of a directory with {0} files'.format(num_files))
+    print('{0:<6}{1:>12}  {2}'.format('jobs', 'time (ms)', 'summary'))
+    with tempfile.TemporaryDirectory() as dirname:
+        for i in range(num_files):
+            with open(os.path.join(dirname, 'module{0}.py'.format(i)), 'w') as f:
+                f.write(''.join(FUNCTION_TEMPLATE.format(index=j)
+                                for j in range(1 + i % max_functions)))
+        filenames = find_files([dirname])
+        for num_jobs in jobs:
+            start = time.perf_counter()
+            results = convert_files(filenames, 'numpy', write=False, jobs=num_jobs)
+            elapsed = time.perf_counter() - start
+            print('{0:<6}{1:>12.1f}  {2}'.format(num_jobs, 1000 * elapsed,
+                                                 summarize(results, elapsed)))
+    print()
+
+
+def bench_cache(num_files=200, max_functions=40):
+    """Time the conversion of a directory with the cache of the conversions, cold and warm."""
+    import pydocstring.cache
+    from pydocstring.scripts.pydocstring_to_instance import convert_files, find_files, summarize
+    print('Conversion of a directory with {0} files with the cache'.format(num_files))
+    print('{0:<10}{1:>12}  {2}'.format('run', 'time (ms)', 'summary'))
+    with tempfile.TemporaryDirectory() as dirname:
+        for i in range(num_files):
+            with open(os.path.join(dirname, 'module{0}.py'.format(i)), 'w') as f:
+                f.write(''.join(FUNCTION_TEMPLATE.format(index=j)
+                                for j in range(1 + i % max_functions)))
+        filenames = find_files([dirname])
+        cache_dir = os.path.join(dirname, 'cache')
+        for label in ['first', 'second', 'third']:
+            start = time.perf_counter()
+            cache = pydocstring.cache.ConversionCache(cache_dir)
+            results = convert_files(filenames, 'numpy', cache=cache)
+            cache.save()
+            elapsed = time.perf_counter() - start
+            print('{0:<10}{1:>12.1f}  {2}'.format(label, 1000 * elapsed,
+                                                  summarize(results, elapsed)))
+    print()
+
+
+def bench_check(num_files=200, max_functions=40):
+    """Time the check of the docstrings of a directory, with dirty and clean files."""
+    import pydocstring.cache
+    from pydocstring.scripts.pydocstring_to_instance import check_files, convert_files, find_files
+    print('Check of a directory with {0} files'.format(num_files))
+    print('{0:<36}{1:>12}{2:>14}'.format('tree and method', 'time (ms)', 'differences'))
+    with tempfile.TemporaryDirectory() as dirname:
+        for i in range(num_files):
+            with open(os.path.join(dirname, 'module{0}.py'.format(i)), 'w') as f:
+                f.write(''.join(FUNCTION_TEMPLATE.format(index=j)
+                                for j in range(1 + i % max_functions)))
+        filenames = find_files([dirname])
+        cache = pydocstring.cache.ConversionCache(os.path.join(dirname, 'cache'))
+
+        def run(label, function):
+            start = time.perf_counter()
+            results = function()
+            elapsed = time.perf_counter() - start
+            num_differences = sum(len(result.get('differences', [])) for result in results)
+            print('{0:<36}{1:>12.1f}{2:>14}'.format(label, 1000 * elapsed, num_differences))
+
+        run('dirty, convert without writing',
+            lambda: convert_files(filenames, 'numpy', write=False))
+        run('dirty, check (first difference)',
+            lambda: check_files(filenames, 'numpy', max_differences=1))
+        run('dirty, check (all differences)', lambda: check_files(filenames, 'numpy'))
+        convert_files(filenames, 'numpy')
+        run('clean, check', lambda: check_files(filenames, 'numpy'))
+        run('clean, check (cold cache)', lambda: check_files(filenames, 'numpy', cache=cache))
+        run('clean, check (warm cache)', lambda: check_files(filenames, 'numpy', cache=cache))
+    print()
+
+
+def bench_changed(sizes=(50, 200, 800), max_functions=40):
+    """Time the check of a repository with one changed docstring, with and without `--changed`."""
+    from pydocstring.scripts.pydocstring_to_instance import main
+    print('Check of a git repository with one changed docstring')
+    print('{0:<8}{1:>16}{2:>16}'.format('files', 'all (ms)', 'changed (ms)'))
+    for num_files in sizes:
+        with tempfile.TemporaryDirectory() as dirname:
+            for i in range(num_files):
+                with open(os.path.join(dirname, 'module{0}.py'.format(i)), 'w') as f:
+                    f.write(''.join(FUNCTION_TEMPLATE.format(index=j)
+                                    for j in range(1 + i % max_functions)))
+            for args in [['init', '-q'], ['add', '.'], ['commit', '-q', '-m', 'Initial commit']]:
+                subprocess.check_output(['git', '-c', 'user.name=Bench', '-c',
+                                         'user.email=bench@example.com'] + args, cwd=dirname)
+            filename = os.path.join(dirname, 'module0.py')
+            with open(filename) as f:
+                code = f.read()
+            with open(filename, 'w') as f:
+                f.write(code.replace('Summary of the function 0.', 'Summary of the function.'))
+
+            times = []
+            cwd = os.getcwd()
+            try:
+                os.chdir(dirname)
+                for argv in [['.'], ['--changed']]:
+                    start = time.perf_counter()
+                    with contextlib.redirect_stdout(io.StringIO()), \
+                            contextlib.redirect_stderr(io.StringIO()):
+                        main(argv + ['--check', '--max-differences', '0', '--no-cache'])
+                    times.append(time.perf_counter() - start)
+            finally:
+                os.chdir(cwd)
+        print('{0:<8}{1:>16.1f}{2:>16.1f}'.format(num_files, *[1000 * t for t in times]))
+    print()
+
+
+def bench_report(num_files=200, max_functions=40, repeat=5):
+    """Break down the conversion of a directory into its stages, and time the timers themselves."""
+    from pydocstring.scripts.pydocstring_to_instance import (
+        STAGES, convert_files, find_files, report
+    )
+    print('Stages of the conversion of a directory with {0} files'.format(num_files))
+    with tempfile.TemporaryDirectory() as dirname:
+        for i in range(num_files):
+            with open(os.path.join(dirname, 'module{0}.py'.format(i)), 'w') as f:
+                f.write(''.join(FUNCTION_TEMPLATE.format(index=j)
+                                for j in range(1 + i % max_functions)))
+        filenames = find_files([dirname])
+        start = time.perf_counter()
+        results = convert_files(filenames, 'numpy', write=False)
+        elapsed = time.perf_counter() - start
+    totals = report(results, elapsed)['totals']
+    print('{0:<10}{1:>12}{2:>10}'.format('stage', 'time (ms)', 'share'))
+    for stage in STAGES + ('total',):
+        stage_time = totals['times'][stage]
+        print('{0:<10}{1:>12.1f}{2:>9.1f}%'.format(stage, 1000 * stage_time,
+                                                  100 * stage_time / totals['times']['total']))
+    # each file calls the timer about 10 times, and each docstring 3 times
+    num_calls = 10 * totals['files'] + 3 * totals['docstrings']
+    timer = min(timeit.repeat(time.perf_counter, number=num_calls, repeat=repeat))
+    print('{0} calls of the timer take {1:.2f} ms ({2:.3f}% of the conversion)'.format(
+        num_calls, 1000 * timer, 100 * timer / elapsed
+    ))
+    print()
+
+
+MESSAGE_TEMPLATE = '''
+class Message{index}:
+    """Message {index} of the protocol.
+
+    Parameters
+    ----------
+    field : int
+        Some field.
+    """
+    field = {index}
+'''
+
+
+def bench_stream(sizes=(2000, 8000, 32000)):
+    """Compare the conversion of a large generated module in memory and memory-mapped.
+
+    Peak memory is the peak of the memory that is allocated by Python (with `tracemalloc`), in a
+    separate run from the timed one.
+    """
+    import shutil
+    import tracemalloc
+    from pydocstring.scripts.pydocstring_to_instance import convert_file
+    print('Conversion of a large module, in memory and streamed')
+    print('{0:>10}{1:>10}{2:>12}{3:>12}'.format('size (MB)', 'stream', 'time (s)', 'peak (MB)'))
+    with tempfile.TemporaryDirectory() as dirname:
+        original = os.path.join(dirname, 'original.py')
+        filename = os.path.join(dirname, 'messages.py')
+        for num_messages in sizes:
+            with open(original, 'w') as f:
+                f.write(''.join(MESSAGE_TEMPLATE.format(index=i) for i in range(num_messages)))
+            for stream in [False, True]:
+                shutil.copyfile(original, filename)
+                start = time.perf_counter()
+                convert_file(filename, 'numpy', stream=stream)
+                elapsed = time.perf_counter() - start
+                shutil.copyfile(original, filename)
+                tracemalloc.start()
+                convert_file(filename, 'numpy', stream=stream)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print('{0:>10.1f}{1:>10}{2:>12.2f}{3:>12.2f}'.format(
+                    os.path.getsize(original) / 1e6, str(stream), elapsed, peak / 1e6
+                ))
+    print()
+
+
+def bench_shard(num_files=1000, counts=(2, 4, 8, 16)):
+    """Compare the balance of the shards by size with the balance of the shards by count."""
+    import random
+    from pydocstring.scripts.pydocstring_to_instance import shard_files
+    print('Shards of {0} files of skewed sizes (largest shard / average shard)'.format(num_files))
+    print('{0:>8}{1:>12}{2:>12}'.format('shards', 'by count', 'by size'))
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as dirname:
+        filenames = []
+        for i in range(num_files):
+            filenames.append(os.path.join(dirname, 'module{0}.py'.format(i)))
+            with open(filenames[-1], 'w') as f:
+                f.write('x = 1\n' * int(rng.paretovariate(1.2) * 20))
+        sizes = {filename: os.path.getsize(filename) for filename in filenames}
+        for count in counts:
+            by_count = [sum(sizes[filename] for filename in filenames[i::count])
+                        for i in range(count)]
+            by_size = [sum(sizes[filename] for filename in shard_files(filenames, i, count))
+                       for i in range(1, count + 1)]
+            print('{0:>8}{1:>12.2f}{2:>12.2f}'.format(count, max(by_count) * count / sum(by_count),
+                                                      max(by_size) * count / sum(by_size)))
+    print()
+
+
+def bench_checkpoint(num_files=200, max_functions=40):
+    """Time a run with a checkpoint manifest, a run that resumes after a crash, and a finished run.
+    """
+    import shutil
+    import pydocstring.checkpoint
+    from pydocstring.scripts.pydocstring_to_instance import convert_files, find_files
+    print('Conversion of a directory with {0} files with a checkpoint'.format(num_files))
+    print('{0:<36}{1:>12}{2:>10}'.format('run', 'time (ms)', 'skipped'))
+    with tempfile.TemporaryDirectory() as dirname:
+        source_dirname = os.path.join(dirname, 'source')
+        os.mkdir(source_dirname)
+        for i in range(num_files):
+            with open(os.path.join(source_dirname, 'module{0}.py'.format(i)), 'w') as f:
+                f.write(''.join(FUNCTION_TEMPLATE.format(index=j)
+                                for j in range(1 + i % max_functions)))
+        tree = os.path.join(dirname, 'tree')
+        path = os.path.join(dirname, 'checkpoint.jsonl')
+
+        def run(label, resume, record=True, crash=None):
+            checkpoint = pydocstring.checkpoint.Checkpoint(path, resume=resume, format='numpy',
+                                                           width=100, tabsize=4)
+            filenames = find_files([tree])
+            if crash is not None:
+                # files after the crash are neither converted nor recorded
+                filenames = filenames[:crash]
+            start = time.perf_counter()
+            results = convert_files(filenames, 'numpy',
+                                    checkpoint=checkpoint if record else None)
+            elapsed = time.perf_counter() - start
+            print('{0:<36}{1:>12.1f}{2:>10}'.format(label, 1000 * elapsed,
+                                                    sum(result['cached'] for result in results)))
+
+        for record in [False, True]:
+            shutil.rmtree(tree, ignore_errors=True)
+            shutil.copytree(source_dirname, tree)
+            run('full run, checkpoint={0}'.format(record), False, record=record)
+        shutil.rmtree(tree)
+        shutil.copytree(source_dirname, tree)
+        run('crash after half of the files', False, crash=num_files // 2)
+        run('resumed run', True)
+        run('resumed run, all files done', True)
+    print()
+
+
+def bench_filter(num_functions=(10, 100, 1000), repeat=5):
+    """Time the conversion of the standard input to the standard output, for each editor save.
+    """
+    from pydocstring.scripts.pydocstring_to_instance import convert_stream
+    print('Conversion of a module from the standard input to the standard output')
+    print('{0:>10}{1:>14}{2:>20}'.format('functions', 'stream (ms)', 'subprocess (ms)'))
+    script = ('import sys\nfrom pydocstring.scripts.pydocstring_to_instance import main\n'
+              'sys.exit(main(sys.argv[1:]))\n')
+    for num in num_functions:
+        source = ''.join(FUNCTION_TEMPLATE.format(index=i) for i in range(num)).encode()
+        stream = min(timeit.repeat(
+            lambda: convert_stream(io.BytesIO(source), io.BytesIO(), 'numpy'), number=1,
+            repeat=repeat
+        ))
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', script, '-'], input=source,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            times.append(time.perf_counter() - start)
+        print('{0:>10}{1:>14.1f}{2:>20.1f}'.format(num, 1000 * stream, 1000 * min(times)))
+    print()
+
+
+if __name__ == '__main__':
+    bench_replace_docstrings()
+    bench_convert_files()
+    bench_cache()
+    bench_check()
+    bench_changed()
+    bench_report()
+    bench_stream()
+    bench_shard()
+    bench_checkpoint()
+    bench_filter()
@@ -0,0 +1,77 @@
+"""Benchmarks for pydocstring.source.
+
+Run with `python benchmarks/bench_source.py` after installing pydocstring.
+
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+
+HEAVY_IMPORTS = '''
+import asyncio
+import concurrent.futures
+import decimal
+import email.mime.multipart
+import http.server
+import logging.handlers
+import multiprocessing
+import sqlite3
+import unittest
+import xml.dom.minidom
+'''
+
+FUNCTION_TEMPLATE = '''
+def function{index}(x, y=1):
+    """Summary of the function {index}.
+
+    Parameters
+    ----------
+    x : int
+        Some parameter.
+    y : int
+        Another parameter.
+
+    Returns
+    -------
+    z : int
+        Some value.
+    """
+'''
+
+EXTRACT_SCRIPT = '''
+import sys
+import time
+start = time.perf_counter()
+from pydocstring.scripts.pydocstring_to_instance import extract_docstring
+docstrings = extract_docstring(sys.argv[1], static=sys.argv[2] == 'static')
+print(time.perf_counter() - start, len(docstrings))
+'''
+
+
+def bench_extract(num_functions=200, repeat=3):
+    """Compare the static and the import-based extraction of the docstrings of a file.
+
+    Each extraction is run in a fresh interpreter so that the imports of the file are not cached.
+    """
+    print('Docstrings of a file with heavy imports and {0} functions'.format(num_functions))
+    print('{0:<10}{1:>12}{2:>12}'.format('method', 'time (ms)', 'docstrings'))
+    with tempfile.TemporaryDirectory() as dirname:
+        filename = os.path.join(dirname, 'bench_heavy.py')
+        with open(filename, 'w') as f:
+            f.write('"""Module with heavy imports."""' + HEAVY_IMPORTS)
+            f.write(''.join(FUNCTION_TEMPLATE.format(index=i) for i in range(num_functions)))
+        for method in ['import', 'static']:
+            times = []
+            for _ in range(repeat):
+                output = subprocess.check_output([sys.executable, '-c', EXTRACT_SCRIPT, filename,
+                                                  method], universal_newlines=True)
+                elapsed, num_docstrings = output.split()
+                times.append(float(elapsed))
+            print('{0:<10}{1:>12.1f}{2:>12}'.format(method, 1000 * min(times), num_docstrings))
+    print()
+
+
+if __name__ == '__main__':
+    bench_extract()
@@ -0,0 +1,90 @@
+"""Benchmarks for pydocstring.utils.
+
+Run with `python benchmarks/bench_utils.py` after installing pydocstring.
+
+"""
+import contextlib
+import importlib
+import inspect
+import os
+import sys
+import tempfile
+import time
+
+
+FUNCTION_TEMPLATE = '''
+def function{index}(x):
+    """Summary of the function {index}."""
+'''
+
+
+@contextlib.contextmanager
+def count_stats():
+    """Count the calls to os.stat and os.lstat (i.e. stat system calls) inside the context."""
+    counts = {'stat': 0}
+    stat, lstat = os.stat, os.lstat
+
+    def counted_stat(*args, **kwargs):
+        counts['stat'] += 1
+        return stat(*args, **kwargs)
+
+    def counted_lstat(*args, **kwargs):
+        counts['stat'] += 1
+        return lstat(*args, **kwargs)
+
+    os.stat, os.lstat = counted_stat, counted_lstat
+    try:
+        yield counts
+    finally:
+        os.stat, os.lstat = stat, lstat
+
+
+def extract_members_samefile(module):
+    """Return the members of the module that are defined in its file (previous implementation).
+
+    Source file of each member is found with `inspect.getsourcefile` and compared with
+    `os.path.samefile`.
+    """
+    filename = inspect.getsourcefile(module)
+    output = {}
+    for name, member in inspect.getmembers(module):
+        try:
+            sourcefile = inspect.getsourcefile(member)
+        except TypeError:
+            continue
+        if os.path.samefile(sourcefile, filename):
+            output[name] = member
+    return output
+
+
+def bench_extract_members(num_members=5000):
+    """Time extract_members on a module with many functions and count the stat system calls."""
+    import pydocstring.utils
+    print('Members of a module with {0} functions'.format(num_members))
+    print('{0:<24}{1:>12}{2:>12}{3:>10}'.format('implementation', 'time (ms)', 'stat calls',
+                                                'members'))
+    source = ''.join(FUNCTION_TEMPLATE.format(index=i) for i in range(num_members))
+    with tempfile.TemporaryDirectory() as dirname:
+        with open(os.path.join(dirname, 'bench_members.py'), 'w') as f:
+            f.write(source)
+        sys.path.insert(0, dirname)
+        try:
+            module = importlib.import_module('bench_members')
+            pydocstring.utils._sourcefiles.clear()
+            for label, function in [('samefile', extract_members_samefile),
+                                    ('cached (cold)', pydocstring.utils.extract_members),
+                                    ('cached (warm)', pydocstring.utils.extract_members)]:
+                with count_stats() as counts:
+                    start = time.perf_counter()
+                    members = function(module)
+                    elapsed = time.perf_counter() - start
+                print('{0:<24}{1:>12.1f}{2:>12}{3:>10}'.format(label, 1000 * elapsed,
+                                                               counts['stat'], len(members)))
+        finally:
+            sys.path.remove(dirname)
+            sys.modules.pop('bench_members', None)
+    print()
+
+
+if __name__ == '__main__':
+    bench_extract_members()
@@ -0,0 +1,282 @@
+"""Benchmarks for pydocstring.wrapper.
+
+Run with `python benchmarks/bench_wrapper.py` after installing pydocstring.
+
+"""
+import contextlib
+import importlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+CLASS_TEMPLATE = '''
+@pydocstring.wrapper.docstring_class{options}
+class Class{index}({parent}):
+    """Summary of class {index}.
+
+    Extended description of the class.
+
+    Attributes
+    ----------
+    attr : int
+        Some attribute.
+    """
+{methods}
+'''
+
+METHOD_TEMPLATE = '''
+    def method{index}(self, x, y=1):
+        """Summary of the method {index}.
+
+        Parameters
+        ----------
+        x : int
+            Some parameter.
+        y : {{int, float}}
+            Another parameter.
+
+        Returns
+        -------
+        z : int
+            Some value.
+        """
+'''
+
+
+def make_module(num_classes=50, num_methods=10, options=''):
+    """Return the source code of a module with decorated classes.
+
+    Every fifth class is a subclass of the previous class.
+    """
+    methods = ''.join(METHOD_TEMPLATE.format(index=i) for i in range(num_methods))
+    classes = [CLASS_TEMPLATE.format(index=i, methods=methods, options=options,
+                                     parent='Class{0}'.format(i - 1) if i % 5 else 'object')
+               for i in range(num_classes)]
+    return 'import pydocstring.wrapper\n' + ''.join(classes)
+
+
+def import_source(dirname, name, source):
+    """Write the source code to a module and return the time needed to import it (in seconds)."""
+    with open(os.path.join(dirname, name + '.py'), 'w') as f:
+        f.write(source)
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    return module, time.perf_counter() - start
+
+
+def bench_import(num_classes=50, num_methods=10):
+    """Compare the import time of a module decorated in the eager and the lazy modes."""
+    print('Import of a module with {0} classes with {1} methods'.format(num_classes, num_methods))
+    print('{0:<10}{1:>14}{2:>22}'.format('mode', 'import (ms)', 'read all __doc__ (ms)'))
+    with tempfile.TemporaryDirectory() as dirname, open(os.devnull, 'w') as devnull:
+        sys.path.insert(0, dirname)
+        try:
+            for mode, options in [('eager', ''), ('lazy', '(lazy=True)')]:
+                name = 'bench_import_{0}'.format(mode)
+                source = make_module(num_classes, num_methods, options)
+                # NOTE: differences between the original and generated docstrings are printed
+                with contextlib.redirect_stdout(devnull):
+                    module, import_time = import_source(dirname, name, source)
+                    start = time.perf_counter()
+                    for i in range(num_classes):
+                        getattr(module, 'Class{0}'.format(i)).__doc__
+                    read_time = time.perf_counter() - start
+                print('{0:<10}{1:>14.1f}{2:>22.1f}'.format(mode, import_time * 1e3,
+                                                           read_time * 1e3))
+        finally:
+            sys.path.remove(dirname)
+
+
+NESTED_TEMPLATE = '''
+class Outer{index}:
+    """Summary of the outer class {index}.
+
+    Extended description.
+    """
+{methods}
+    class Middle:
+        """Summary of the middle class."""
+{inner_methods}
+        class Inner:
+            """Summary of the inner class."""
+{innermost_methods}
+'''
+
+
+def bench_recursive(num_classes=20, num_methods=5):
+    """Time docstring_recursive on a module with nested classes and count the processed objects."""
+    import pydocstring.wrapper
+
+    def indent(text, level):
+        return '\n'.join(('    ' * level + line) if line else line for line in text.split('\n'))
+
+    methods = ''.join(METHOD_TEMPLATE.format(index=i) for i in range(num_methods))
+    source = ''.join(NESTED_TEMPLATE.format(index=i, methods=methods,
+                                            inner_methods=indent(methods, 1),
+                                            innermost_methods=indent(methods, 2))
+                     for i in range(num_classes))
+    print('docstring_recursive on a module with {0} classes with 2 levels of nested classes and '
+          '{1} methods per class'.format(num_classes, num_methods))
+    with tempfile.TemporaryDirectory() as dirname, open(os.devnull, 'w') as devnull:
+        sys.path.insert(0, dirname)
+        try:
+            module, _ = import_source(dirname, 'bench_recursive_module', source)
+            pydocstring.wrapper.reset_stats()
+            with contextlib.redirect_stdout(devnull):
+                start = time.perf_counter()
+                pydocstring.wrapper.docstring_recursive(module)
+                total_time = time.perf_counter() - start
+        finally:
+            sys.path.remove(dirname)
+    stats = pydocstring.wrapper.get_stats()
+    print('{0:<12}{1:>12}{2:>12}'.format('time (ms)', 'processed', 'skipped'))
+    print('{0:<12.1f}{1:>12}{2:>12}'.format(total_time * 1e3, stats['processed'],
+                                            stats['skipped']))
+
+
+HIERARCHY_TEMPLATE = '''
+@pydocstring.wrapper.docstring_class
+class Class{index}({parent}):
+    """Summary of class {index}.
+
+    Extended description of the class.
+    """
+{methods}
+    @property
+    def prop{level}(self):
+        """Summary of the property.
+
+        Returns
+        -------
+        int
+        """
+'''
+
+OVERRIDE_TEMPLATE = '''
+    def method{index}(self, x, y=1):
+        """Summary of the overridden method {index}."""
+'''
+
+
+def make_hierarchy(level_sizes=(8, 16, 32, 64, 80), num_methods=10):
+    """Return the source code of a module with a hierarchy of decorated classes.
+
+    The classes of each level inherit from the classes of the previous level. Each class overrides
+    one of the methods of its parent (with a docstring that only has the summary).
+    """
+    methods = ''.join(METHOD_TEMPLATE.format(index=i) for i in range(num_methods))
+    source = 'import pydocstring.wrapper\n'
+    index = 0
+    previous = []
+    for level, size in enumerate(level_sizes):
+        current = []
+        for i in range(size):
+            if previous:
+                parent = previous[i % len(previous)]
+                body = OVERRIDE_TEMPLATE.format(index=level % num_methods)
+            else:
+                parent = 'object'
+                body = methods
+            source += HIERARCHY_TEMPLATE.format(index=index, parent=parent, methods=body,
+                                                level=level)
+            current.append('Class{0}'.format(index))
+            index += 1
+        previous = current
+    return source
+
+
+def bench_hierarchy(level_sizes=(8, 16, 32, 64, 80), num_methods=10):
+    """Time the import of a module with a hierarchy of classes decorated with docstring_class."""
+    import pydocstring.wrapper
+    print('Import of a module with a {0}-level hierarchy of {1} classes'
+          ''.format(len(level_sizes), sum(level_sizes)))
+    with tempfile.TemporaryDirectory() as dirname:
+        sys.path.insert(0, dirname)
+        pydocstring.wrapper.configure(verify='off')
+        pydocstring.wrapper.reset_stats()
+        try:
+            _, import_time = import_source(dirname, 'bench_hierarchy_module',
+                                           make_hierarchy(level_sizes, num_methods))
+        finally:
+            pydocstring.wrapper.configure(verify='diff')
+            sys.path.remove(dirname)
+    stats = pydocstring.wrapper.get_stats()
+    print('{0:<12}{1:>12}{2:>12}'.format('time (ms)', 'processed', 'skipped'))
+    print('{0:<12.1f}{1:>12}{2:>12}'.format(import_time * 1e3, stats['processed'],
+                                            stats['skipped']))
+
+
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+import pydocstring.wrapper
+pydocstring.wrapper.configure(cache=True, verify='off')
+import {name}
+print(time.perf_counter() - start)
+"""
+
+
+def bench_cache(num_classes=50, num_methods=10, repeat=3):
+    """Compare the startup time of fresh interpreters without and with the on-disk cache."""
+    print('Startup with a module with {0} classes with {1} methods'.format(num_classes,
+                                                                          num_methods))
+    print('{0:<10}{1:>14}'.format('cache', 'import (ms)'))
+    with tempfile.TemporaryDirectory() as dirname:
+        name = 'bench_cache_module'
+        with open(os.path.join(dirname, name + '.py'), 'w') as f:
+            f.write(make_module(num_classes, num_methods))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([dirname] + sys.path)
+
+        def run():
+            output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT.format(name=name)],
+                                    env=env, check=True, stdout=subprocess.PIPE)
+            return float(output.stdout.decode().split()[-1])
+
+        cold = []
+        for _ in range(repeat):
+            pycache = os.path.join(dirname, '__pycache__')
+            for filename in os.listdir(pycache) if os.path.isdir(pycache) else []:
+                if filename.endswith('.cache'):
+                    os.remove(os.path.join(pycache, filename))
+            cold.append(run())
+        warm = [run() for _ in range(repeat)]
+        print('{0:<10}{1:>14.1f}'.format('cold', min(cold) * 1e3))
+        print('{0:<10}{1:>14.1f}'.format('warm', min(warm) * 1e3))
+
+
+def bench_member_table(sizes=(500, 1000, 2000, 4000), repeat=3):
+    """Time the tables of the members of classes with more and more members."""
+    import pydocstring.docstring
+    import pydocstring.wrapper
+    print('Tables of the members of a class')
+    print('{0:<10}{1:>12}{2:>18}'.format('members', 'time (ms)', 'per member (us)'))
+    for size in sizes:
+        members = {}
+        records = {}
+        for i in range(size):
+            name = 'f{0}'.format(i)
+
+            def member(self):
+                pass
+
+            members[name] = member
+            records[name] = (member, pydocstring.docstring.Docstring(summary=name), '(self)')
+        obj = type('A', (), members)
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            pydocstring.wrapper._member_table(obj, members, records)
+            best = min(best, time.perf_counter() - start)
+        print('{0:<10}{1:>12.2f}{2:>18.2f}'.format(size, best * 1e3, best / size * 1e6))
+
+
+if __name__ == '__main__':
+    bench_import()
+    bench_cache()
+    bench_recursive()
+    bench_hierarchy()
+    bench_member_table()
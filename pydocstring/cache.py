@@ -0,0 +1,465 @@
+"""On-disk caches of the docstrings generated by pydocstring.
+
+Similar to `__pycache__`, the generated docstrings of the objects in a module (by the decorators in
+pydocstring.wrapper) are stored in a file next to the module,
+`__pycache__/{module}.pydocstring-{version}.cache`. The cache of a module is discarded if the
+source code of the module or the version of pydocstring changes.
+
+Conversions of files (by pydocstring.scripts.pydocstring_to_instance) are stored in a user-level
+cache directory, keyed by the contents of the file (see `ConversionCache`).
+
+Methods
+-------
+get_cache(obj, cache_dir=None)
+    Return the cache of the module in which the object is defined.
+flush()
+    Write all modified caches to disk.
+default_cache_dir()
+    Return the default directory of the cache of the conversions.
+get_conversion_cache(cache_dir=None)
+    Return the cache of the conversions in the given directory.
+"""
+import atexit
+import hashlib
+import json
+import marshal
+import os
+import sys
+import tempfile
+import threading
+import pydocstring
+
+
+# caches that have been loaded, by the source file of the module
+_caches = {}
+_caches_lock = threading.Lock()
+# caches of the conversions that have been loaded, by their directory
+_conversion_caches = {}
+
+
+class ModuleCache:
+    """Cache of the generated docstrings of the objects in a module.
+
+    Attributes
+    ----------
+    filename : str
+        Source file of the module.
+    path : str
+        Location of the cache file.
+    source_hash : str
+        Hash of the source file of the module.
+    entries : dict
+        Dictionary of the keys to the cached values.
+    is_modified : bool
+        True if there are entries that have not been written to disk.
+
+    Methods
+    -------
+    __init__(filename, cache_dir=None)
+        Initialize.
+    get(key)
+        Return the cached value of the key.
+    set(key, value)
+        Store the value of the key.
+    save()
+        Write the cache to disk.
+    """
+    def __init__(self, filename, cache_dir=None):
+        """Initialize.
+
+        Cache file is loaded if it exists and it corresponds to the current source code of the
+        module and the current version of pydocstring.
+
+        Parameters
+        ----------
+        filename : str
+            Source file of the module.
+        cache_dir : {str, None}
+            Directory in which the cache file is stored.
+            Default is the `__pycache__` directory next to the source file.
+        """
+        self.filename = filename
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(filename), '__pycache__')
+        modulename = os.path.splitext(os.path.basename(filename))[0]
+        self.path = os.path.join(cache_dir, '{0}.pydocstring-{1}.cache'
+                                 ''.format(modulename, pydocstring.__version__))
+        with open(filename, 'rb') as f:
+            self.source_hash = hashlib.sha256(f.read()).hexdigest()
+        self.entries = self._load()
+        self.is_modified = False
+        # lock of the entries and lock that serializes the writes of the file
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    def _load(self):
+        """Return the entries of the cache file.
+
+        Returns
+        -------
+        entries : dict
+            Entries of the cache file.
+            Empty if the cache file does not exist, cannot be read, or is out of date.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                version, source_hash, entries = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return {}
+        if version != pydocstring.__version__ or source_hash != self.source_hash:
+            return {}
+        return entries
+
+    def get(self, key):
+        """Return the cached value of the key.
+
+        Parameters
+        ----------
+        key : tuple
+            Key of the value (must be marshallable).
+
+        Returns
+        -------
+        value : {tuple, None}
+            Cached value.
+            None if the key is not cached.
+        """
+        return self.entries.get(key)
+
+    def set(self, key, value):
+        """Store the value of the key.
+
+        Parameters
+        ----------
+        key : tuple
+            Key of the value (must be marshallable).
+        value : tuple
+            Value that will be cached (must be marshallable).
+        """
+        with self._lock:
+            self.entries[key] = value
+            self.is_modified = True
+
+    def save(self):
+        """Write the cache to disk.
+
+        Entries written by other processes (for the same source code) are merged into the cache.
+        The file is written to a temporary file and then renamed so that other processes never read
+        a partially written cache. Errors from writing the file (e.g. read-only directory) are
+        ignored.
+        """
+        with self._save_lock:
+            with self._lock:
+                if not self.is_modified:
+                    return
+                entries = dict(self.entries)
+                self.is_modified = False
+            saved = self._load()
+            saved.update(entries)
+            is_written = self._write(saved)
+            with self._lock:
+                if not is_written:
+                    self.is_modified = True
+                    return
+                # entries that were stored while the file was written are kept for the next save
+                saved.update(self.entries)
+                self.entries = saved
+
+    def _write(self, entries):
+        """Write the entries to the cache file through a temporary file.
+
+        Parameters
+        ----------
+        entries : dict
+            Entries of the cache.
+
+        Returns
+        -------
+        is_written : bool
+            True if the cache file has been written.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path),
+                                            prefix=os.path.basename(self.path), suffix='.tmp')
+        except OSError:
+            return False
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump((pydocstring.__version__, self.source_hash, entries), f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        return True
+
+
+def get_cache(obj, cache_dir=None):
+    """Return the cache of the module in which the object is defined.
+
+    Parameters
+    ----------
+    obj : function, module, class, property
+        Object whose cache is returned.
+    cache_dir : {str, None}
+        Directory in which the cache files are stored.
+        Default is the `__pycache__` directory next to the source file.
+
+    Returns
+    -------
+    cache : {ModuleCache, None}
+        Cache of the module.
+        None if the source file of the module cannot be found.
+    """
+    if isinstance(obj, property):
+        obj = obj.fget
+    module = obj if hasattr(obj, '__file__') else sys.modules.get(getattr(obj, '__module__', None))
+    filename = getattr(module, '__file__', None)
+    if filename is None or not filename.endswith('.py'):
+        return None
+
+    key = (filename, cache_dir)
+    try:
+        return _caches[key]
+    except KeyError:
+        pass
+    try:
+        cache = ModuleCache(filename, cache_dir=cache_dir)
+    except OSError:
+        return None
+    # NOTE: if another thread has loaded the cache in the meantime, its cache is used
+    with _caches_lock:
+        return _caches.setdefault(key, cache)
+
+
+def flush():
+    """Write all modified caches to disk."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.save()
+
+
+atexit.register(flush)
+
+
+def default_cache_dir():
+    """Return the default directory of the cache of the conversions.
+
+    Returns
+    -------
+    cache_dir : str
+        Environment variable `PYDOCSTRING_CACHE_DIR`, if set.
+        Otherwise, `pydocstring` in the user's cache directory (`XDG_CACHE_HOME` or `~/.cache`).
+    """
+    cache_dir = os.environ.get('PYDOCSTRING_CACHE_DIR')
+    if cache_dir:
+        return cache_dir
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'),
+                                                                  '.cache')
+    return os.path.join(cache_home, 'pydocstring')
+
+
+class ConversionCache:
+    """Cache of the conversions of the docstrings of files.
+
+    Each entry maps the hash of the contents of a file, the options of the conversion, and the
+    version of pydocstring to the hash of the converted contents and the number of docstrings. A
+    file whose hash is cached with the same output hash is already converted and does not need to
+    be parsed again. Since the entries do not depend on the names of the files, moved and copied
+    files are also found.
+
+    Entries are stored as JSON lines in `{cache_dir}/conversions-{version}.jsonl`. New entries are
+    appended, so that concurrent runs do not overwrite each other, and the file is compacted when
+    most of its lines are duplicates. Lines that cannot be read (e.g. from an interrupted write) are
+    ignored.
+
+    Attributes
+    ----------
+    path : str
+        Location of the cache file.
+    entries : dict
+        Dictionary of the keys to the cached values.
+
+    Methods
+    -------
+    __init__(cache_dir=None)
+        Initialize.
+    key(data, **options)
+        Return the key of the conversion of the contents with the given options.
+    get(key)
+        Return the cached value of the key.
+    set(key, value)
+        Store the value of the key.
+    save()
+        Write the new entries to disk.
+    """
+    def __init__(self, cache_dir=None):
+        """Initialize.
+
+        Parameters
+        ----------
+        cache_dir : {str, None}
+            Directory in which the cache file is stored.
+            Default is given by `default_cache_dir`.
+        """
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        self.path = os.path.join(cache_dir, 'conversions-{0}.jsonl'.format(pydocstring.__version__))
+        self._new_entries = {}
+        # NOTE: last line of the file is not terminated if a write was interrupted
+        self.entries, self._num_lines, self._is_truncated = self._load()
+
+    def _load(self):
+        """Return the entries of the cache file.
+
+        Returns
+        -------
+        entries : dict
+            Entries of the cache file.
+            Empty if the cache file does not exist or cannot be read.
+        num_lines : int
+            Number of lines in the cache file.
+        is_truncated : bool
+            True if the last line of the cache file is not terminated.
+        """
+        entries = {}
+        num_lines = 0
+        is_truncated = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    num_lines += 1
+                    is_truncated = not line.endswith('\n')
+                    try:
+                        entry = json.loads(line)
+                        entries[entry['key']] = entry['value']
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except (OSError, UnicodeDecodeError):
+            pass
+        return entries, num_lines, is_truncated
+
+    @staticmethod
+    def key(data, **options):
+        """Return the key of the conversion of the contents with the given options.
+
+        Parameters
+        ----------
+        data : bytes
+            Contents of the file.
+        options : dict
+            Options of the conversion (must be serializable to JSON).
+
+        Returns
+        -------
+        key : str
+            Hash of the contents, the options, and the version of pydocstring.
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps([pydocstring.__version__, options], sort_keys=True).encode())
+        digest.update(b'\0')
+        digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached value of the key.
+
+        Parameters
+        ----------
+        key : str
+            Key of the value.
+
+        Returns
+        -------
+        value : {dict, None}
+            Cached value.
+            None if the key is not cached.
+        """
+        return self.entries.get(key)
+
+    def set(self, key, value):
+        """Store the value of the key.
+
+        Parameters
+        ----------
+        key : str
+            Key of the value.
+        value : dict
+            Value that will be cached (must be serializable to JSON).
+        """
+        if self.entries.get(key) != value:
+            self.entries[key] = value
+            self._new_entries[key] = value
+
+    def save(self):
+        """Write the new entries to disk.
+
+        Entries that were written by other processes since the cache was loaded are kept. Errors
+        from writing the file (e.g. read-only directory) are ignored.
+        """
+        if not self._new_entries:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if self._num_lines > 2 * len(self.entries):
+                # compact (through a temporary file so that other processes never read a partially
+                # written cache)
+                entries = self._load()[0]
+                entries.update(self.entries)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path),
+                                                prefix=os.path.basename(self.path), suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        for key, value in entries.items():
+                            f.write(json.dumps({'key': key, 'value': value}, sort_keys=True))
+                            f.write('\n')
+                    os.replace(tmp_path, self.path)
+                except OSError:
+                    os.remove(tmp_path)
+                    raise
+                self.entries = entries
+                self._num_lines = len(entries)
+            else:
+                lines = ''.join(json.dumps({'key': key, 'value': value}, sort_keys=True) + '\n'
+                                for key, value in self._new_entries.items())
+                # NOTE: lines are appended in one write so that concurrent runs do not interleave
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write('\n' + lines if self._is_truncated else lines)
+                self._num_lines += len(self._new_entries)
+            self._is_truncated = False
+        except OSError:
+            return
+        self._new_entries = {}
+
+
+def get_conversion_cache(cache_dir=None):
+    """Return the cache of the conversions in the given directory.
+
+    Cache is loaded once per process, so that long-running processes (e.g. `pydocstring.daemon`)
+    keep it in memory.
+
+    Parameters
+    ----------
+    cache_dir : {str, None}
+        Directory in which the cache file is stored.
+        Default is given by `default_cache_dir`.
+
+    Returns
+    -------
+    cache : ConversionCache
+        Cache of the conversions.
+    """
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    key = os.path.abspath(cache_dir)
+    try:
+        return _conversion_caches[key]
+    except KeyError:
+        pass
+    cache = ConversionCache(cache_dir)
+    with _caches_lock:
+        return _conversion_caches.setdefault(key, cache)
@@ -0,0 +1,151 @@
+"""Manifest of the files that are converted by a batch run, so that an interrupted run can resume.
+
+Files are recorded by `pydocstring.scripts.pydocstring_to_instance` (see `--checkpoint` and
+`--resume`) as soon as they are written.
+"""
+import json
+import os
+import pydocstring
+
+
+class Checkpoint:
+    """Append-only manifest of the files that are converted by a batch run.
+
+    First line of the manifest is the version of pydocstring and the options of the conversion, and
+    each following line records a file that is converted (its absolute name), the hash of its
+    contents after the conversion, and its number of docstrings, as JSON. A line is appended as
+    soon as the file is written, with a single write on a file opened in append mode, so that the
+    worker processes of a run can record their files concurrently. Lines that cannot be read
+    (e.g. from a write that was interrupted) are ignored.
+
+    A run that resumes from the manifest skips the files whose contents are the recorded contents,
+    i.e. the files that are converted and have not changed since. Other files are converted again.
+
+    Attributes
+    ----------
+    path : str
+        Location of the manifest.
+    options : dict
+        Options of the conversion.
+    entries : dict of str to dict
+        Absolute names of the recorded files to their hash ('output') and their number of
+        docstrings ('docstrings').
+
+    Methods
+    -------
+    __init__(path, resume=False, **options)
+        Initialize.
+    get(filename)
+        Return the record of the file.
+    add(filename, output, docstrings)
+        Record that the file is converted.
+    """
+    def __init__(self, path, resume=False, **options):
+        """Initialize.
+
+        Parameters
+        ----------
+        path : str
+            Location of the manifest.
+        resume : bool
+            True if the files that are recorded in the manifest are kept. Otherwise, the manifest
+            is started anew.
+            Default is False.
+        options : dict
+            Options of the conversion (must be serializable to JSON).
+
+        Raises
+        ------
+        ValueError
+            If the run is resumed from a manifest that was written by another version of
+            pydocstring or with other options.
+        OSError
+            If the manifest cannot be read or written.
+        """
+        self.path = path
+        self.options = json.loads(json.dumps(options, sort_keys=True))
+        self.entries = {}
+        header = {'version': pydocstring.__version__, 'options': self.options}
+        if resume and os.path.exists(path):
+            saved_header, self.entries, is_truncated = self._load()
+            if saved_header is not None:
+                if saved_header != header:
+                    raise ValueError('Checkpoint {0} is from another version of pydocstring or '
+                                     'other options of the conversion.'.format(path))
+                if is_truncated:
+                    self._append('\n')
+                return
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header, sort_keys=True) + '\n')
+
+    def _load(self):
+        """Return the header and the entries of the manifest.
+
+        Returns
+        -------
+        header : {dict, None}
+            Version of pydocstring and options of the conversion.
+            None if the manifest is empty.
+        entries : dict of str to dict
+            Recorded files.
+        is_truncated : bool
+            True if the last line of the manifest is not terminated.
+        """
+        header = None
+        entries = {}
+        is_truncated = False
+        with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+            for i, line in enumerate(f):
+                is_truncated = not line.endswith('\n')
+                try:
+                    entry = json.loads(line)
+                    if i == 0:
+                        header = entry
+                    else:
+                        entries[entry['filename']] = {'output': entry['output'],
+                                                      'docstrings': entry['docstrings']}
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return header, entries, is_truncated
+
+    def _append(self, text):
+        """Append the text to the manifest in a single write."""
+        descriptor = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(descriptor, text.encode('utf-8'))
+        finally:
+            os.close(descriptor)
+
+    def get(self, filename):
+        """Return the record of the file.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file.
+
+        Returns
+        -------
+        record : {dict, None}
+            Hash of the contents of the file after its conversion ('output') and its number of
+            docstrings ('docstrings').
+            None if the file is not recorded.
+        """
+        return self.entries.get(os.path.abspath(filename))
+
+    def add(self, filename, output, docstrings):
+        """Record that the file is converted.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file.
+        output : str
+            SHA-256 of the contents of the file after its conversion (in hexadecimal).
+        docstrings : int
+            Number of docstrings of the file.
+        """
+        filename = os.path.abspath(filename)
+        self._append(json.dumps({'filename': filename, 'output': output, 'docstrings': docstrings},
+                                sort_keys=True) + '\n')
+        self.entries[filename] = {'output': output, 'docstrings': docstrings}
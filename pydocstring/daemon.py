@@ -0,0 +1,469 @@
+"""Resident process that runs `pydocstring_to_instance` without starting a new interpreter.
+
+Starting the interpreter and importing pydocstring costs more than converting a single file, e.g.
+from an editor hook on every save. The daemon imports pydocstring once and keeps its caches (the
+cache of the conversions, the source files of the members) in memory. It serves the requests of
+the clients over a Unix domain socket, one request at a time.
+
+Each request and each response is a line of JSON. A request contains the command line arguments
+and the working directory of the client, `{"argv": [...], "cwd": "..."}`, and the response
+contains the exit status and the output of the script, `{"status": 0, "stdout": "...",
+"stderr": "..."}`. Request `{"command": "ping"}` checks that the daemon is running and request
+`{"command": "stop"}` stops it. Request that cannot be read (e.g. longer than `REQUEST_LIMIT`) is
+answered with `{"status": 2, "invalid": true, ...}`, and the client then runs the script itself.
+
+The client does not import the rest of pydocstring (nor `asyncio`) unless the daemon is not
+running, in which case the script is run in the client's process. Filter of the standard input
+(`-`) is always run in the client's process, since the standard streams are not forwarded.
+
+Socket is in a directory that only the user can write to (`$XDG_RUNTIME_DIR`, or a directory of
+the user in the temporary directory), and the client only connects to a socket of a daemon of the
+same user, so that another user cannot receive the requests nor forge the responses.
+
+Methods
+-------
+default_socket_path()
+    Return the default location of the socket of the daemon.
+request(message, socket_path=None, timeout=None)
+    Send a request to the daemon and return its response.
+run(argv, cwd=None, socket_path=None)
+    Run `pydocstring_to_instance` in the daemon, or in this process if the daemon is not running.
+serve(socket_path=None)
+    Run the daemon until it is stopped.
+main(argv=None)
+    Run the daemon (entry point of `pydocstring_daemon`).
+client_main(argv=None)
+    Run `pydocstring_to_instance` through the daemon (entry point of `pydocstring_client`).
+"""
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import pydocstring
+
+
+# maximum size (in bytes) of a request, e.g. the paths of all the files of a repository
+REQUEST_LIMIT = 64 * 2 ** 20
+# time (in seconds) to wait for the connection to the daemon, and for its response to a run
+# (`$PYDOCSTRING_TIMEOUT`, if set)
+CONNECT_TIMEOUT = 5.0
+TIMEOUT = 600.0
+
+
+def default_socket_path():
+    """Return the default location of the socket of the daemon.
+
+    Returns
+    -------
+    socket_path : str
+        Environment variable `PYDOCSTRING_SOCKET`, if set.
+        Otherwise, a file that depends on the version of pydocstring in `$XDG_RUNTIME_DIR`, or in a
+        directory of the user in the temporary directory (created by the daemon).
+    """
+    socket_path = os.environ.get('PYDOCSTRING_SOCKET')
+    if socket_path:
+        return socket_path
+    dirname = os.environ.get('XDG_RUNTIME_DIR')
+    if not dirname:
+        dirname = os.path.join(tempfile.gettempdir(), 'pydocstring-{0}'.format(os.getuid()))
+    return os.path.join(dirname, 'pydocstring-{0}.sock'.format(pydocstring.__version__))
+
+
+def _check_directory(dirname):
+    """Create the directory of the socket, if needed, and check that only the user can write to it.
+
+    Raises
+    ------
+    RuntimeError
+        If the directory does not belong to the user or if other users can write to it.
+    """
+    try:
+        os.mkdir(dirname, 0o700)
+    except FileExistsError:
+        pass
+    status = os.lstat(dirname)
+    if (not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid()
+            or status.st_mode & 0o022):
+        raise RuntimeError('Directory of the socket, {0}, must belong to the user and must not be '
+                           'writable by other users.'.format(dirname))
+
+
+def _connect(socket_path, timeout):
+    """Connect to the socket of the daemon and check that the daemon belongs to the user.
+
+    Raises
+    ------
+    PermissionError
+        If the socket or the daemon belongs to another user (or if the path is not a socket).
+    OSError
+        If the daemon is not running or does not accept the connection in time.
+    """
+    status = os.lstat(socket_path)
+    if not stat.S_ISSOCK(status.st_mode) or status.st_uid != os.getuid():
+        raise PermissionError('{0} is not a socket of the user.'.format(socket_path))
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        if hasattr(socket, 'SO_PEERCRED'):
+            # NOTE: credentials of the process that created the socket (Linux), i.e. (pid, uid, gid)
+            credentials = client.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                                            struct.calcsize('3i'))
+            if struct.unpack('3i', credentials)[1] != os.getuid():
+                raise PermissionError('Daemon of {0} belongs to another user.'.format(socket_path))
+    except BaseException:
+        client.close()
+        raise
+    return client
+
+
+def request(message, socket_path=None, timeout=None, connect_timeout=CONNECT_TIMEOUT):
+    """Send a request to the daemon and return its response.
+
+    Parameters
+    ----------
+    message : dict
+        Request (must be serializable to JSON).
+    socket_path : {str, None}
+        Location of the socket of the daemon.
+        Default is given by `default_socket_path`.
+    timeout : {float, None}
+        Maximum time (in seconds) to wait for the response.
+        Default is no limit.
+    connect_timeout : {float, None}
+        Maximum time (in seconds) to wait for the connection.
+        Default is `CONNECT_TIMEOUT`.
+
+    Returns
+    -------
+    response : dict
+        Response of the daemon.
+
+    Raises
+    ------
+    TimeoutError
+        If the request is sent but the daemon does not respond in time.
+    OSError
+        If the daemon is not running (e.g. FileNotFoundError, ConnectionRefusedError), or does not
+        accept the connection in time.
+        If the socket or the daemon belongs to another user (PermissionError).
+        If the connection is closed before the response is received.
+    ValueError
+        If the response is not a JSON object.
+    """
+    if socket_path is None:
+        socket_path = default_socket_path()
+    if timeout is not None and (connect_timeout is None or timeout < connect_timeout):
+        connect_timeout = timeout
+    try:
+        client = _connect(socket_path, connect_timeout)
+    except socket.timeout as error:
+        raise ConnectionError('Daemon did not accept the connection: {0}'.format(error)) from None
+    with client:
+        client.settimeout(timeout)
+        try:
+            client.sendall(json.dumps(message).encode('utf-8') + b'\n')
+            chunks = []
+            while True:
+                chunk = client.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                if chunk.endswith(b'\n'):
+                    break
+        except socket.timeout:
+            raise TimeoutError('Daemon did not respond in {0} seconds.'.format(timeout)) from None
+    data = b''.join(chunks)
+    if not data.endswith(b'\n'):
+        raise ConnectionError('Connection to the daemon was closed before the response.')
+    response = json.loads(data.decode('utf-8'))
+    if not isinstance(response, dict):
+        raise ValueError('Response of the daemon is not a JSON object.')
+    return response
+
+
+def _run_script(argv, cwd=None, capture=True):
+    """Run `pydocstring_to_instance` in this process and return its exit status and output.
+
+    Parameters
+    ----------
+    argv : list of str
+        Command line arguments of the script.
+    cwd : {str, None}
+        Working directory of the script.
+        Default is the current working directory.
+    capture : bool
+        True if the output of the script is returned. False if it is written to the standard
+        output and error (e.g. for the filter of the standard input, `-`).
+        Default is True.
+
+    Returns
+    -------
+    response : dict
+        Exit status ('status') and output ('stdout' and 'stderr', which are empty if the output is
+        not captured) of the script.
+    """
+    import contextlib
+    import io
+    import traceback
+    from pydocstring.scripts.pydocstring_to_instance import main as script_main
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    if capture:
+        redirect = contextlib.ExitStack()
+        redirect.enter_context(contextlib.redirect_stdout(stdout))
+        redirect.enter_context(contextlib.redirect_stderr(stderr))
+    else:
+        redirect = contextlib.nullcontext()
+    previous_cwd = os.getcwd()
+    try:
+        with redirect:
+            try:
+                if cwd is not None:
+                    os.chdir(cwd)
+                status = script_main(argv)
+            except SystemExit as error:
+                # e.g. invalid arguments
+                status = error.code if isinstance(error.code, int) else 1
+            except Exception:
+                traceback.print_exc()
+                status = 1
+    finally:
+        os.chdir(previous_cwd)
+    return {'status': status or 0, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+
+def run(argv, cwd=None, socket_path=None, timeout=None):
+    """Run `pydocstring_to_instance` in the daemon, or in this process if the daemon is not running.
+
+    Parameters
+    ----------
+    argv : list of str
+        Command line arguments of the script.
+    cwd : {str, None}
+        Working directory of the script.
+        Default is the current working directory.
+    socket_path : {str, None}
+        Location of the socket of the daemon.
+        Default is given by `default_socket_path`.
+    timeout : {float, None}
+        Maximum time (in seconds) to wait for the response of the daemon.
+        Default is `$PYDOCSTRING_TIMEOUT`, if set, or `TIMEOUT`.
+
+    Returns
+    -------
+    response : dict
+        Exit status ('status') and output ('stdout' and 'stderr') of the script, and True if the
+        script was run by the daemon ('daemon').
+        Script is run in this process if the daemon cannot be reached, if its response cannot be
+        read, or if it cannot read the request. If the daemon does not respond in time, the script
+        is not run again (the daemon may still be running it) and the exit status is 1.
+        Filter of the standard input (`-`) is always run in this process, with the standard
+        streams of this process (so that 'stdout' and 'stderr' are empty).
+    """
+    if cwd is None:
+        cwd = os.getcwd()
+    if '-' in argv:
+        # NOTE: standard streams are not forwarded to the daemon
+        response = _run_script(argv, cwd=cwd, capture=False)
+        response['daemon'] = False
+        return response
+    if timeout is None:
+        timeout = float(os.environ.get('PYDOCSTRING_TIMEOUT') or TIMEOUT)
+    try:
+        response = request({'argv': list(argv), 'cwd': cwd}, socket_path=socket_path,
+                           timeout=timeout)
+    except TimeoutError as error:
+        return {'status': 1, 'stdout': '', 'stderr': '{0}\n'.format(error), 'daemon': True}
+    except (OSError, ValueError):
+        response = None
+    if (response is None or response.get('invalid')
+            or not all(key in response for key in ('status', 'stdout', 'stderr'))):
+        response = _run_script(argv, cwd=cwd)
+        response['daemon'] = False
+    else:
+        response['daemon'] = True
+    return response
+
+
+def serve(socket_path=None):
+    """Run the daemon until it is stopped.
+
+    Socket is only accessible by the user: it is created (with a restrictive umask) in a directory
+    that only the user can write to. Socket that is left by a daemon that did not stop cleanly is
+    replaced.
+
+    Parameters
+    ----------
+    socket_path : {str, None}
+        Location of the socket of the daemon.
+        Default is given by `default_socket_path`.
+
+    Raises
+    ------
+    RuntimeError
+        If another daemon is running on the socket.
+        If the directory of the socket does not belong to the user or if other users can write to
+        it.
+    """
+    import asyncio
+
+    if socket_path is None:
+        socket_path = default_socket_path()
+    _check_directory(os.path.dirname(os.path.abspath(socket_path)))
+    if os.path.lexists(socket_path):
+        try:
+            request({'command': 'ping'}, socket_path=socket_path, timeout=1)
+        except OSError:
+            os.remove(socket_path)
+        else:
+            raise RuntimeError('Daemon is already running on {0}.'.format(socket_path))
+
+    # import the script (and its dependencies) before the first request
+    import pydocstring.cache
+    import pydocstring.scripts.pydocstring_to_instance
+
+    async def handle(reader, writer):
+        """Respond to the request of a client."""
+        try:
+            message = json.loads((await reader.readline()).decode('utf-8'))
+            command = message.get('command', 'run')
+            if command == 'ping':
+                response = {'status': 0, 'pid': os.getpid()}
+            elif command == 'stop':
+                response = {'status': 0}
+                stopped.set()
+            else:
+                argv = message['argv']
+                if not (isinstance(argv, list) and all(isinstance(arg, str) for arg in argv)):
+                    raise TypeError('argv must be a list of strings')
+                if '-' in argv:
+                    raise ValueError('standard input (-) is not forwarded to the daemon')
+                # NOTE: script is run in a thread (so that other clients can connect), one request
+                #       at a time (it changes the working directory and the standard streams)
+                async with lock:
+                    response = await loop.run_in_executor(None, _run_script, argv,
+                                                          message.get('cwd'))
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            # NOTE: request that is longer than the limit raises ValueError
+            response = {'status': 2, 'invalid': True, 'stdout': '',
+                        'stderr': 'Invalid request: {0}\n'.format(error)}
+        try:
+            writer.write(json.dumps(response).encode('utf-8') + b'\n')
+            await writer.drain()
+        except OSError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve_forever():
+        """Serve the clients until the daemon is stopped."""
+        # NOTE: socket is never accessible by other users, even before its mode is set
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(handle, path=socket_path,
+                                                     limit=REQUEST_LIMIT)
+        finally:
+            os.umask(umask)
+        os.chmod(socket_path, 0o600)
+        try:
+            await stopped.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    lock = asyncio.Lock()
+    stopped = asyncio.Event()
+    try:
+        loop.run_until_complete(serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # write the caches of the conversions
+        for cache in pydocstring.cache._conversion_caches.values():
+            cache.save()
+        loop.close()
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+
+
+def main(argv=None):
+    """Run the daemon (entry point of `pydocstring_daemon`).
+
+    Parameters
+    ----------
+    argv : list of str
+        Command line arguments (without the name of the program).
+        Default is `sys.argv[1:]`.
+
+    Returns
+    -------
+    status : int
+        0 if the daemon ran (or was stopped), 1 otherwise.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Runs pydocstring_to_instance for the clients of a Unix domain socket.'
+    )
+    parser.add_argument('--socket', action='store', default=None, type=str,
+                        dest='socket_path', metavar='PATH',
+                        help='Location of the socket (default is $PYDOCSTRING_SOCKET or a file in '
+                        '$XDG_RUNTIME_DIR or in a directory of the user in the temporary '
+                        'directory).')
+    parser.add_argument('--stop', action='store_true', default=False,
+                        dest='stop', help='Stop the daemon that is running on the socket.')
+    parser.add_argument('--status', action='store_true', default=False,
+                        dest='status', help='Check if a daemon is running on the socket.')
+    args = parser.parse_args(argv)
+
+    if args.stop or args.status:
+        try:
+            response = request({'command': 'stop' if args.stop else 'ping'},
+                               socket_path=args.socket_path, timeout=10)
+        except OSError:
+            print('Daemon is not running.', file=sys.stderr)
+            return 1
+        if args.status:
+            print('Daemon is running (pid {0}).'.format(response['pid']))
+        return 0
+
+    try:
+        serve(args.socket_path)
+    except RuntimeError as error:
+        print(error, file=sys.stderr)
+        return 1
+    return 0
+
+
+def client_main(argv=None):
+    """Run `pydocstring_to_instance` through the daemon (entry point of `pydocstring_client`).
+
+    Arguments are the same as the arguments of `pydocstring_to_instance`. If the daemon is not
+    running, the script is run in this process. If the daemon does not respond in
+    `$PYDOCSTRING_TIMEOUT` (or `TIMEOUT`) seconds, the exit status is 1 (see `run`).
+
+    Parameters
+    ----------
+    argv : list of str
+        Command line arguments (without the name of the program).
+        Default is `sys.argv[1:]`.
+
+    Returns
+    -------
+    status : int
+        Exit status of the script.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    response = run(argv)
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    return response['status']
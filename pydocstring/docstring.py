@@ -1,8 +1,16 @@
 import re
-import collections
+import marshal
+import struct
 import pydocstring.utils
 
 
+# header of the binary encoding of Docstring, i.e. Docstring.to_bytes
+# NOTE: version must be incremented whenever the layout of the encoded structure changes
+_BINARY_MAGIC = b'PDS'
+_BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct('<3sB')
+
+
 # FIXME: maybe use attributes to store header/section contents instead of a dictionary?
 # FIXME: add tests
 # TODO: math equations is a bit of a headache, especially because of the backslashes
@@ -44,6 +52,22 @@ class Docstring:
         Return corresponding google docstring
     make_numpy(self, width=100, indent_level=0, tabsize=4)
         Return corresponding numpy docstring
+    to_dict()
+        Return dictionary of builtin types that corresponds to the Docstring instance.
+    from_dict(data)
+        Return instance of Docstring that corresponds to the given dictionary.
+    to_bytes()
+        Return compact binary encoding of the Docstring instance.
+    from_bytes(data)
+        Return instance of Docstring that corresponds to the given binary encoding.
+    get_entry(section, name)
+        Return entry of the section with the given name.
+    has_entry(section, name)
+        Check if the section has an entry with the given name.
+    iter_entries(section)
+        Iterate over the names and entries of the section.
+    reindex(section=None)
+        Discard the index of the names of the entries after they are modified in place.
 
     Example
     -------
@@ -91,6 +115,8 @@ class Docstring:
             string.
         """
         self.info = {}
+        # index of the names of the entries in each section (see _section_index)
+        self._index = {}
 
         headers_contents = {key.lower(): val for key, val in headers_contents.items()}
         for key, contents in headers_contents.items():
@@ -331,20 +357,285 @@ class Docstring:
                 self.info[section] = contents
             # if contents are TabbedInfo
             elif all(isinstance(i, TabbedInfo) for i in self.info[section]):
+                current = self.info[section]
+                index = self._section_index(section)
                 # retain order as best as possible
                 entries = []
-                # maintain order
-                info_dict = collections.OrderedDict((i.name, i) for i in self.info[section])
+                inherited = set()
                 for entry in contents:
-                    try:
-                        entries.append(info_dict.pop(entry.name))
-                    except KeyError:
+                    position = index.get(entry.name)
+                    if position is None or position in inherited:
                         entries.append(entry)
+                    else:
+                        entries.append(current[position])
+                        inherited.add(position)
+                # maintain order
+                remaining = [entry for i, entry in enumerate(current) if i not in inherited]
 
                 if to_end:
-                    self.info[section] = list(info_dict.values()) + entries
+                    self.info[section] = remaining + entries
                 else:
-                    self.info[section] = entries + list(info_dict.values())
+                    self.info[section] = entries + remaining
+
+    def _section_index(self, section, rebuild=False):
+        """Return the index of the names of the entries in the given section.
+
+        The index is cached and is rebuilt only if the list of entries in the section has been
+        replaced or resized since the index was built, or if it is requested.
+
+        Parameters
+        ----------
+        section : str
+            Name of the section.
+        rebuild : bool
+            True if the index is rebuilt, e.g. because the entries may have been modified in place.
+            Default is False.
+
+        Returns
+        -------
+        index : dict
+            Dictionary of the names of the TabbedInfo entries in the section to their positions in
+            the section.
+            If there are multiple entries with the same name, the position of the first is stored.
+        """
+        contents = self.info.get(section, [])
+        if not rebuild and section in self._index:
+            cached_contents, cached_length, index = self._index[section]
+            if cached_contents is contents and cached_length == len(contents):
+                return index
+
+        index = {}
+        for i, entry in enumerate(contents):
+            if isinstance(entry, TabbedInfo):
+                index.setdefault(entry.name, i)
+        self._index[section] = (contents, len(contents), index)
+        return index
+
+    def get_entry(self, section, name):
+        """Return the entry of the given section with the given name.
+
+        Parameters
+        ----------
+        section : str
+            Name of the section, e.g. 'parameters'.
+        name : str
+            Name of the entry.
+
+        Returns
+        -------
+        entry : TabbedInfo
+            Entry of the section with the given name.
+
+        Raises
+        ------
+        KeyError
+            If the section does not have an entry with the given name.
+
+        Notes
+        -----
+        The lookup uses an index of the entry names that is kept consistent with the methods of
+        Docstring and with replacing the list of entries of a section or adding/removing its
+        entries. Entries that are renamed or replaced in place (e.g. `info[section][i] = entry`)
+        are only found once the index is discarded with `reindex`.
+        """
+        section = section.lower()
+        position = self._section_index(section).get(name)
+        if position is not None:
+            entry = self.info[section][position]
+            if isinstance(entry, TabbedInfo) and entry.name == name:
+                return entry
+            # indexed entry was modified in place (without `reindex`)
+            position = self._section_index(section, rebuild=True).get(name)
+            if position is not None:
+                return self.info[section][position]
+        raise KeyError('Section, {0}, does not have an entry with the name, {1}.'
+                       ''.format(section, name))
+
+    def has_entry(self, section, name):
+        """Check if the given section has an entry with the given name.
+
+        Parameters
+        ----------
+        section : str
+            Name of the section, e.g. 'methods'.
+        name : str
+            Name of the entry.
+
+        Returns
+        -------
+        has_entry : bool
+            True if the section has an entry with the given name.
+            False otherwise.
+        """
+        try:
+            self.get_entry(section, name)
+        except KeyError:
+            return False
+        return True
+
+    def reindex(self, section=None):
+        """Discard the index of the names of the entries after they are modified in place.
+
+        Index is rebuilt on the next lookup. It is only needed if entries are renamed or replaced
+        in place, e.g. `info[section][i].name = name` or `info[section][i] = entry`.
+
+        Parameters
+        ----------
+        section : {str, None}
+            Name of the section whose index is discarded.
+            Default is all sections.
+        """
+        if section is None:
+            self._index.clear()
+        else:
+            self._index.pop(section.lower(), None)
+
+    def iter_entries(self, section):
+        """Iterate over the names and the entries of the given section in order.
+
+        Parameters
+        ----------
+        section : str
+            Name of the section, e.g. 'parameters'.
+
+        Yields
+        ------
+        name : str
+            Name of the entry.
+        entry : TabbedInfo
+            Entry of the section.
+        """
+        for entry in self.info.get(section.lower(), []):
+            if isinstance(entry, TabbedInfo):
+                yield entry.name, entry
+
+    def to_dict(self):
+        """Return the contents of the Docstring instance as a dictionary of builtin types.
+
+        The TabbedInfo instances are converted to dictionaries with keys 'name', 'signature',
+        'types', and 'descs', i.e. the parameters of its initializer. The output can be serialized
+        with JSON and turned back into a Docstring instance with `Docstring.from_dict`.
+
+        Returns
+        -------
+        data : dict
+            Dictionary of the section to the contents of the section.
+        """
+        data = {}
+        for section, contents in self.info.items():
+            if isinstance(contents, str):
+                data[section] = contents
+            else:
+                data[section] = [entry if isinstance(entry, str) else entry.to_dict()
+                                 for entry in contents]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Return the Docstring instance that corresponds to the given dictionary.
+
+        Parameters
+        ----------
+        data : dict
+            Dictionary of the section to the contents of the section, e.g. output of
+            `Docstring.to_dict`.
+
+        Returns
+        -------
+        docstring : Docstring
+            Docstring instance with the given contents.
+
+        Raises
+        ------
+        TypeError
+            If the contents of the dictionary cannot be used to initialize Docstring.
+        """
+        return cls(**data)
+
+    def to_bytes(self):
+        """Return a compact binary encoding of the Docstring instance.
+
+        The encoding starts with a (versioned) header, followed by the marshalled tuple of the
+        sections.
+
+        Returns
+        -------
+        data : bytes
+            Binary encoding of the Docstring instance.
+
+        Notes
+        -----
+        Each section is stored as a 2-tuple of the section name and its contents. The contents of
+        the section is a string or a tuple, where each item of the tuple is a string or a 4-tuple
+        (name, signature, types, descs) of a TabbedInfo instance.
+        Strings that are shared between entries (e.g. types of the parameters) are stored only once
+        because marshal stores the repeated occurrences of an object as references to the first.
+        """
+        sections = []
+        for section, contents in self.info.items():
+            if not isinstance(contents, str):
+                contents = tuple([entry if isinstance(entry, str) else
+                                  (entry.name, entry.signature, tuple(entry.types),
+                                   tuple(entry.descs))
+                                  for entry in contents])
+            sections.append((section, contents))
+
+        return (_BINARY_HEADER.pack(_BINARY_MAGIC, _BINARY_VERSION)
+                + marshal.dumps(tuple(sections)))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Return the Docstring instance that corresponds to the given binary encoding.
+
+        Parameters
+        ----------
+        data : bytes
+            Binary encoding of a Docstring instance, i.e. output of `Docstring.to_bytes`.
+
+        Returns
+        -------
+        docstring : Docstring
+            Docstring instance that was encoded.
+
+        Raises
+        ------
+        ValueError
+            If the data is not a binary encoding of a Docstring instance.
+            If the data was encoded with a different version of the format.
+        """
+        try:
+            magic, version = _BINARY_HEADER.unpack_from(data)
+        except struct.error as error:
+            raise ValueError('Given data is not a binary encoding of a Docstring.') from error
+        if magic != _BINARY_MAGIC:
+            raise ValueError('Given data is not a binary encoding of a Docstring.')
+        if version != _BINARY_VERSION:
+            raise ValueError('Given data is encoded with version {0} of the format, but version '
+                             '{1} is expected.'.format(version, _BINARY_VERSION))
+        try:
+            sections = marshal.loads(data[_BINARY_HEADER.size:])
+        except (EOFError, ValueError, TypeError) as error:
+            raise ValueError('Given data is not a binary encoding of a Docstring.') from error
+
+        # NOTE: contents are not validated (as they would be in the initializer) because they
+        #       were validated when the encoded instance was created
+        from_fields = TabbedInfo._from_fields
+        output = cls.__new__(cls)
+        output.info = {}
+        output._index = {}
+        for section, contents in sections:
+            if isinstance(contents, str):
+                output.info[section] = contents
+            else:
+                output.info[section] = [entry if isinstance(entry, str) else
+                                        from_fields(entry[0], entry[1], list(entry[2]),
+                                                    list(entry[3]))
+                                        for entry in contents]
+        return output
+
+    def __reduce__(self):
+        """Return the compact representation of the Docstring instance used by pickle."""
+        return (type(self).from_bytes, (self.to_bytes(),))
 
 
 # FIXME: rename
@@ -379,6 +670,8 @@ class TabbedInfo:
         Return correspond google docstring
     make_numpy()
         Return corresponding numpy docstring
+    to_dict()
+        Return dictionary of the parameters of the initializer.
     """
     def __init__(self, name, signature='', types='', descs=''):
         """Initialize.
@@ -439,6 +732,35 @@ class TabbedInfo:
         else:
             raise TypeError('`descs` must be a string or a list/tuple of strings')
 
+    @classmethod
+    def _from_fields(cls, name, signature, types, descs):
+        """Return the TabbedInfo instance with the given (already processed) attributes.
+
+        Unlike the initializer, the attributes are not checked or processed.
+        """
+        output = cls.__new__(cls)
+        output.name = name
+        output.signature = signature
+        output.types = types
+        output.descs = descs
+        return output
+
+    def to_dict(self):
+        """Return the attributes of the TabbedInfo instance as a dictionary.
+
+        Returns
+        -------
+        data : dict
+            Dictionary of the parameters of the initializer, 'name', 'signature', 'types', and
+            'descs', to their values.
+        """
+        return {'name': self.name, 'signature': self.signature, 'types': list(self.types),
+                'descs': list(self.descs)}
+
+    def __reduce__(self):
+        """Return the compact representation of the TabbedInfo instance used by pickle."""
+        return (type(self)._from_fields, (self.name, self.signature, self.types, self.descs))
+
     def make_numpy(self, width=100, indent_level=0, tabsize=4):
         """Returns the numpy docstring that corresponds to the TabbedInfo instance.
 
@@ -0,0 +1,139 @@
+"""Changes of the files in a git repository, from the local `git` command.
+
+Methods
+-------
+parse_diff(diff)
+    Return the ranges of the lines that are changed in each file of a diff.
+changed_lines(ref='HEAD', cwd=None, untracked=True)
+    Return the files that are changed relative to a git reference and their changed lines.
+"""
+import ast
+import os
+import re
+import subprocess
+
+
+def _git(args, cwd=None):
+    """Run a git command and return its output.
+
+    Parameters
+    ----------
+    args : list of str
+        Arguments of the git command.
+    cwd : {str, None}
+        Directory in which the command is run.
+        Default is the current working directory.
+
+    Returns
+    -------
+    output : str
+        Standard output of the command.
+
+    Raises
+    ------
+    ValueError
+        If the command fails (e.g. not in a git repository, unknown reference).
+    OSError
+        If git cannot be run.
+    """
+    process = subprocess.run(['git', '-c', 'core.quotepath=off'] + list(args), cwd=cwd,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if process.returncode != 0:
+        raise ValueError('git {0} failed: {1}'.format(
+            ' '.join(args), process.stderr.decode('utf-8', 'replace').strip()
+        ))
+    return process.stdout.decode('utf-8', 'surrogateescape')
+
+
+def parse_diff(diff):
+    """Return the ranges of the lines that are changed in each file of a diff.
+
+    Parameters
+    ----------
+    diff : str
+        Output of `git diff` (without the prefixes of the paths, i.e. `--no-prefix`).
+
+    Returns
+    -------
+    changes : dict of str to list of 2-tuple of int
+        Paths of the files in the new version to the first and last line numbers (in the new
+        version) of each hunk. Lines that are only deleted are represented by the lines before and
+        after the deletion.
+        Deleted files and files without changes to their contents (e.g. renamed) are not included.
+    """
+    changes = {}
+    path = None
+    in_header = False
+    for line in diff.splitlines():
+        if line.startswith('diff --git '):
+            path = None
+            in_header = True
+        elif in_header and line.startswith('+++ '):
+            path = line[4:]
+            if path.startswith('"'):
+                path = ast.literal_eval(path)
+            path = None if path == '/dev/null' else path
+        elif line.startswith('@@ '):
+            in_header = False
+            match = re.match(r'@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@', line)
+            if path is None or match is None:
+                continue
+            start = int(match.group(1))
+            count = 1 if match.group(2) is None else int(match.group(2))
+            if count == 0:
+                changes.setdefault(path, []).append((start, start + 1))
+            else:
+                changes.setdefault(path, []).append((start, start + count - 1))
+    return changes
+
+
+def changed_lines(ref='HEAD', cwd=None, untracked=True):
+    """Return the files that are changed relative to a git reference and their changed lines.
+
+    Working tree (including the staged and the unstaged changes) is compared with the reference,
+    e.g. 'HEAD' for the uncommitted changes, or the merge base of a branch for the changes of the
+    branch.
+
+    Parameters
+    ----------
+    ref : str
+        Git reference that is compared with the working tree.
+        Default is 'HEAD'.
+    cwd : {str, None}
+        Directory in the git repository.
+        Default is the current working directory.
+    untracked : bool
+        True if the untracked files (that are not ignored) are included.
+        Default is True.
+
+    Returns
+    -------
+    changes : dict of str to {list of 2-tuple of int, None}
+        Names of the changed files (relative to `cwd`) to the first and last line numbers of their
+        changed regions (see `parse_diff`).
+        None if the whole file is new (untracked).
+
+    Raises
+    ------
+    ValueError
+        If `cwd` is not in a git repository or if the reference does not exist.
+    OSError
+        If git cannot be run.
+    """
+    if cwd is None:
+        cwd = os.getcwd()
+    root = _git(['rev-parse', '--show-toplevel'], cwd=cwd).rstrip('\n')
+
+    def relative(path):
+        """Return the path (relative to the root of the repository) relative to `cwd`."""
+        return os.path.normpath(os.path.relpath(os.path.join(root, path), cwd))
+
+    diff = _git(['diff', '--unified=0', '--no-color', '--no-ext-diff', '--no-prefix',
+                 '--find-renames', '--diff-filter=d', ref, '--'], cwd=root)
+    changes = {relative(path): lines for path, lines in parse_diff(diff).items()}
+    if untracked:
+        output = _git(['ls-files', '--others', '--exclude-standard', '-z'], cwd=root)
+        for path in output.split('\0'):
+            if path:
+                changes[relative(path)] = None
+    return changes
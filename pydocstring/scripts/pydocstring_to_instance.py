@@ -1,28 +1,88 @@
-"""Script for converting the docstrings of a Python file from one format to another.
+"""Script for converting the docstrings of Python files from one format to another.
 
 Methods
 -------
-
+extract_docstring(filename, static=True)
+    Extract the docstring from a python file.
+convert_source(code, doc_format, width=100, tabsize=4, lines=None, times=None)
+    Return the code with its docstrings converted to the given format.
+convert_file(filename, doc_format, width=None, tabsize=None, write=True, cache=None,
+             lines=None, stream=None, checkpoint=None)
+    Convert the docstrings of a file.
+convert_stream(input, output, doc_format, width=None, tabsize=None, lines=None)
+    Convert the docstrings of the code that is read from a file and write it to another file.
+replace_docstrings(filename, doc_format, width=None, tabsize=None, write=True)
+    Replace the specified docstrings from a file to another docstring.
+check_file(filename, doc_format, width=None, tabsize=None, max_differences=None, cache=None,
+           lines=None)
+    Check that the docstrings of a file are in the given format.
+find_files(paths, include=('*.py',), exclude=(), files_from=None)
+    Return the Python files of the given files, directories, and glob patterns.
+filter_files(filenames, paths=(), include=('*.py',), exclude=())
+    Return the files that are in the given paths and that match the given patterns.
+shard_files(filenames, index, count)
+    Return the files of one shard of the files, so that the shards have about the same size.
+convert_files(filenames, doc_format, width=None, tabsize=None, write=True, jobs=1, cache=None,
+              lines=None, checkpoint=None)
+    Convert the docstrings of many files, in parallel.
+check_files(filenames, doc_format, width=None, tabsize=None, max_differences=None, jobs=1,
+            cache=None, lines=None)
+    Check that the docstrings of many files are in the given format, in parallel.
+summarize(results, elapsed)
+    Return the summary of the conversion of many files.
+report(results, elapsed, jobs=1, shard=None)
+    Return the report of the conversion of many files, per file and in total.
+merge_reports(reports)
+    Return the report of the shards of a conversion from the reports of each shard.
+main(argv=None)
+    Run the script.
 """
 import argparse
+import concurrent.futures
+import fnmatch
+import glob
+import hashlib
+import heapq
+import json
+import mmap
 import os
 import re
 import shutil
 import sys
+import tempfile
+import time
+import tokenize
+import pydocstring
+import pydocstring.cache
+import pydocstring.checkpoint
 import pydocstring.docstring
+import pydocstring.git
 import pydocstring.numpy_docstring
+import pydocstring.source
 import pydocstring.utils
 
 
-def extract_docstring(filename):
+FORMATS = ('numpy', 'code')
+# stages of the conversion of a file whose times are kept in the results
+STAGES = ('read', 'cache', 'extract', 'parse', 'render', 'splice', 'write')
+# size (in bytes) from which the files are memory-mapped and streamed rather than read into memory
+STREAM_SIZE = 8 * 2 ** 20
+
+
+def extract_docstring(filename, static=True):
     """Extract the docstring from a python file.
 
-    Python file is imported and the docstring is extracted from the __doc__ attribute.
+    By default, the source code of the file is parsed (see `pydocstring.source`), i.e. the file is
+    not imported. Otherwise, the file is imported and the docstring is extracted from the __doc__
+    attribute.
 
     Parameters
     ----------
     filename : str
         Name of the python file
+    static : bool
+        True if the docstrings are extracted from the source code without importing the file.
+        Default is True.
 
     Returns
     -------
@@ -35,6 +95,9 @@ def extract_docstring(filename):
         If there are unpaired (odd number of) triple quotatations.
         If something goes wrong when finding the triple quotations.
     """
+    if static:
+        return [literal.docstring for literal in pydocstring.source.read_docstrings(filename)]
+
     dirname, modulename = os.path.split(filename)
     # add directory to path
     sys.path.insert(0, dirname)
@@ -42,88 +105,1544 @@ def extract_docstring(filename):
     module = __import__(os.path.splitext(modulename)[0])
     # extract members
     members = [module]
-    members += pydocstring.utils.extract_members(module, recursive=True).values()
+    members += [member for _, member in pydocstring.utils.iter_members(module)]
 
     return [member.__doc__ for member in members]
 
 
-def replace_docstrings(filename, doc_format, width=None, tabsize=None, write=True):
-    """Replace the specified docstrings from a file to another docstring.
+def _render(code, literal, doc_format, width, tabsize, newline, times):
+    """Return the edit of the source code that converts the docstring literal.
+
+    Parameters
+    ----------
+    code : str
+        Python source code.
+    literal : pydocstring.source.DocstringLiteral
+        Docstring literal in the code.
+    doc_format : {'numpy', 'code'}
+        Format of the new docstring.
+    width : int
+        Maximum line length.
+    tabsize : int
+        Number of spaces in a tab.
+    newline : str
+        Newline of the code.
+    times : dict of str to float
+        Times of the stages (see `STAGES`), to which the times of 'parse' and 'render' are added.
+
+    Returns
+    -------
+    start : int
+        Position of the start of the replaced span.
+    end : int
+        Position of the end of the replaced span.
+    new : str
+        New docstring that replaces the span.
+    """
+    start_time = time.perf_counter()
+    doc_data = pydocstring.numpy_docstring.parse_numpy(literal.docstring)
+    doc_instance = pydocstring.docstring.Docstring(**doc_data)
+    parse_time = time.perf_counter()
+    times['parse'] += parse_time - start_time
+    # FIXME: this will give weird results if given tabsize and tabsize of the file is
+    #        different
+    indent_level = len(literal.indent) // tabsize
+    if doc_format == 'numpy':
+        new = doc_instance.make_numpy(width=width, indent_level=indent_level,
+                                      tabsize=tabsize, is_raw=literal.is_raw)
+    else:
+        new = doc_instance.make_code(width=width, indent_level=indent_level,
+                                     tabsize=tabsize)
+    # new docstring is indented, so it replaces the indentation of the line if the literal
+    # starts the line (e.g. not `class A: """Docstring."""`)
+    start = literal.start - len(literal.indent)
+    if code[start:literal.start] != literal.indent:
+        start = literal.start
+        new = new.lstrip()
+    new = new.replace('\n', newline)
+    times['render'] += time.perf_counter() - parse_time
+    return start, literal.end, new
+
+
+def _newline(code):
+    """Return the newline of the code (the first one, or '\\n' if there are none)."""
+    newline = re.search(r'\r\n|\r|\n', code)
+    return newline.group() if newline else '\n'
+
+
+def _select(literals, lines):
+    """Return the docstring literals that overlap with the given lines.
+
+    Parameters
+    ----------
+    literals : list of pydocstring.source.DocstringLiteral
+        Docstring literals.
+    lines : {list of 2-tuple of int, None}
+        First and last line numbers of each region.
+        None if all literals are selected.
+
+    Returns
+    -------
+    literals : list of pydocstring.source.DocstringLiteral
+        Docstring literals that have at least one line in one of the regions.
+    """
+    if lines is None:
+        return literals
+    return [literal for literal in literals
+            if any(first <= literal.end_lineno and literal.lineno <= last for first, last in lines)]
+
+
+def convert_source(code, doc_format, width=100, tabsize=4, lines=None, times=None):
+    """Return the code with its docstrings converted to the given format.
+
+    Docstrings are located in the source code (see `pydocstring.source`) and the new code is built
+    from the slices between them in one pass. Identical docstrings of different objects are
+    replaced independently. Newlines of the code are kept.
+
+    Parameters
+    ----------
+    code : str
+        Python source code.
+    doc_format : {'numpy', 'code'}
+        Format of the new docstrings.
+    width : int
+        Maximum line length.
+        Default is 100.
+    tabsize : int
+        Number of spaces in a tab.
+        Default is 4.
+    lines : {list of 2-tuple of int, None}
+        First and last line numbers of the regions whose docstrings are converted.
+        Default is all docstrings.
+    times : {dict of str to float, None}
+        Times of the stages (see `STAGES`), to which the times of 'extract', 'parse', 'render',
+        and 'splice' are added.
+        Default is not keeping the times.
+
+    Returns
+    -------
+    code : str
+        Source code with the converted docstrings.
+    num_docstrings : int
+        Number of docstrings that are converted.
+
+    Raises
+    ------
+    NotImplementedError
+        If `doc_format` is not 'numpy' or 'code'.
+    SyntaxError
+        If the code cannot be parsed.
+    """
+    if doc_format not in FORMATS:
+        raise NotImplementedError('Only the format numpy is supported at the moment.')
+    if times is None:
+        times = dict.fromkeys(STAGES, 0.0)
+    start_time = time.perf_counter()
+    newline = _newline(code)
+    literals = _select(pydocstring.source.extract_docstrings(code), lines)
+    times['extract'] += time.perf_counter() - start_time
+    edits = [_render(code, literal, doc_format, width, tabsize, newline, times)
+             for literal in literals]
+    start_time = time.perf_counter()
+    code = pydocstring.source.splice(code, edits)
+    times['splice'] += time.perf_counter() - start_time
+    return code, len(edits)
+
+
+def convert_file(filename, doc_format, width=None, tabsize=None, write=True, cache=None,
+                 lines=None, stream=None, checkpoint=None):
+    """Convert the docstrings of a file.
+
+    File is not rewritten (nor backed up) if its docstrings are already in the given format. If a
+    cache is given, such files are found from the hash of their contents, without being parsed.
+    Large files are streamed rather than read into memory (see `_convert_mapped`).
 
     Parameters
     ----------
     filename : str
         Name of the file.
-    doc_format : {'numpy', 'google', 'rst', 'code'}
-        Format of the new docstring.
+    doc_format : {'numpy', 'code'}
+        Format of the new docstrings.
+    width : int
+        Maximum line length.
+        Default is 100.
+    tabsize : int
+        Number of spaces in a tab.
+        Default is 4.
+    write : bool
+        True if the file is overwritten (and backed up at `filename + '.bak'`).
+        Default is True.
+    cache : {pydocstring.cache.ConversionCache, None}
+        Cache of the conversions.
+        Conversions of parts of the file (see `lines`) are not stored in the cache.
+        Default is no cache.
+    lines : {list of 2-tuple of int, None}
+        First and last line numbers of the regions whose docstrings are converted.
+        Default is all docstrings.
+    stream : {bool, None}
+        True if the file is memory-mapped and the converted file is streamed to the disk (see
+        `_convert_mapped`). Ignored if the file is not overwritten.
+        Default is streaming the files of at least `STREAM_SIZE` bytes.
+    checkpoint : {pydocstring.checkpoint.Checkpoint, None}
+        Manifest of the converted files of a batch run. File is skipped if it is recorded with its
+        current contents, and is recorded once it is written. Ignored if the file is not
+        overwritten.
+        Default is no manifest.
+
+    Returns
+    -------
+    result : dict
+        Result of the conversion, with the keys
+        'filename' (name of the file), 'docstrings' (number of docstrings), 'bytes' (size of the
+        file), 'bytes_out' (size of the converted file), 'code' (converted code, or None if the
+        file is overwritten), 'changed' (True if the converted code is different), 'cached' (True
+        if the conversion is found in the cache), 'cache_entries' (list of the keys and values of
+        the conversions that are stored in the cache), 'times' (time in seconds of each stage of
+        `STAGES` and of the whole conversion, 'total'), and 'error' (None).
 
     Raises
     ------
-    ValueError
-        If the number of docstrings from `from_docstring` and `to_docstring` does not match.
     NotImplementedError
-        If `doc_format` is not 'numpy'
+        If `doc_format` is not 'numpy' or 'code'.
+    SyntaxError
+        If the file cannot be parsed.
     """
     if width is None:
         width = 100
     if tabsize is None:
         tabsize = 4
+    size = os.path.getsize(filename)
+    if stream is None:
+        stream = size >= STREAM_SIZE
+    # NOTE: empty files cannot be memory-mapped
+    if stream and write and size > 0:
+        return _convert_mapped(filename, doc_format, width, tabsize, cache=cache, lines=lines,
+                               checkpoint=checkpoint)
 
-    # FIXME: add import
-    old_docstrings = extract_docstring(filename)
-
-    # read code
-    with open(filename, 'r') as f:
-        code = f.read()
-
-    for old in old_docstrings:
-        doc_data = pydocstring.numpy_docstring.parse_numpy(old)
-        doc_instance = pydocstring.docstring.Docstring(**doc_data)
-        # extract details surrounding docstring (quotes, raw string, indentation)
-        re_old = r'( *)(r)?([\'"]+{0}\s*[\'"]+)'.format(re.escape(old))
-        details = re.search(re_old, code)
-        # FIXME: this will give weird results if given tabsize and tabsize of the file is
-        #        different
-        indent_level = len(details.group(1)) // tabsize
-        is_raw = details.group(2) == 'r'
-        if doc_format == 'numpy':
-            new = doc_instance.make_numpy(width=width, indent_level=indent_level,
-                                          tabsize=tabsize, is_raw=is_raw)
-        elif doc_format == 'code':
-            new = doc_instance.make_code(width=width, indent_level=indent_level,
-                                         tabsize=tabsize)
-        else:
-            raise NotImplementedError('Only the format numpy is supported at the moment.')
-        code = re.sub(re_old, new, code)
+    times = dict.fromkeys(STAGES, 0.0)
+    start_time = time.perf_counter()
+    with open(filename, 'rb') as f:
+        data = f.read()
+    code, encoding = pydocstring.source.decode_source(data)
+    result = {'filename': filename, 'docstrings': 0, 'bytes': len(data), 'bytes_out': len(data),
+              'code': code, 'changed': False, 'cached': False, 'cache_entries': [],
+              'times': times, 'error': None}
+    times['read'] = time.perf_counter() - start_time
+
+    if cache is not None or checkpoint is not None:
+        cache_time = time.perf_counter()
+        input_hash = hashlib.sha256(data).hexdigest()
+        value = None
+        if checkpoint is not None and write:
+            value = checkpoint.get(filename)
+        # NOTE: file that is recorded with its contents is not recorded again
+        is_recorded = value is not None and value['output'] == input_hash
+        if cache is not None and not is_recorded:
+            key = cache.key(data, format=doc_format, width=width, tabsize=tabsize)
+            value = cache.get(key)
+        times['cache'] += time.perf_counter() - cache_time
+        if value is not None and value['output'] == input_hash:
+            result.update(docstrings=value['docstrings'], cached=True)
+            if write:
+                result['code'] = None
+                if checkpoint is not None and not is_recorded:
+                    checkpoint.add(filename, input_hash, value['docstrings'])
+            times['total'] = time.perf_counter() - start_time
+            return result
+
+    new_code, num_docstrings = convert_source(code, doc_format, width=width, tabsize=tabsize,
+                                              lines=lines, times=times)
+    result.update(docstrings=num_docstrings, code=new_code, changed=new_code != code)
+    new_data = data
+    if result['changed']:
+        new_data = new_code.encode(encoding)
+        result['bytes_out'] = len(new_data)
+    if cache is not None or checkpoint is not None:
+        output_hash = input_hash
+        if result['changed']:
+            output_hash = hashlib.sha256(new_data).hexdigest()
+    if cache is not None and lines is None:
+        cache_time = time.perf_counter()
+        value = {'output': output_hash, 'docstrings': num_docstrings}
+        cache.set(key, value)
+        result['cache_entries'].append((key, value))
+        # NOTE: converted code is cached as converted (so that it is skipped in the next run) only
+        #       if its conversion does not change it
+        if result['changed'] and write:
+            if convert_source(new_code, doc_format, width=width, tabsize=tabsize)[0] == new_code:
+                new_key = cache.key(new_data, format=doc_format, width=width, tabsize=tabsize)
+                new_value = {'output': output_hash, 'docstrings': num_docstrings}
+                cache.set(new_key, new_value)
+                result['cache_entries'].append((new_key, new_value))
+        times['cache'] += time.perf_counter() - cache_time
 
     # write code
     if write:
-        # make backup
+        write_time = time.perf_counter()
+        if result['changed']:
+            # make backup
+            shutil.copyfile(filename, filename + '.bak')
+            # over write (through a temporary file, so that the file is never partially written)
+            descriptor, temp_filename = _temp_file(filename)
+            try:
+                with os.fdopen(descriptor, 'wb') as f:
+                    f.write(new_data)
+                shutil.copymode(filename, temp_filename)
+                os.replace(temp_filename, filename)
+            except BaseException:
+                os.remove(temp_filename)
+                raise
+        result['code'] = None
+        if checkpoint is not None:
+            checkpoint.add(filename, output_hash, num_docstrings)
+        times['write'] = time.perf_counter() - write_time
+    times['total'] = time.perf_counter() - start_time
+    return result
+
+
+def _temp_file(filename):
+    """Create a temporary file that can replace the file and return its descriptor and its name."""
+    return tempfile.mkstemp(prefix='.{0}.'.format(os.path.basename(filename)), suffix='.tmp',
+                            dir=os.path.dirname(filename) or os.curdir)
+
+
+def _convert_mapped(filename, doc_format, width, tabsize, cache=None, lines=None,
+                    checkpoint=None):
+    """Convert the docstrings of a memory-mapped file and stream the converted file to the disk.
+
+    File is never held in memory. Docstrings are located in the mapped file as it is tokenized (see
+    `pydocstring.source.scan_docstrings`), and the unchanged regions of the file and the new
+    docstrings are written to a temporary file in the same directory. Once it is complete, the
+    temporary file atomically replaces the file (after its backup). Memory of the conversion is
+    then about a few times the size of the largest docstring.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file.
+    doc_format : {'numpy', 'code'}
+        Format of the new docstrings.
+    width : int
+        Maximum line length.
+    tabsize : int
+        Number of spaces in a tab.
+    cache : {pydocstring.cache.ConversionCache, None}
+        Cache of the conversions.
+        Converted file is not stored in the cache (it is not converted again to check that its
+        conversion does not change it).
+        Default is no cache.
+    lines : {list of 2-tuple of int, None}
+        First and last line numbers of the regions whose docstrings are converted.
+        Default is all docstrings.
+    checkpoint : {pydocstring.checkpoint.Checkpoint, None}
+        Manifest of the converted files of a batch run (see `convert_file`).
+        Default is no manifest.
+
+    Returns
+    -------
+    result : dict
+        Result of the conversion (see `convert_file`), where 'code' is None.
+
+    Raises
+    ------
+    NotImplementedError
+        If `doc_format` is not 'numpy' or 'code'.
+    SyntaxError
+        If the file cannot be tokenized.
+    ValueError
+        If the newlines of the file are carriage returns (which are not lines of a memory map).
+    """
+    if doc_format not in FORMATS:
+        raise NotImplementedError('Only the format numpy is supported at the moment.')
+
+    times = dict.fromkeys(STAGES, 0.0)
+    start_time = time.perf_counter()
+    result = {'filename': filename, 'docstrings': 0, 'bytes': 0, 'bytes_out': 0, 'code': None,
+              'changed': False, 'cached': False, 'cache_entries': [], 'times': times,
+              'error': None}
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        result['bytes'] = len(data)
+        encoding, _ = tokenize.detect_encoding(data.readline)
+        data.seek(0)
+        # NOTE: byte order mark is only at the start of the file
+        codec = 'utf-8' if encoding == 'utf-8-sig' else encoding
+        newline = re.search(rb'\r\n|\r|\n', data)
+        newline = newline.group().decode() if newline else '\n'
+        if newline == '\r':
+            raise ValueError('Files whose newlines are carriage returns cannot be streamed.')
+        times['read'] = time.perf_counter() - start_time
+
+        if cache is not None or checkpoint is not None:
+            cache_time = time.perf_counter()
+            input_hash = hashlib.sha256(data).hexdigest()
+            value = None if checkpoint is None else checkpoint.get(filename)
+            # NOTE: file that is recorded with its contents is not recorded again
+            is_recorded = value is not None and value['output'] == input_hash
+            if cache is not None:
+                key = cache.key(data, format=doc_format, width=width, tabsize=tabsize)
+                if not is_recorded:
+                    value = cache.get(key)
+            times['cache'] += time.perf_counter() - cache_time
+            if value is not None and value['output'] == input_hash:
+                result.update(docstrings=value['docstrings'], cached=True, bytes_out=len(data))
+                if checkpoint is not None and not is_recorded:
+                    checkpoint.add(filename, input_hash, value['docstrings'])
+                times['total'] = time.perf_counter() - start_time
+                return result
+
+        output_hash = hashlib.sha256()
+        descriptor, temp_filename = _temp_file(filename)
+        try:
+            with os.fdopen(descriptor, 'wb') as temp, memoryview(data) as view:
+
+                def copy(start, end):
+                    """Write the region of the file to the temporary file."""
+                    output_hash.update(view[start:end])
+                    temp.write(view[start:end])
+                    result['bytes_out'] += end - start
+
+                position = 0
+                literals = pydocstring.source.scan_docstrings(data.readline)
+                while True:
+                    extract_time = time.perf_counter()
+                    literal = next(literals, None)
+                    times['extract'] += time.perf_counter() - extract_time
+                    if literal is None:
+                        break
+                    if not _select([literal], lines):
+                        continue
+                    # docstring (and the indentation before it, if it starts the line)
+                    window_start = literal.start
+                    indent = literal.indent.encode(codec)
+                    if indent and view[literal.start - len(indent):literal.start] == indent:
+                        window_start -= len(indent)
+                    window = bytes(view[window_start:literal.end]).decode(codec)
+                    local_literal = pydocstring.source.DocstringLiteral(
+                        literal.name, literal.kind, literal.docstring,
+                        len(literal.indent) if window_start < literal.start else 0, len(window),
+                        literal.lineno, literal.end_lineno, literal.prefix, literal.quote,
+                        literal.indent
+                    )
+                    start, _, new = _render(window, local_literal, doc_format, width, tabsize,
+                                            newline, times)
+                    splice_time = time.perf_counter()
+                    start = window_start + len(window[:start].encode(codec))
+                    if start < position:
+                        raise ValueError('Docstrings overlap.')
+                    new = new.encode(codec)
+                    result['changed'] |= view[start:literal.end] != new
+                    copy(position, start)
+                    output_hash.update(new)
+                    temp.write(new)
+                    result['bytes_out'] += len(new)
+                    result['docstrings'] += 1
+                    position = literal.end
+                    times['splice'] += time.perf_counter() - splice_time
+                splice_time = time.perf_counter()
+                copy(position, len(data))
+                times['splice'] += time.perf_counter() - splice_time
+        except BaseException:
+            os.remove(temp_filename)
+            raise
+
+        if cache is not None and lines is None:
+            cache_time = time.perf_counter()
+            value = {'output': output_hash.hexdigest(), 'docstrings': result['docstrings']}
+            cache.set(key, value)
+            result['cache_entries'].append((key, value))
+            times['cache'] += time.perf_counter() - cache_time
+
+    # replace the file
+    write_time = time.perf_counter()
+    if result['changed']:
         shutil.copyfile(filename, filename + '.bak')
-        # over write
-        with open(filename, 'w') as f:
-            f.write(code)
+        shutil.copymode(filename, temp_filename)
+        os.replace(temp_filename, filename)
     else:
-        print(code)
+        os.remove(temp_filename)
+    if checkpoint is not None:
+        checkpoint.add(filename, output_hash.hexdigest(), result['docstrings'])
+    times['write'] = time.perf_counter() - write_time
+    times['total'] = time.perf_counter() - start_time
+    return result
+
+
+def convert_stream(input, output, doc_format, width=None, tabsize=None, lines=None):
+    """Convert the docstrings of the code that is read from a file and write it to another file.
+
+    Used as a filter (e.g. of the standard input to the standard output). Code is neither imported
+    nor written to a temporary file: docstrings are located as the code is tokenized (see
+    `pydocstring.source.scan_docstrings`), and the code is written as soon as no docstring can start
+    in it, so that the memory is about the size of the largest statement. If the conversion fails,
+    the rest of the code is written unchanged, so that the output is always the whole code.
+
+    Parameters
+    ----------
+    input : file
+        Binary file from which the code is read.
+    output : file
+        Binary file to which the converted code is written.
+    doc_format : {'numpy', 'code'}
+        Format of the new docstrings.
+    width : int
+        Maximum line length.
+        Default is 100.
+    tabsize : int
+        Number of spaces in a tab.
+        Default is 4.
+    lines : {list of 2-tuple of int, None}
+        First and last line numbers of the regions whose docstrings are converted.
+        Default is all docstrings.
+
+    Returns
+    -------
+    result : dict
+        Result of the conversion (see `convert_file`), where 'filename' is '-' and 'code' is None.
+
+    Raises
+    ------
+    NotImplementedError
+        If `doc_format` is not 'numpy' or 'code'.
+    SyntaxError
+        If the code cannot be tokenized.
+    ValueError
+        If the newlines of the code are carriage returns or if a docstring cannot be converted.
+    Exception
+        Any other error of the conversion of a docstring (e.g. TypeError).
+    """
+    if doc_format not in FORMATS:
+        raise NotImplementedError('Only the format numpy is supported at the moment.')
+    if width is None:
+        width = 100
+    if tabsize is None:
+        tabsize = 4
+
+    times = dict.fromkeys(STAGES, 0.0)
+    start_time = time.perf_counter()
+    result = {'filename': '-', 'docstrings': 0, 'bytes': 0, 'bytes_out': 0, 'code': None,
+              'changed': False, 'cached': False, 'cache_entries': [], 'times': times,
+              'error': None}
+    # code that is read but not written yet, from `state['position']`
+    buffer = bytearray()
+    state = {'position': 0, 'newline': None}
+
+    def readline():
+        """Read the next line of the code and keep it until it is written."""
+        read_time = time.perf_counter()
+        line = input.readline()
+        buffer.extend(line)
+        result['bytes'] += len(line)
+        if state['newline'] is None:
+            newline = re.search(rb'\r\n|\r|\n', line)
+            state['newline'] = newline and newline.group().decode()
+        times['read'] += time.perf_counter() - read_time
+        return line
+
+    def write(position, data=b''):
+        """Write the code up to the position, then the data, and forget the written code."""
+        write_time = time.perf_counter()
+        size = position - state['position']
+        output.write(buffer[:size])
+        output.write(data)
+        del buffer[:size]
+        state['position'] = position
+        result['bytes_out'] += size + len(data)
+        times['write'] += time.perf_counter() - write_time
+
+    def release(position):
+        """Write the code before the position, in which no docstring starts."""
+        if position > state['position']:
+            write(position)
+
+    try:
+        # NOTE: lines that are read to detect the encoding are tokenized again
+        head = []
+        encoding, _ = tokenize.detect_encoding(lambda: head.append(readline()) or head[-1])
+        codec = 'utf-8' if encoding == 'utf-8-sig' else encoding
+        if state['newline'] == '\r':
+            raise ValueError('Code whose newlines are carriage returns cannot be streamed.')
+
+        literals = pydocstring.source.scan_docstrings(
+            lambda: head.pop(0) if head else readline(), release
+        )
+        while True:
+            extract_time = time.perf_counter()
+            other_time = times['read'] + times['write']
+            literal = next(literals, None)
+            times['extract'] += (time.perf_counter() - extract_time
+                                 - (times['read'] + times['write'] - other_time))
+            if literal is None:
+                break
+            if not _select([literal], lines):
+                continue
+            # docstring (and the indentation before it, if it starts the line)
+            window_start = literal.start
+            indent = literal.indent.encode(codec)
+            offset = literal.start - state['position']
+            if indent and buffer[offset - len(indent):offset] == indent:
+                window_start -= len(indent)
+            window = buffer[window_start - state['position']:literal.end - state['position']]
+            window = window.decode(codec)
+            local_literal = pydocstring.source.DocstringLiteral(
+                literal.name, literal.kind, literal.docstring,
+                len(literal.indent) if window_start < literal.start else 0, len(window),
+                literal.lineno, literal.end_lineno, literal.prefix, literal.quote, literal.indent
+            )
+            start, _, new = _render(window, local_literal, doc_format, width, tabsize,
+                                    state['newline'] or '\n', times)
+            splice_time = time.perf_counter()
+            start = window_start + len(window[:start].encode(codec))
+            if start < state['position']:
+                raise ValueError('Docstrings overlap.')
+            new = new.encode(codec)
+            result['changed'] |= buffer[start - state['position']:
+                                        literal.end - state['position']] != new
+            result['docstrings'] += 1
+            times['splice'] += time.perf_counter() - splice_time
+            write(start, new)
+            # replaced docstring is not written
+            del buffer[:literal.end - start]
+            state['position'] = literal.end
+        write(state['position'] + len(buffer))
+    except Exception:
+        # rest of the code is written unchanged (whatever the error, e.g. TypeError of a section
+        # that cannot be parsed)
+        write(state['position'] + len(buffer))
+        shutil.copyfileobj(input, output)
+        raise
+    times['total'] = time.perf_counter() - start_time
+    return result
+
+
+def replace_docstrings(filename, doc_format, width=None, tabsize=None, write=True):
+    """Replace the specified docstrings from a file to another docstring.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file.
+    doc_format : {'numpy', 'code'}
+        Format of the new docstring.
+    width : int
+        Maximum line length.
+        Default is 100.
+    tabsize : int
+        Number of spaces in a tab.
+        Default is 4.
+    write : bool
+        True if the file is overwritten (and backed up at `filename + '.bak'`).
+        False if the new code is printed.
+        Default is True.
+
+    Raises
+    ------
+    NotImplementedError
+        If `doc_format` is not 'numpy' or 'code'.
+    """
+    result = convert_file(filename, doc_format, width=width, tabsize=tabsize, write=write)
+    if not write:
+        print(result['code'])
+
+
+def check_file(filename, doc_format, width=None, tabsize=None, max_differences=None, cache=None,
+               lines=None):
+    """Check that the docstrings of a file are in the given format.
+
+    File is not modified. If a cache is given, files that are known to be in the format are not
+    parsed, and files that are found to be in the format are stored in the cache.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file.
+    doc_format : {'numpy', 'code'}
+        Format of the docstrings.
+    width : int
+        Maximum line length.
+        Default is 100.
+    tabsize : int
+        Number of spaces in a tab.
+        Default is 4.
+    max_differences : {int, None}
+        Number of differences after which the check stops.
+        Default is no limit.
+    cache : {pydocstring.cache.ConversionCache, None}
+        Cache of the conversions.
+        Checks of parts of the file (see `lines`) are not stored in the cache.
+        Default is no cache.
+    lines : {list of 2-tuple of int, None}
+        First and last line numbers of the regions whose docstrings are checked.
+        Default is all docstrings.
+
+    Returns
+    -------
+    result : dict
+        Result of the check, with the same keys as the result of `convert_file` (where 'code' is
+        None and 'changed' is True if the file would be changed) and 'differences' (list of the
+        line numbers and the names of the docstrings that are not in the format).
+        If the check stops early, 'docstrings' is the number of docstrings that were checked.
+
+    Raises
+    ------
+    NotImplementedError
+        If `doc_format` is not 'numpy' or 'code'.
+    SyntaxError
+        If the file cannot be parsed.
+    """
+    if width is None:
+        width = 100
+    if tabsize is None:
+        tabsize = 4
+
+    times = dict.fromkeys(STAGES, 0.0)
+    start_time = time.perf_counter()
+    with open(filename, 'rb') as f:
+        data = f.read()
+    result = {'filename': filename, 'docstrings': 0, 'bytes': len(data), 'bytes_out': len(data),
+              'code': None, 'changed': False, 'cached': False, 'cache_entries': [],
+              'differences': [], 'times': times, 'error': None}
+    times['read'] = time.perf_counter() - start_time
+
+    if cache is not None:
+        cache_time = time.perf_counter()
+        key = cache.key(data, format=doc_format, width=width, tabsize=tabsize)
+        value = cache.get(key)
+        input_hash = hashlib.sha256(data).hexdigest()
+        times['cache'] += time.perf_counter() - cache_time
+        if value is not None and value['output'] == input_hash:
+            result.update(docstrings=value['docstrings'], cached=True)
+            times['total'] = time.perf_counter() - start_time
+            return result
+
+    extract_time = time.perf_counter()
+    code, _ = pydocstring.source.decode_source(data)
+    literals = _select(pydocstring.source.extract_docstrings(code), lines)
+    newline = _newline(code)
+    times['extract'] = time.perf_counter() - extract_time
+    for literal in literals:
+        result['docstrings'] += 1
+        start, end, new = _render(code, literal, doc_format, width, tabsize, newline, times)
+        if code[start:end] != new:
+            result['differences'].append((literal.lineno, literal.name))
+            if max_differences is not None and len(result['differences']) >= max_differences:
+                break
+    result['changed'] = bool(result['differences'])
+
+    if cache is not None and lines is None and not result['changed']:
+        cache_time = time.perf_counter()
+        value = {'output': input_hash, 'docstrings': len(literals)}
+        cache.set(key, value)
+        result['cache_entries'].append((key, value))
+        times['cache'] += time.perf_counter() - cache_time
+    times['total'] = time.perf_counter() - start_time
+    return result
+
+
+def _matches(path, patterns):
+    """Return True if the path, one of its trailing parts, or one of its components matches.
+
+    Parameters
+    ----------
+    path : str
+        Path (with `/` as the separator).
+    patterns : list of str
+        Glob patterns (see `fnmatch`).
+
+    Returns
+    -------
+    matches : bool
+        True if one of the patterns matches the path, e.g. `pkg/sub/mod.py` is matched by
+        `pkg/*/mod.py`, `sub/*.py`, and `sub`.
+    """
+    parts = path.split('/')
+    candidates = ['/'.join(parts[i:]) for i in range(len(parts))] + parts[:-1]
+    return any(fnmatch.fnmatchcase(candidate, pattern)
+               for pattern in patterns for candidate in candidates)
+
+
+def find_files(paths, include=('*.py',), exclude=(), files_from=None):
+    """Return the Python files of the given files, directories, and glob patterns.
 
+    Directories are walked recursively and glob patterns are expanded (`**` matches any number of
+    directories). Files that are found this way are kept if they match one of the `include`
+    patterns and none of the `exclude` patterns. Files that are given explicitly are only filtered
+    by `exclude`. Patterns are matched against the path relative to the given directory (or the
+    path as given), its trailing parts, and each of its components, e.g. `sub/*.py` includes the
+    Python files in the directories named `sub` and `build` excludes all files in the directories
+    named `build`.
 
-def main():
+    Parameters
+    ----------
+    paths : list of str
+        Files, directories, and glob patterns.
+    include : list of str
+        Glob patterns of the files that are included.
+        Default is Python files.
+    exclude : list of str
+        Glob patterns of the files and directories that are excluded.
+        Default is no patterns.
+    files_from : str
+        Name of a file that lists more paths, one per line.
+        Empty lines and lines that start with `#` are ignored.
+
+    Returns
+    -------
+    filenames : list of str
+        Names of the files, sorted and without duplicates.
+
+    Raises
+    ------
+    FileNotFoundError
+        If a path does not exist and does not match any file.
+    """
+    paths = list(paths)
+    if files_from is not None:
+        with open(files_from) as f:
+            paths += [line.strip() for line in f
+                      if line.strip() and not line.lstrip().startswith('#')]
+
+    filenames = {}
+    for path in paths:
+        if os.path.isfile(path):
+            if not _matches(path.replace(os.sep, '/'), exclude):
+                filenames.setdefault(os.path.normpath(path), None)
+            continue
+        if os.path.isdir(path):
+            candidates = [path]
+        else:
+            candidates = sorted(glob.glob(path, recursive=True))
+            if not candidates:
+                raise FileNotFoundError('No such file or directory: {0}'.format(path))
+        for candidate in candidates:
+            if not os.path.isdir(candidate):
+                relpath = candidate.replace(os.sep, '/')
+                if _matches(relpath, include) and not _matches(relpath, exclude):
+                    filenames.setdefault(os.path.normpath(candidate), None)
+                continue
+            for dirpath, dirnames, files in os.walk(candidate):
+                reldir = os.path.relpath(dirpath, candidate).replace(os.sep, '/')
+                reldir = '' if reldir == '.' else reldir + '/'
+                dirnames[:] = [name for name in dirnames
+                               if not _matches(reldir + name, exclude)]
+                for name in files:
+                    relpath = reldir + name
+                    if _matches(relpath, include) and not _matches(relpath, exclude):
+                        filenames.setdefault(os.path.normpath(os.path.join(dirpath, name)), None)
+    return sorted(filenames)
+
+
+def filter_files(filenames, paths=(), include=('*.py',), exclude=()):
+    """Return the files that are in the given paths and that match the given patterns.
+
+    Parameters
+    ----------
+    filenames : list of str
+        Names of the files.
+    paths : list of str
+        Files, directories, and glob patterns that contain the selected files.
+        Default is all files.
+    include : list of str
+        Glob patterns of the files that are included (see `find_files`).
+        Default is Python files.
+    exclude : list of str
+        Glob patterns of the files and directories that are excluded (see `find_files`).
+        Default is no patterns.
+
+    Returns
+    -------
+    filenames : list of str
+        Names of the selected files, in the given order.
+    """
+    paths = [os.path.abspath(path) for path in paths]
+
+    def is_in_paths(filename):
+        """Return True if the file is one of the paths or is in one of them."""
+        if not paths:
+            return True
+        filename = os.path.abspath(filename)
+        return any(filename == path or filename.startswith(os.path.join(path, ''))
+                   or fnmatch.fnmatchcase(filename, path) for path in paths)
+
+    output = []
+    for filename in filenames:
+        relpath = filename.replace(os.sep, '/')
+        if (is_in_paths(filename) and _matches(relpath, include)
+                and not _matches(relpath, exclude)):
+            output.append(filename)
+    return output
+
+
+def shard_files(filenames, index, count):
+    """Return the files of one shard of the files, so that the shards have about the same size.
+
+    Files are assigned to the shards from the largest to the smallest, each to the shard that is
+    the smallest so far. Assignment only depends on the names and the sizes of the files (not on
+    their order), so that each machine of a batch conversion can find its own shard.
+
+    Parameters
+    ----------
+    filenames : list of str
+        Names of the files.
+    index : int
+        Index of the shard (from 1 to `count`).
+    count : int
+        Number of the shards.
+
+    Returns
+    -------
+    filenames : list of str
+        Names of the files of the shard, in the order of `filenames`.
+
+    Raises
+    ------
+    ValueError
+        If the index is not between 1 and the number of the shards.
+    """
+    if not 1 <= index <= count:
+        raise ValueError('Index of the shard must be between 1 and {0}.'.format(count))
+    sizes = {}
+    for filename in filenames:
+        try:
+            # NOTE: files are counted as one byte more, so that empty files are spread too
+            sizes[filename] = os.path.getsize(filename) + 1
+        except OSError:
+            sizes[filename] = 1
+    # loads and indices of the shards
+    shards = [(0, i) for i in range(1, count + 1)]
+    assignment = {}
+    for filename in sorted(sizes, key=lambda filename: (-sizes[filename], filename)):
+        load, i = heapq.heappop(shards)
+        assignment[filename] = i
+        heapq.heappush(shards, (load + sizes[filename], i))
+    return [filename for filename in filenames if assignment[filename] == index]
+
+
+# cache of the conversions and manifest of the converted files in the worker processes of
+# _map_files
+_worker_cache = None
+_worker_checkpoint = None
+
+
+def _init_worker(cache, checkpoint=None):
+    """Initialize a worker process of `_map_files` with the cache and the manifest."""
+    global _worker_cache, _worker_checkpoint
+    _worker_cache = cache
+    _worker_checkpoint = checkpoint
+
+
+def _call_safe(function, filename, cache=None, **kwargs):
+    """Call the function on the file and return any error rather than raising it.
+
+    Used by the workers of `convert_files` and `check_files` (see `convert_file` and
+    `check_file`). If no cache is given, the cache of the worker is used, and the manifest of the
+    worker is given to the function if it has one.
+    """
+    if cache is None:
+        cache = _worker_cache
+    if _worker_checkpoint is not None:
+        kwargs.setdefault('checkpoint', _worker_checkpoint)
+    try:
+        return function(filename, cache=cache, **kwargs)
+    except Exception as error:
+        # NOTE: any error of a file (e.g. TypeError of a docstring that cannot be parsed) is only
+        #       the failure of that file
+        return _error_result(filename, error)
+
+
+def _error_result(filename, error):
+    """Return the result of a file whose conversion (or check) failed with the error."""
+    return {'filename': filename, 'docstrings': 0, 'bytes': 0, 'bytes_out': 0, 'code': None,
+            'changed': False, 'cached': False, 'cache_entries': [], 'differences': [],
+            'times': None, 'error': '{0}: {1}'.format(type(error).__name__, error)}
+
+
+def _map_files(function, filenames, jobs=1, cache=None, stop=None, file_kwargs=None,
+               checkpoint=None, **kwargs):
+    """Call the function on each file, in parallel, and yield the results in the order of the files.
+
+    Files are given to a pool of processes, the largest files first, so that the workers end at
+    about the same time. Results are yielded in the order of the files, so they do not depend on
+    the number of workers.
+
+    Parameters
+    ----------
+    function : {convert_file, check_file}
+        Function that is called with the name of the file, `cache`, and `kwargs`.
+    filenames : list of str
+        Names of the files.
+    jobs : int
+        Number of processes.
+        If 1, files are processed in this process (in order).
+        If 0 or None, the number of CPUs is used.
+        Default is 1.
+    cache : {pydocstring.cache.ConversionCache, None}
+        Cache of the conversions.
+        New conversions of the workers are stored in the cache (but are not saved to disk).
+        Default is no cache.
+    stop : {function, None}
+        Function that returns True if the files after the given result do not need to be processed.
+        Files that have not been started are cancelled.
+        Default is processing all files.
+    file_kwargs : {dict of str to dict, None}
+        Names of the files to the keyword arguments of the function that are specific to the file.
+        Default is no specific arguments.
+    checkpoint : {pydocstring.checkpoint.Checkpoint, None}
+        Manifest of the converted files, given to the function as `checkpoint` (once to each
+        worker, like the cache).
+        Default is no manifest.
+    kwargs : dict
+        Keyword arguments of the function.
+
+    Yields
+    ------
+    result : dict
+        Result of the file.
+    """
+    if not jobs:
+        jobs = os.cpu_count() or 1
+    if file_kwargs is None:
+        file_kwargs = {}
+    filenames = list(dict.fromkeys(filenames))
+    if jobs == 1 or len(filenames) <= 1:
+        if checkpoint is not None:
+            kwargs['checkpoint'] = checkpoint
+        for filename in filenames:
+            result = _call_safe(function, filename, cache=cache, **kwargs,
+                                **file_kwargs.get(filename, {}))
+            yield result
+            if stop is not None and stop(result):
+                return
+        return
+
+    def size(filename):
+        """Return the size of the file (0 if it cannot be accessed)."""
+        try:
+            return os.path.getsize(filename)
+        except OSError:
+            return 0
+
+    # largest first (ties in the order of the names)
+    order = sorted(filenames, key=lambda filename: (-size(filename), filename))
+    # NOTE: cache is sent once to each worker and the new entries are sent back in the results
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(jobs, len(filenames)),
+                                                initializer=_init_worker,
+                                                initargs=(cache, checkpoint)) as pool:
+        futures = {filename: pool.submit(_call_safe, function, filename, **kwargs,
+                                         **file_kwargs.get(filename, {}))
+                   for filename in order}
+        try:
+            for filename in filenames:
+                result = futures[filename].result()
+                if cache is not None:
+                    for key, value in result['cache_entries']:
+                        cache.set(key, value)
+                yield result
+                if stop is not None and stop(result):
+                    return
+        finally:
+            for future in futures.values():
+                future.cancel()
+
+
+def _lines_kwargs(lines):
+    """Return the keyword arguments of each file for the given regions of the files.
+
+    Parameters
+    ----------
+    lines : {dict of str to {list of 2-tuple of int, None}, None}
+        Names of the files to the regions of the files.
+
+    Returns
+    -------
+    file_kwargs : dict of str to dict
+        Names of the files to the keyword argument `lines` (see `_map_files`).
+    """
+    return {filename: {'lines': ranges} for filename, ranges in (lines or {}).items()}
+
+
+def convert_files(filenames, doc_format, width=None, tabsize=None, write=True, jobs=1,
+                  cache=None, lines=None, checkpoint=None):
+    """Convert the docstrings of many files, in parallel.
+
+    Files are converted in a pool of processes, the largest files first, so that the workers end
+    at about the same time. Results do not depend on the number of workers.
+
+    Parameters
+    ----------
+    filenames : list of str
+        Names of the files.
+    doc_format : {'numpy', 'code'}
+        Format of the new docstrings.
+    width : int
+        Maximum line length.
+        Default is 100.
+    tabsize : int
+        Number of spaces in a tab.
+        Default is 4.
+    write : bool
+        True if the files are overwritten (and backed up).
+        Default is True.
+    jobs : int
+        Number of processes.
+        If 1, files are converted in this process.
+        If 0 or None, the number of CPUs is used.
+        Default is 1.
+    cache : {pydocstring.cache.ConversionCache, None}
+        Cache of the conversions.
+        New conversions are stored in the cache (but are not saved to disk).
+        Default is no cache.
+    lines : {dict of str to {list of 2-tuple of int, None}, None}
+        Names of the files to the first and last line numbers of the regions whose docstrings are
+        converted (see `convert_file`).
+        Default is all docstrings of all files.
+    checkpoint : {pydocstring.checkpoint.Checkpoint, None}
+        Manifest of the converted files (see `convert_file`). Files that are recorded with their
+        current contents are skipped (as cached), and each file is recorded once it is written.
+        Default is no manifest.
+
+    Returns
+    -------
+    results : list of dict
+        Results of the conversion of each file (see `convert_file`), in the order of `filenames`
+        (without duplicates).
+        If a file cannot be converted, its 'error' is the description of the error.
+
+    Raises
+    ------
+    NotImplementedError
+        If `doc_format` is not 'numpy' or 'code'.
+    """
+    if doc_format not in FORMATS:
+        raise NotImplementedError('Only the format numpy is supported at the moment.')
+    return list(_map_files(convert_file, filenames, jobs=jobs, cache=cache,
+                           file_kwargs=_lines_kwargs(lines), checkpoint=checkpoint,
+                           doc_format=doc_format, width=width, tabsize=tabsize, write=write))
+
+
+def check_files(filenames, doc_format, width=None, tabsize=None, max_differences=None, jobs=1,
+                cache=None, lines=None):
+    """Check that the docstrings of many files are in the given format, in parallel.
+
+    Files are checked in the order of `filenames` (see `convert_files` for the parallelization)
+    until the given number of differences is found, so that the differences that are found do not
+    depend on the number of workers.
+
+    Parameters
+    ----------
+    filenames : list of str
+        Names of the files.
+    doc_format : {'numpy', 'code'}
+        Format of the docstrings.
+    width : int
+        Maximum line length.
+        Default is 100.
+    tabsize : int
+        Number of spaces in a tab.
+        Default is 4.
+    max_differences : {int, None}
+        Number of differences after which the check stops.
+        Default is no limit.
+    jobs : int
+        Number of processes.
+        If 1, files are checked in this process.
+        If 0 or None, the number of CPUs is used.
+        Default is 1.
+    cache : {pydocstring.cache.ConversionCache, None}
+        Cache of the conversions.
+        Files that are found to be in the format are stored in the cache (but are not saved to
+        disk).
+        Default is no cache.
+    lines : {dict of str to {list of 2-tuple of int, None}, None}
+        Names of the files to the first and last line numbers of the regions whose docstrings are
+        checked (see `check_file`).
+        Default is all docstrings of all files.
+
+    Returns
+    -------
+    results : list of dict
+        Results of the check of each file (see `check_file`) that was checked, in the order of
+        `filenames`.
+        If a file cannot be checked, its 'error' is the description of the error.
+
+    Raises
+    ------
+    NotImplementedError
+        If `doc_format` is not 'numpy' or 'code'.
+    """
+    if doc_format not in FORMATS:
+        raise NotImplementedError('Only the format numpy is supported at the moment.')
+    count = [0]
+
+    def stop(result):
+        """Return True if the given number of differences is found."""
+        count[0] += len(result['differences'])
+        return max_differences is not None and count[0] >= max_differences
+
+    results = list(_map_files(check_file, filenames, jobs=jobs, cache=cache, stop=stop,
+                              file_kwargs=_lines_kwargs(lines), doc_format=doc_format,
+                              width=width, tabsize=tabsize, max_differences=max_differences))
+    # NOTE: each file stops at the given number of differences, but not the files together
+    if max_differences is not None and results:
+        excess = count[0] - max_differences
+        if excess > 0:
+            del results[-1]['differences'][-excess:]
+    return results
+
+
+def summarize(results, elapsed):
+    """Return the summary of the conversion of many files.
+
+    Parameters
+    ----------
+    results : list of dict
+        Results of the conversion of each file (see `convert_files`).
+    elapsed : float
+        Wall time of the conversion (in seconds).
+
+    Returns
+    -------
+    summary : str
+        Numbers of files (failed, found in the cache, and changed), docstrings, and bytes, and the
+        throughput.
+    """
+    num_files = len(results)
+    num_errors = sum(result['error'] is not None for result in results)
+    num_cached = sum(result['cached'] for result in results)
+    num_changed = sum(result['changed'] for result in results)
+    num_docstrings = sum(result['docstrings'] for result in results)
+    num_bytes = sum(result['bytes'] for result in results)
+    elapsed = max(elapsed, 1e-9)
+    return ('{0} files ({1} failed, {2} cached, {3} changed), {4} docstrings, {5} bytes in '
+            '{6:.2f} s ({7:.1f} files/s, {8:.1f} docstrings/s, {9:.2f} MB/s)'.format(
+                num_files, num_errors, num_cached, num_changed, num_docstrings, num_bytes, elapsed,
+                num_files / elapsed, num_docstrings / elapsed, num_bytes / elapsed / 1e6
+            ))
+
+
+def report(results, elapsed, jobs=1, shard=None):
+    """Return the report of the conversion of many files, per file and in total.
+
+    Times of the stages are kept by `convert_file` and `check_file` for every file (they cost a few
+    calls to `time.perf_counter` per docstring), so the report is available for every run.
+
+    Parameters
+    ----------
+    results : list of dict
+        Results of the conversion of each file (see `convert_files`).
+    elapsed : float
+        Wall time of the conversion (in seconds).
+    jobs : int
+        Number of processes of the conversion.
+        Default is 1.
+    shard : {2-tuple of int, None}
+        Index (from 1) and number of the shards, if the files are a shard (see `shard_files`).
+        Default is all files.
+
+    Returns
+    -------
+    report : dict
+        Report that can be serialized to JSON, with the keys
+        'version' (version of pydocstring), 'jobs', 'shards' (indices of the shards and the number
+        of the shards, or None), 'elapsed' (wall time in seconds), 'files'
+        (for each file, its name, 'error', 'cached', 'changed', 'docstrings', 'differences' (number
+        of the docstrings that are not in the format, if checked), 'bytes' and 'bytes_out' (sizes
+        of the file before and after the conversion), and 'times' (times in seconds of the stages,
+        see `STAGES`, and 'total', or None if the file failed)), 'totals' (sums of the numbers,
+        the sizes, and the times of the files), and 'throughput' (files, docstrings, and megabytes
+        per second of wall time).
+    """
+    files = []
+    totals = {'files': len(results), 'failed': 0, 'cached': 0, 'changed': 0, 'docstrings': 0,
+              'differences': 0, 'bytes': 0, 'bytes_out': 0,
+              'times': dict.fromkeys(STAGES + ('total',), 0.0)}
+    for result in results:
+        num_differences = len(result.get('differences', ()))
+        files.append({'filename': result['filename'], 'error': result['error'],
+                      'cached': result['cached'], 'changed': result['changed'],
+                      'docstrings': result['docstrings'], 'differences': num_differences,
+                      'bytes': result['bytes'], 'bytes_out': result['bytes_out'],
+                      'times': result['times']})
+        totals['failed'] += result['error'] is not None
+        totals['cached'] += result['cached']
+        totals['changed'] += result['changed']
+        totals['docstrings'] += result['docstrings']
+        totals['differences'] += num_differences
+        totals['bytes'] += result['bytes']
+        totals['bytes_out'] += result['bytes_out']
+        for stage, stage_time in (result['times'] or {}).items():
+            totals['times'][stage] += stage_time
+    shards = None if shard is None else [[shard[0]], shard[1]]
+    return {'version': pydocstring.__version__, 'jobs': jobs, 'shards': shards,
+            'elapsed': elapsed, 'files': files, 'totals': totals,
+            'throughput': _throughput(totals, elapsed)}
+
+
+def _throughput(totals, elapsed):
+    """Return the files, docstrings, and megabytes per second of the totals of a report."""
+    rate = 1 / max(elapsed, 1e-9)
+    return {'files': totals['files'] * rate, 'docstrings': totals['docstrings'] * rate,
+            'megabytes': totals['bytes'] * rate / 1e6}
+
+
+def merge_reports(reports):
+    """Return the report of the shards of a conversion from the reports of each shard.
+
+    Shards are run at the same time (e.g. on different machines), so the wall time of the
+    conversion is the wall time of the slowest shard.
+
+    Parameters
+    ----------
+    reports : list of dict
+        Reports of the shards (see `report`).
+
+    Returns
+    -------
+    report : dict
+        Report of all shards, where 'files' are sorted by their names, 'totals' are the sums of the
+        totals of the shards, 'jobs' is the total number of processes, and 'elapsed' is the
+        largest wall time.
+
+    Raises
+    ------
+    ValueError
+        If there are no reports.
+        If the reports are not shards of the same conversion (different versions of pydocstring,
+        different numbers of shards, or a shard that is given twice).
+        If a file is in more than one report.
+    """
+    if not reports:
+        raise ValueError('At least one report is required.')
+    versions = {report_data['version'] for report_data in reports}
+    counts = {report_data['shards'] and report_data['shards'][1] for report_data in reports}
+    indices = [index for report_data in reports for index in (report_data['shards'] or [[]])[0]]
+    if len(versions) > 1 or len(counts) > 1 or len(indices) != len(set(indices)):
+        raise ValueError('Reports are not shards of the same conversion.')
+    files = sorted((file_data for report_data in reports for file_data in report_data['files']),
+                   key=lambda file_data: file_data['filename'])
+    for file_data, next_data in zip(files, files[1:]):
+        if file_data['filename'] == next_data['filename']:
+            raise ValueError('{0} is in more than one report.'.format(file_data['filename']))
+
+    totals = {key: 0 for key in reports[0]['totals'] if key != 'times'}
+    totals['times'] = dict.fromkeys(STAGES + ('total',), 0.0)
+    for report_data in reports:
+        for key, value in report_data['totals'].items():
+            if key == 'times':
+                for stage, stage_time in value.items():
+                    totals['times'][stage] += stage_time
+            else:
+                totals[key] += value
+    elapsed = max(report_data['elapsed'] for report_data in reports)
+    count = counts.pop()
+    shards = None if count is None else [sorted(indices), count]
+    return {'version': versions.pop(), 'jobs': sum(report_data['jobs'] for report_data in reports),
+            'shards': shards, 'elapsed': elapsed, 'files': files, 'totals': totals,
+            'throughput': _throughput(totals, elapsed)}
+
+
+def _shard(value):
+    """Return the index and the number of the shards of the argument `INDEX/COUNT` of `--shard`."""
+    match = re.fullmatch(r'(\d+)/(\d+)', value)
+    if match is None or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise argparse.ArgumentTypeError('shard must be INDEX/COUNT, with INDEX from 1 to COUNT')
+    return int(match.group(1)), int(match.group(2))
+
+
+def main(argv=None):
+    """Run the script.
+
+    Parameters
+    ----------
+    argv : list of str
+        Command line arguments (without the name of the program).
+        Default is `sys.argv[1:]`.
+
+    Returns
+    -------
+    status : int
+        0 if all files are converted (or are in the format, with `--check`), 1 otherwise.
+    """
     # parse arguments
     parser = argparse.ArgumentParser(
         description='Converts existing numpy docstring to another format.'
     )
-    parser.add_argument('filename', action='store', nargs='?', default=None, type=str,
-                        help='Python file whose docstrings will be converted.')
-    parser.add_argument('format', action='store', nargs='?', default='numpy', type=str,
-                        help='Format of the generated docstrings.')
+    parser.add_argument('paths', action='store', nargs='*', type=str, metavar='path',
+                        help='Python files, directories, or glob patterns whose docstrings will '
+                        'be converted, or - for converting the standard input to the standard '
+                        'output. Last argument can be the format of the generated docstrings '
+                        '({0}, default is numpy).'.format(', '.join(FORMATS)))
     parser.add_argument('--width', action='store', nargs='?', default=None, type=int,
                         dest='width', help='Maximum line length.')
     parser.add_argument('--tabsize', action='store', nargs='?', default=None, type=int,
                         dest='tabsize', help='Number of spaces in a tab.')
     parser.add_argument('--nowrite', action='store_false', default=True,
                         dest='write', help='Flag for preventing an overwrite of the code.')
-    args = parser.parse_args()
+    parser.add_argument('--files-from', action='store', default=None, type=str,
+                        dest='files_from', metavar='FILE',
+                        help='File that lists more paths, one per line.')
+    parser.add_argument('--include', action='append', default=None, type=str,
+                        dest='include', metavar='PATTERN',
+                        help='Glob pattern of the files in the directories that are converted '
+                        '(default is *.py). Can be given more than once.')
+    parser.add_argument('--exclude', action='append', default=[], type=str,
+                        dest='exclude', metavar='PATTERN',
+                        help='Glob pattern of the files and directories that are skipped. Can be '
+                        'given more than once.')
+    parser.add_argument('--jobs', '-j', action='store', default=1, type=int,
+                        dest='jobs', help='Number of processes (0 for the number of CPUs).')
+    parser.add_argument('--cache-dir', action='store', default=None, type=str,
+                        dest='cache_dir', metavar='DIR',
+                        help='Directory of the cache of the conversions (default is '
+                        '$PYDOCSTRING_CACHE_DIR or ~/.cache/pydocstring).')
+    parser.add_argument('--no-cache', action='store_false', default=True,
+                        dest='cache', help='Flag for disabling the cache of the conversions.')
+    parser.add_argument('--check', action='store_true', default=False,
+                        dest='check', help='Flag for checking that the docstrings are in the '
+                        'format (without modifying the files). Locations of the docstrings that '
+                        'are not are printed and the exit status is 1.')
+    parser.add_argument('--max-differences', action='store', default=1, type=int,
+                        dest='max_differences', metavar='N',
+                        help='Number of differences after which the check stops (0 for no limit, '
+                        'default is 1).')
+    parser.add_argument('--changed', action='store', nargs='?', default=None, const='HEAD',
+                        type=str, dest='changed', metavar='REF',
+                        help='Flag for converting (or checking) only the docstrings that overlap '
+                        'with the lines that are changed relative to the git reference (default '
+                        'is HEAD, i.e. the uncommitted changes) and the untracked files. Paths '
+                        'restrict the changed files.')
+    parser.add_argument('--report', action='store', default=None, type=str,
+                        dest='report', metavar='FILE',
+                        help='JSON file to which the report of the run is written (sizes, numbers '
+                        'of docstrings, and times of the stages of each file, and the totals).')
+    parser.add_argument('--shard', action='store', default=None, type=_shard,
+                        dest='shard', metavar='INDEX/COUNT',
+                        help='Convert (or check) only one of COUNT shards of the files (INDEX is '
+                        'from 1 to COUNT). Shards have about the same size and only depend on the '
+                        'names and the sizes of the files.')
+    parser.add_argument('--merge-reports', action='store', nargs='+', default=None, type=str,
+                        dest='merge_reports', metavar='REPORT',
+                        help='Merge the reports of the shards (see --report and --shard) into '
+                        'the report given by --report (default is the standard output), instead '
+                        'of converting files. Exit status is 1 if a file failed or is not in the '
+                        'format.')
+    parser.add_argument('--checkpoint', action='store', default=None, type=str,
+                        dest='checkpoint', metavar='FILE',
+                        help='Manifest to which each file is appended once it is converted (with '
+                        'the hash of its new contents), so that an interrupted run can be resumed '
+                        'with --resume.')
+    parser.add_argument('--resume', action='store_true', default=False,
+                        dest='resume', help='Flag for resuming the run of the manifest of '
+                        '--checkpoint. Files that are recorded and have not changed since are '
+                        'skipped; other files are converted.')
+    args = parser.parse_args(argv)
+
+    if args.merge_reports is not None:
+        try:
+            reports = []
+            for filename in args.merge_reports:
+                with open(filename) as f:
+                    reports.append(json.load(f))
+            merged = merge_reports(reports)
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            parser.error('cannot merge the reports: {0}'.format(error))
+        if args.report is None:
+            print(json.dumps(merged, indent=1))
+        else:
+            with open(args.report, 'w') as f:
+                json.dump(merged, f, indent=1)
+                f.write('\n')
+        return int(bool(merged['totals']['failed'] or merged['totals']['differences']))
+
+    # format is the optional last positional argument (for compatibility)
+    doc_format = 'numpy'
+    if args.paths and args.paths[-1] in FORMATS and not os.path.exists(args.paths[-1]):
+        doc_format = args.paths.pop()
+    if not args.paths and args.files_from is None and args.changed is None:
+        parser.error('at least one path is required')
+    if args.resume and args.checkpoint is None:
+        parser.error('--resume requires --checkpoint')
+    if args.checkpoint is not None and (args.check or not args.write):
+        parser.error('--checkpoint requires that the files are converted (not --check nor '
+                     '--nowrite)')
+
+    is_filter = '-' in args.paths
+    if is_filter and (len(args.paths) > 1 or args.files_from is not None
+                      or args.changed is not None or args.check or not args.write
+                      or args.shard is not None or args.checkpoint is not None):
+        parser.error('- cannot be combined with other paths, --files-from, --changed, --check, '
+                     '--nowrite, --shard, nor --checkpoint')
+
+    lines = None
+    try:
+        if is_filter:
+            filenames = ['-']
+        elif args.changed is not None:
+            lines = pydocstring.git.changed_lines(args.changed)
+            filenames = filter_files(sorted(lines), args.paths, include=args.include or ['*.py'],
+                                     exclude=args.exclude)
+        else:
+            filenames = find_files(args.paths, include=args.include or ['*.py'],
+                                   exclude=args.exclude, files_from=args.files_from)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    if args.shard is not None:
+        filenames = shard_files(filenames, *args.shard)
+
+    checkpoint = None
+    if args.checkpoint is not None:
+        try:
+            checkpoint = pydocstring.checkpoint.Checkpoint(
+                args.checkpoint, resume=args.resume, format=doc_format,
+                width=100 if args.width is None else args.width,
+                tabsize=4 if args.tabsize is None else args.tabsize, changed=args.changed
+            )
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+
+    start = time.perf_counter()
+    cache = None
+    if args.cache and not is_filter:
+        cache = pydocstring.cache.get_conversion_cache(args.cache_dir)
+    if is_filter:
+        try:
+            results = [convert_stream(sys.stdin.buffer, sys.stdout.buffer, doc_format,
+                                      width=args.width, tabsize=args.tabsize)]
+        except Exception as error:
+            results = [_error_result('-', error)]
+        sys.stdout.buffer.flush()
+    elif args.check:
+        results = check_files(filenames, doc_format, width=args.width, tabsize=args.tabsize,
+                              max_differences=args.max_differences or None, jobs=args.jobs,
+                              cache=cache, lines=lines)
+    else:
+        # replace docstrings
+        results = convert_files(filenames, doc_format, width=args.width, tabsize=args.tabsize,
+                                write=args.write, jobs=args.jobs, cache=cache, lines=lines,
+                                checkpoint=checkpoint)
+    if cache is not None:
+        cache.save()
+    elapsed = time.perf_counter() - start
 
-    # replace docstrings
-    replace_docstrings(args.filename, args.format, width=args.width,
-                       tabsize=args.tabsize, write=args.write)
+    for result in results:
+        if result['error'] is not None:
+            print('{0}: {1}'.format(result['filename'], result['error']), file=sys.stderr)
+        elif args.check:
+            for lineno, name in result['differences']:
+                print('{0}:{1}: {2}'.format(result['filename'], lineno, name or '<module>'))
+        elif result['code'] is not None:
+            print(result['code'])
+    if args.check:
+        num_differences = sum(len(result['differences']) for result in results)
+        if num_differences:
+            is_stopped = args.max_differences and num_differences >= args.max_differences
+            print('{0} docstrings are not in the {1} format{2}.'.format(
+                num_differences, doc_format, ' (check stopped)' if is_stopped else ''
+            ), file=sys.stderr)
+    if len(filenames) > 1:
+        print(summarize(results, elapsed), file=sys.stderr)
+    if args.report is not None:
+        with open(args.report, 'w') as f:
+            json.dump(report(results, elapsed, jobs=args.jobs, shard=args.shard), f, indent=1)
+            f.write('\n')
+    return int(any(result['error'] is not None or (args.check and result['changed'])
+                   for result in results))
@@ -0,0 +1,526 @@
+"""Static extraction of the docstrings from Python source code.
+
+Source code is parsed (with `ast`) but not executed, so that the docstrings of a file can be found
+without importing it (and its dependencies). Very large files can be scanned line by line (with
+`tokenize`) instead, so that they are never held in memory as a whole.
+
+Methods
+-------
+extract_docstrings(source)
+    Return the docstring literals of the modules, classes, functions, and properties in the code.
+scan_docstrings(readline)
+    Yield the docstring literals of the code that is read line by line, with their positions.
+decode_source(data)
+    Return the decoded source code and its encoding.
+read_source(filename)
+    Return the decoded source code of a Python file and its encoding.
+read_docstrings(filename)
+    Return the docstring literals of a Python file.
+splice(source, edits)
+    Return the source with the given spans replaced.
+"""
+import ast
+import re
+import token
+import tokenize
+
+
+class DocstringLiteral:
+    """Docstring literal in the source code.
+
+    Attributes
+    ----------
+    name : str
+        Qualified name of the object of the docstring, e.g. 'Class.method'.
+        Empty string for the module.
+    kind : {'module', 'class', 'function', 'property'}
+        Type of the object of the docstring.
+    docstring : str
+        Value of the docstring, i.e. `__doc__` of the object.
+    start : int
+        Position (in characters) of the start of the literal (including its prefix) in the source.
+    end : int
+        Position (in characters) of the end of the literal in the source.
+    lineno : int
+        Line number of the start of the literal (starting from 1).
+    end_lineno : int
+        Line number of the end of the literal.
+    prefix : str
+        Prefix of the literal, e.g. 'r' for raw strings.
+    quote : str
+        Quotation of the literal, i.e. '\"\"\"', "'''", '"', or "'".
+    indent : str
+        Leading whitespace of the line of the start of the literal.
+
+    Properties
+    ----------
+    is_raw : bool
+        True if the literal is a raw string.
+
+    Methods
+    -------
+    __init__(name, kind, docstring, start, end, lineno, end_lineno, prefix, quote, indent)
+        Initialize.
+    """
+    def __init__(self, name, kind, docstring, start, end, lineno, end_lineno, prefix, quote,
+                 indent):
+        """Initialize.
+
+        Parameters
+        ----------
+        name : str
+            Qualified name of the object of the docstring.
+        kind : {'module', 'class', 'function', 'property'}
+            Type of the object of the docstring.
+        docstring : str
+            Value of the docstring.
+        start : int
+            Position of the start of the literal in the source.
+        end : int
+            Position of the end of the literal in the source.
+        lineno : int
+            Line number of the start of the literal.
+        end_lineno : int
+            Line number of the end of the literal.
+        prefix : str
+            Prefix of the literal.
+        quote : str
+            Quotation of the literal.
+        indent : str
+            Leading whitespace of the line of the start of the literal.
+        """
+        self.name = name
+        self.kind = kind
+        self.docstring = docstring
+        self.start = start
+        self.end = end
+        self.lineno = lineno
+        self.end_lineno = end_lineno
+        self.prefix = prefix
+        self.quote = quote
+        self.indent = indent
+
+    def __repr__(self):
+        """Return the representation of the literal."""
+        return 'DocstringLiteral({0!r}, {1!r}, lineno={2})'.format(self.name, self.kind,
+                                                                  self.lineno)
+
+    @property
+    def is_raw(self):
+        """Return True if the literal is a raw string."""
+        return 'r' in self.prefix.lower()
+
+
+def _is_property(node):
+    """Return True if the function definition is decorated as a property.
+
+    Parameters
+    ----------
+    node : {ast.FunctionDef, ast.AsyncFunctionDef}
+        Function definition.
+
+    Returns
+    -------
+    is_property : bool
+        True if one of the decorators is `property` (or an attribute named `property`, e.g.
+        `abc.property`).
+    """
+    for decorator in node.decorator_list:
+        if isinstance(decorator, ast.Name) and decorator.id == 'property':
+            return True
+        if isinstance(decorator, ast.Attribute) and decorator.attr == 'property':
+            return True
+    return False
+
+
+def extract_docstrings(source):
+    """Return the docstring literals of the modules, classes, functions, and properties in the code.
+
+    Source code is parsed once and is not executed. Docstrings of the objects that are nested in
+    functions are included (with `<locals>` in their names, as in `__qualname__`).
+
+    Parameters
+    ----------
+    source : str
+        Python source code.
+
+    Returns
+    -------
+    literals : list of DocstringLiteral
+        Docstring literals in the order of their positions in the source.
+
+    Raises
+    ------
+    SyntaxError
+        If the source code cannot be parsed.
+    """
+    tree = ast.parse(source)
+
+    # positions of the start of each line
+    # NOTE: these are the newlines recognized by the tokenizer (unlike str.splitlines)
+    line_starts = [0] + [match.end() for match in re.finditer(r'\r\n|\r|\n', source)]
+
+    def position(lineno, col_offset):
+        """Return the position in the source of the line number and the (UTF-8) column offset."""
+        start = line_starts[lineno - 1]
+        line = source[start:start + col_offset]
+        if not line.isascii():
+            end = line_starts[lineno] if lineno < len(line_starts) else len(source)
+            col_offset = len(source[start:end].encode('utf-8')[:col_offset].decode('utf-8'))
+        return start + col_offset
+
+    literals = []
+    # NOTE: explicit stack is used rather than recursion (deeply nested code)
+    stack = [(tree, '', 'module')]
+    while stack:
+        node, name, kind = stack.pop()
+        body = node.body
+        if (body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant)
+                and isinstance(body[0].value.value, str)):
+            expr = body[0].value
+            start = position(expr.lineno, expr.col_offset)
+            end = position(expr.end_lineno, expr.end_col_offset)
+            prefix, quote = re.match(r'([a-zA-Z]*)(\'\'\'|"""|\'|")', source[start:end]).groups()
+            line = source[line_starts[expr.lineno - 1]:start]
+            indent = line[:len(line) - len(line.lstrip())]
+            literals.append(DocstringLiteral(name, kind, expr.value, start, end, expr.lineno,
+                                             expr.end_lineno, prefix, quote, indent))
+
+        # children (in reverse so that they are popped in order)
+        children = []
+        for child in _children(node):
+            if isinstance(child, ast.ClassDef):
+                child_kind = 'class'
+            elif _is_property(child):
+                child_kind = 'property'
+            else:
+                child_kind = 'function'
+            if kind in ['function', 'property']:
+                parent = name + '.<locals>.'
+            elif name:
+                parent = name + '.'
+            else:
+                parent = ''
+            children.append((child, parent + child.name, child_kind))
+        stack.extend(reversed(children))
+
+    literals.sort(key=lambda literal: literal.start)
+    return literals
+
+
+def _children(node):
+    """Return the class and function definitions that are directly inside the given node.
+
+    Definitions inside compound statements (e.g. `if`, `try`, `with`) are included.
+
+    Parameters
+    ----------
+    node : {ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef}
+        Node whose definitions are returned.
+
+    Returns
+    -------
+    definitions : list of {ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef}
+        Definitions in the order of the source.
+    """
+    definitions = []
+    stack = list(reversed(node.body))
+    while stack:
+        child = stack.pop()
+        if isinstance(child, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            definitions.append(child)
+            continue
+        # NOTE: fields are in the order of the source
+        statements = list(getattr(child, 'body', []))
+        for handler in getattr(child, 'handlers', []):
+            statements.extend(handler.body)
+        for case in getattr(child, 'cases', []):
+            statements.extend(case.body)
+        statements.extend(getattr(child, 'orelse', []))
+        statements.extend(getattr(child, 'finalbody', []))
+        stack.extend(reversed([statement for statement in statements
+                               if isinstance(statement, ast.stmt)]))
+    return definitions
+
+
+def scan_docstrings(readline, release=None):
+    """Yield the docstring literals of the code that is read line by line, with their positions.
+
+    Code is tokenized (not parsed) as it is read, and only the lines of the current token are kept,
+    so that the memory does not depend on the size of the code. Docstrings are found as in
+    `extract_docstrings`, except for the docstrings that are in parentheses.
+
+    Parameters
+    ----------
+    readline : function
+        Function that returns the next line of the code (as bytes), or b'' at the end, e.g. the
+        `readline` method of a binary file or of a memory map (see `tokenize.tokenize`).
+    release : {function, None}
+        Function that is called with a position in bytes once no docstring can start before it,
+        i.e. once the code before it can be written out unchanged (e.g. by a filter).
+        Positions increase from call to call.
+        Default is no call.
+
+    Yields
+    ------
+    literal : DocstringLiteral
+        Docstring literals in the order of their positions in the code.
+        Positions of the literals (`start` and `end`) are positions in bytes, from the start of the
+        code.
+
+    Raises
+    ------
+    SyntaxError
+        If the code cannot be tokenized (e.g. unterminated string, inconsistent indentation).
+        Other syntax errors are not detected.
+    """
+    # lines that are read but not tokenized yet, from the start of the last token (or of the
+    # docstring that is being read)
+    lines = {}
+    state = {'row': 0, 'offset': 0, 'codec': 'utf-8', 'hold': None}
+
+    def read():
+        """Read the next line and keep its position."""
+        line = readline()
+        state['row'] += 1
+        offset = state['offset']
+        state['offset'] += len(line)
+        if state['row'] == 1 and line.startswith(b'\xef\xbb\xbf'):
+            # NOTE: byte order mark is not part of the tokenized line
+            line, offset = line[3:], offset + 3
+        lines[state['row']] = (offset, line)
+        return line
+
+    def position(row, col):
+        """Return the position in bytes of the row and the (character) column of a token."""
+        offset, line = lines[row]
+        if line.isascii():
+            return offset + col
+        return offset + len(line.decode(state['codec'])[:col].encode(state['codec']))
+
+    def tokens():
+        """Yield the significant tokens and forget the lines before them."""
+        first_row = 1
+        try:
+            for tok in tokenize.tokenize(read):
+                last_row = tok.start[0] if state['hold'] is None else state['hold']
+                if first_row < last_row:
+                    while first_row < last_row:
+                        lines.pop(first_row, None)
+                        first_row += 1
+                    if release is not None:
+                        release(lines[first_row][0])
+                if tok.type == token.ENCODING:
+                    state['codec'] = 'utf-8' if tok.string == 'utf-8-sig' else tok.string
+                elif tok.type not in (token.COMMENT, token.NL):
+                    yield tok
+        except tokenize.TokenError as error:
+            raise SyntaxError(error.args[0], (None,) + tuple(error.args[1]) + (None,)) from None
+
+    def docstring(first, name, kind):
+        """Return the docstring literal that starts with the token, and the token after it."""
+        # NOTE: positions are found before the next token, which forgets the previous lines
+        start = position(*first.start)
+        line = lines[first.start[0]][1].decode(state['codec'])[:first.start[1]]
+        strings = []
+        tok = first
+        # NOTE: code from the start of the docstring is not released until it is yielded
+        state['hold'] = first.start[0]
+        while tok.type == token.STRING:
+            strings.append(tok.string)
+            end, end_lineno = position(*tok.end), tok.end[0]
+            tok = next(stream)
+        if (tok.type not in (token.NEWLINE, token.ENDMARKER) and tok.exact_type != token.SEMI
+                or any(re.match(r'[a-zA-Z]*[bBfF]', string) for string in strings)):
+            return None, tok
+        prefix, quote = re.match(r'([a-zA-Z]*)(\'\'\'|"""|\'|")', strings[0]).groups()
+        literal = DocstringLiteral(name, kind, ast.literal_eval(' '.join(strings)), start, end,
+                                   first.start[0], end_lineno, prefix, quote,
+                                   line[:len(line) - len(line.lstrip())])
+        return literal, tok
+
+    stream = tokens()
+    # bodies of the classes and the functions that contain the current line
+    scopes = [(0, '', 'module')]
+    depth = 0
+    parens = 0
+    is_start = True
+    is_first = True
+    is_property = False
+    # class or function whose definition is being read, and its body
+    header = None
+    block = None
+    tok = next(stream)
+    while tok.type != token.ENDMARKER:
+        next_tok = None
+        if tok.type == token.INDENT:
+            depth += 1
+            if block is not None:
+                scopes.append((depth,) + block)
+                block = None
+                is_first = True
+        elif tok.type == token.DEDENT:
+            depth -= 1
+            while scopes[-1][0] > depth:
+                scopes.pop()
+        elif tok.type == token.NEWLINE:
+            is_start = True
+        elif is_start and is_first and tok.type == token.STRING:
+            literal, next_tok = docstring(tok, *scopes[-1][1:])
+            if literal is not None:
+                yield literal
+            state['hold'] = None
+            is_start = is_first = False
+        elif is_start and tok.exact_type == token.AT:
+            # decorator
+            names = []
+            tok = next(stream)
+            while tok.type != token.NEWLINE:
+                names.append(tok)
+                tok = next(stream)
+            if (names and names[-1].string == 'property'
+                    and all((item.type == token.NAME) == (i % 2 == 0)
+                            for i, item in enumerate(names))
+                    and all(item.string == '.' for item in names[1::2])):
+                is_property = True
+            is_first = False
+        elif is_start and tok.type == token.NAME and tok.string in ('def', 'class', 'async'):
+            if tok.string == 'async':
+                # e.g. `async def`, `async with`
+                tok = next(stream)
+                if tok.string != 'def':
+                    is_start = is_first = False
+                    continue
+            name = next(stream).string
+            _, parent, parent_kind = scopes[-1]
+            if parent_kind in ('function', 'property'):
+                name = parent + '.<locals>.' + name
+            elif parent:
+                name = parent + '.' + name
+            if tok.string == 'class':
+                header = (name, 'class')
+            else:
+                header = (name, 'property' if is_property else 'function')
+            is_start = is_first = is_property = False
+        else:
+            if tok.exact_type in (token.LPAR, token.LSQB, token.LBRACE):
+                parens += 1
+            elif tok.exact_type in (token.RPAR, token.RSQB, token.RBRACE):
+                parens -= 1
+            elif tok.exact_type == token.SEMI and parens == 0:
+                is_start = True
+                tok = next(stream)
+                continue
+            elif tok.exact_type == token.COLON and parens == 0 and header is not None:
+                tok = next(stream)
+                if tok.type == token.NEWLINE:
+                    block = header
+                elif tok.type == token.STRING:
+                    # body on the same line, e.g. `def f(): "Docstring."`
+                    literal, tok = docstring(tok, *header)
+                    if literal is not None:
+                        yield literal
+                    state['hold'] = None
+                header = None
+                continue
+            is_start = is_first = False
+        tok = next(stream) if next_tok is None else next_tok
+
+
+def decode_source(data):
+    """Return the decoded source code and its encoding.
+
+    Source code is decoded with its encoding declaration (as the interpreter does), without
+    translating its newlines.
+
+    Parameters
+    ----------
+    data : bytes
+        Contents of a Python file.
+
+    Returns
+    -------
+    source : str
+        Source code.
+    encoding : str
+        Encoding of the source code.
+    """
+    encoding, _ = tokenize.detect_encoding(iter(data.splitlines(keepends=True)).__next__)
+    return data.decode(encoding), encoding
+
+
+def read_source(filename):
+    """Return the decoded source code of a Python file and its encoding.
+
+    File is decoded with its encoding declaration (see `decode_source`).
+
+    Parameters
+    ----------
+    filename : str
+        Name of the Python file.
+
+    Returns
+    -------
+    source : str
+        Source code of the file.
+    encoding : str
+        Encoding of the file.
+    """
+    with open(filename, 'rb') as f:
+        return decode_source(f.read())
+
+
+def read_docstrings(filename):
+    """Return the docstring literals of a Python file.
+
+    File is decoded with its encoding declaration (see `read_source`) and is not imported.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the Python file.
+
+    Returns
+    -------
+    literals : list of DocstringLiteral
+        Docstring literals of the file (see `extract_docstrings`).
+        Positions of the literals are relative to the decoded source.
+    """
+    return extract_docstrings(read_source(filename)[0])
+
+
+def splice(source, edits):
+    """Return the source with the given spans replaced.
+
+    New source is built in one pass over the edits, i.e. in time linear in the size of the source.
+
+    Parameters
+    ----------
+    source : str
+        Source code.
+    edits : list of 3-tuple of (int, int, str)
+        Start and end positions of each span and the text that replaces it.
+        Spans must be sorted by position and must not overlap.
+
+    Returns
+    -------
+    source : str
+        Source code with the spans replaced.
+
+    Raises
+    ------
+    ValueError
+        If the spans are not sorted or overlap.
+        If a span is outside of the source.
+    """
+    parts = []
+    position = 0
+    for start, end, text in edits:
+        if not position <= start <= end <= len(source):
+            raise ValueError('Spans of the edits must be sorted, must not overlap, and must be '
+                             'inside of the source.')
+        parts.append(source[position:start])
+        parts.append(text)
+        position = end
+    parts.append(source[position:])
+    return ''.join(parts)
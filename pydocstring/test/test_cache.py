@@ -0,0 +1,166 @@
+import importlib
+import os
+import sys
+import tempfile
+import pydocstring.cache
+import pydocstring.wrapper
+
+
+MODULE = '''
+import pydocstring.wrapper
+
+
+@pydocstring.wrapper.docstring_class
+class Test:
+    """Test docstring.
+
+    Test
+    extended."""
+    def f(self, x):
+        """Some function.
+
+        Parameters
+        ----------
+        x : int
+            Something.
+        """
+'''
+
+
+def import_module(dirname, name, source):
+    """Write the source code to a module in the given directory and import it."""
+    with open(os.path.join(dirname, name + '.py'), 'w') as f:
+        f.write(source)
+    sys.modules.pop(name, None)
+    importlib.invalidate_caches()
+    return importlib.import_module(name)
+
+
+def test_cache():
+    """Test pydocstring.cache with pydocstring.wrapper."""
+    with tempfile.TemporaryDirectory() as dirname:
+        sys.path.insert(0, dirname)
+        pydocstring.wrapper.configure(cache=True, verify='off')
+        try:
+            # cold
+            module = import_module(dirname, 'test_cache_module', MODULE)
+            cold_doc = module.Test.__doc__
+            cache = pydocstring.cache.get_cache(module.Test)
+            assert cache.path == os.path.join(dirname, '__pycache__',
+                                              'test_cache_module.pydocstring-{0}.cache'
+                                              ''.format(pydocstring.__version__))
+            assert len(cache.entries) > 0
+            assert cache.is_modified
+            pydocstring.cache.flush()
+            assert not cache.is_modified
+            assert os.path.isfile(cache.path)
+
+            # warm (no parsing)
+            pydocstring.cache._caches.clear()
+            parse_numpy = pydocstring.wrapper.parse_numpy
+            pydocstring.wrapper.parse_numpy = None
+            try:
+                module = import_module(dirname, 'test_cache_module', MODULE)
+            finally:
+                pydocstring.wrapper.parse_numpy = parse_numpy
+            assert module.Test.__doc__ == cold_doc
+            assert module.Test.f._docstring.info['parameters'][0].name == 'x'
+            assert not pydocstring.cache.get_cache(module.Test).is_modified
+
+            # source code changed
+            pydocstring.cache._caches.clear()
+            module = import_module(dirname, 'test_cache_module',
+                                   MODULE.replace('Some function.', 'Other function.'))
+            cache = pydocstring.cache.get_cache(module.Test)
+            assert module.Test.f.__doc__.startswith('Other function.')
+            num_entries = len(cache.entries)
+            pydocstring.cache.flush()
+            # entries are merged with the file
+            pydocstring.cache._caches.clear()
+            cache = pydocstring.cache.get_cache(module.Test)
+            assert len(cache.entries) == num_entries
+            cache.entries = {}
+            cache.set(('x',), ('y',))
+            cache.save()
+            assert len(pydocstring.cache.ModuleCache(cache.filename).entries) == num_entries + 1
+
+            # corrupt cache
+            with open(cache.path, 'wb') as f:
+                f.write(b'abc')
+            assert pydocstring.cache.ModuleCache(cache.filename).entries == {}
+        finally:
+            pydocstring.wrapper.configure(cache=False, verify='diff')
+            pydocstring.cache._caches.clear()
+            sys.path.remove(dirname)
+            sys.modules.pop('test_cache_module', None)
+
+
+def test_get_cache():
+    """Test pydocstring.cache.get_cache."""
+    def test():
+        pass
+    test.__module__ = 'something_that_does_not_exist'
+    assert pydocstring.cache.get_cache(test) is None
+    assert pydocstring.cache.get_cache(sys) is None
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cache = pydocstring.cache.get_cache(test_get_cache, cache_dir=cache_dir)
+        assert cache.filename == os.path.abspath(__file__)
+        assert os.path.dirname(cache.path) == cache_dir
+    finally:
+        pydocstring.cache._caches.clear()
+        os.rmdir(cache_dir)
+
+
+def test_conversion_cache():
+    """Test pydocstring.cache.ConversionCache."""
+    with tempfile.TemporaryDirectory() as dirname:
+        cache = pydocstring.cache.ConversionCache(dirname)
+        assert cache.path == os.path.join(dirname, 'conversions-{0}.jsonl'
+                                          ''.format(pydocstring.__version__))
+        assert cache.entries == {}
+        # nothing is written without new entries
+        cache.save()
+        assert not os.path.exists(cache.path)
+
+        key = cache.key(b'code', format='numpy', width=100)
+        assert key == cache.key(b'code', width=100, format='numpy')
+        assert key != cache.key(b'code', format='numpy', width=80)
+        assert key != cache.key(b'code2', format='numpy', width=100)
+        cache.set(key, {'output': 'abc', 'docstrings': 1})
+        assert cache.get(key) == {'output': 'abc', 'docstrings': 1}
+        assert cache.get('other') is None
+        cache.save()
+        assert pydocstring.cache.ConversionCache(dirname).entries == cache.entries
+
+        # entries are appended (and partially written lines are ignored)
+        with open(cache.path, 'a') as f:
+            f.write('{"key": "interrupted", "val')
+        cache = pydocstring.cache.ConversionCache(dirname)
+        cache.set('other', {'output': 'def', 'docstrings': 2})
+        cache.save()
+        with open(cache.path) as f:
+            assert len(f.readlines()) == 3
+        assert pydocstring.cache.ConversionCache(dirname).entries == {
+            key: {'output': 'abc', 'docstrings': 1}, 'other': {'output': 'def', 'docstrings': 2}
+        }
+
+        # duplicate lines are compacted
+        for i in range(3):
+            cache.set(key, {'output': str(i), 'docstrings': 1})
+            cache.save()
+        with open(cache.path) as f:
+            assert len(f.readlines()) == 2
+        assert pydocstring.cache.ConversionCache(dirname).entries == cache.entries
+
+        # default directory
+        environ = dict(os.environ)
+        try:
+            os.environ['PYDOCSTRING_CACHE_DIR'] = dirname
+            assert pydocstring.cache.default_cache_dir() == dirname
+            del os.environ['PYDOCSTRING_CACHE_DIR']
+            os.environ['XDG_CACHE_HOME'] = dirname
+            assert pydocstring.cache.default_cache_dir() == os.path.join(dirname, 'pydocstring')
+        finally:
+            os.environ.clear()
+            os.environ.update(environ)
@@ -0,0 +1,42 @@
+import os
+import tempfile
+from nose.tools import assert_raises
+import pydocstring.checkpoint
+
+
+def test_checkpoint():
+    """Test pydocstring.checkpoint.Checkpoint."""
+    with tempfile.TemporaryDirectory() as dirname:
+        path = os.path.join(dirname, 'checkpoint.jsonl')
+        # resumed without a manifest
+        checkpoint = pydocstring.checkpoint.Checkpoint(path, resume=True, format='numpy')
+        assert checkpoint.entries == {}
+        checkpoint.add(os.path.join(dirname, 'a.py'), 'abc', 1)
+        assert checkpoint.get(os.path.join(dirname, 'a.py')) == {'output': 'abc', 'docstrings': 1}
+        assert checkpoint.get(os.path.join(dirname, 'b.py')) is None
+
+        # records are kept when resumed (by absolute names), and interrupted lines are ignored
+        with open(path, 'a') as f:
+            f.write('{"filename": "interrupted", "out')
+        checkpoint = pydocstring.checkpoint.Checkpoint(path, resume=True, format='numpy')
+        cwd = os.getcwd()
+        try:
+            os.chdir(dirname)
+            assert checkpoint.get('a.py') == {'output': 'abc', 'docstrings': 1}
+        finally:
+            os.chdir(cwd)
+        checkpoint.add(os.path.join(dirname, 'b.py'), 'def', 2)
+        checkpoint.add(os.path.join(dirname, 'a.py'), 'ghi', 3)
+        with open(path) as f:
+            assert len(f.readlines()) == 5
+        assert pydocstring.checkpoint.Checkpoint(path, resume=True, format='numpy').entries == {
+            os.path.join(dirname, 'a.py'): {'output': 'ghi', 'docstrings': 3},
+            os.path.join(dirname, 'b.py'): {'output': 'def', 'docstrings': 2}
+        }
+
+        # manifest of other options
+        assert_raises(ValueError, pydocstring.checkpoint.Checkpoint, path, resume=True,
+                      format='code')
+        # manifest is started anew if the run is not resumed
+        assert pydocstring.checkpoint.Checkpoint(path, format='code').entries == {}
+        assert pydocstring.checkpoint.Checkpoint(path, resume=True, format='code').entries == {}
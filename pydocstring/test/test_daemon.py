@@ -0,0 +1,199 @@
+import contextlib
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from nose.tools import assert_raises
+import pydocstring.daemon
+from pydocstring.test.test_pydocstring_to_instance import EXAMPLE, NUMPY, SOURCE
+
+
+def start_daemon(socket_path):
+    """Run the daemon in a thread and wait until it responds."""
+    thread = threading.Thread(target=pydocstring.daemon.serve, args=(socket_path,), daemon=True)
+    thread.start()
+    for _ in range(500):
+        try:
+            pydocstring.daemon.request({'command': 'ping'}, socket_path=socket_path, timeout=1)
+        except OSError:
+            time.sleep(0.01)
+        else:
+            return thread
+    raise AssertionError('Daemon did not start.')
+
+
+def test_daemon():
+    """Test pydocstring.daemon."""
+    with tempfile.TemporaryDirectory() as dirname:
+        socket_path = os.path.join(dirname, 'daemon.sock')
+        filename = os.path.join(dirname, 'a.py')
+        with open(filename, 'w') as f:
+            f.write(SOURCE)
+
+        # stale socket is replaced
+        with open(socket_path, 'w') as f:
+            f.write('')
+        thread = start_daemon(socket_path)
+        try:
+            assert os.stat(socket_path).st_mode & 0o777 == 0o600
+            # another daemon on the same socket
+            assert_raises(RuntimeError, pydocstring.daemon.serve, socket_path)
+
+            # relative to the working directory of the client
+            response = pydocstring.daemon.run(['a.py', '--nowrite', '--no-cache'], cwd=dirname,
+                                              socket_path=socket_path)
+            assert response == {'status': 0, 'stdout': NUMPY + '\n', 'stderr': '',
+                                'daemon': True}
+            assert os.getcwd() != dirname
+
+            response = pydocstring.daemon.run(['missing.py'], cwd=dirname,
+                                              socket_path=socket_path)
+            assert response['status'] == 2 and 'missing.py' in response['stderr']
+            assert pydocstring.daemon.request({'argv': 1}, socket_path=socket_path)['status'] == 2
+
+            # long request (e.g. the files of a repository from a pre-commit hook)
+            argv = ['a.py', '--nowrite', '--no-cache']
+            for i in range(5000):
+                argv += ['--exclude', 'pkg{0}/module{0}.py'.format(i)]
+            assert len(json.dumps(argv)) > 2 ** 16
+            response = pydocstring.daemon.run(argv, cwd=dirname, socket_path=socket_path)
+            assert response == {'status': 0, 'stdout': NUMPY + '\n', 'stderr': '',
+                                'daemon': True}
+        finally:
+            pydocstring.daemon.request({'command': 'stop'}, socket_path=socket_path)
+            thread.join(10)
+        assert not thread.is_alive()
+        assert not os.path.exists(socket_path)
+
+        # fallback to this process
+        response = pydocstring.daemon.run(['a.py', '--nowrite', '--no-cache'], cwd=dirname,
+                                          socket_path=socket_path)
+        assert response == {'status': 0, 'stdout': NUMPY + '\n', 'stderr': '', 'daemon': False}
+
+        # fallback to this process if the daemon cannot read the request
+        limit = pydocstring.daemon.REQUEST_LIMIT
+        pydocstring.daemon.REQUEST_LIMIT = 1000
+        try:
+            thread = start_daemon(socket_path)
+            response = pydocstring.daemon.run(argv, cwd=dirname, socket_path=socket_path)
+            assert response == {'status': 0, 'stdout': NUMPY + '\n', 'stderr': '',
+                                'daemon': False}
+        finally:
+            pydocstring.daemon.REQUEST_LIMIT = limit
+            pydocstring.daemon.request({'command': 'stop'}, socket_path=socket_path)
+            thread.join(10)
+
+        # command line
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            assert pydocstring.daemon.main(['--status', '--socket', socket_path]) == 1
+            thread = start_daemon(socket_path)
+            assert pydocstring.daemon.main(['--status', '--socket', socket_path]) == 0
+            assert pydocstring.daemon.main(['--stop', '--socket', socket_path]) == 0
+            thread.join(10)
+        assert stdout.getvalue() == 'Daemon is running (pid {0}).\n'.format(os.getpid())
+        assert stderr.getvalue() == 'Daemon is not running.\n'
+
+
+def test_daemon_security():
+    """Test the location and the ownership of the socket of pydocstring.daemon."""
+    environ = dict(os.environ)
+    try:
+        os.environ.pop('PYDOCSTRING_SOCKET', None)
+        os.environ['XDG_RUNTIME_DIR'] = '/run/user/1000'
+        assert pydocstring.daemon.default_socket_path().startswith('/run/user/1000/pydocstring-')
+        del os.environ['XDG_RUNTIME_DIR']
+        assert os.path.dirname(pydocstring.daemon.default_socket_path()) == os.path.join(
+            tempfile.gettempdir(), 'pydocstring-{0}'.format(os.getuid())
+        )
+    finally:
+        os.environ.clear()
+        os.environ.update(environ)
+
+    with tempfile.TemporaryDirectory() as dirname:
+        with open(os.path.join(dirname, 'a.py'), 'w') as f:
+            f.write(SOURCE)
+        # directory of the socket is created only for the user
+        socket_path = os.path.join(dirname, 'run', 'daemon.sock')
+        thread = start_daemon(socket_path)
+        pydocstring.daemon.request({'command': 'stop'}, socket_path=socket_path)
+        thread.join(10)
+        assert os.stat(os.path.dirname(socket_path)).st_mode & 0o777 == 0o700
+        # directory that other users can write to
+        os.chmod(os.path.dirname(socket_path), 0o777)
+        assert_raises(RuntimeError, pydocstring.daemon.serve, socket_path)
+
+        # path that is not a socket (or a socket of another user) is not connected to
+        socket_path = os.path.join(dirname, 'other.sock')
+        with open(socket_path, 'w') as f:
+            f.write('')
+        assert_raises(PermissionError, pydocstring.daemon.request, {'command': 'ping'},
+                      socket_path=socket_path)
+        os.remove(socket_path)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(socket_path)
+            server.listen()
+            if os.getuid() == 0:
+                os.chown(socket_path, 12345, -1)
+                assert_raises(PermissionError, pydocstring.daemon.request, {'command': 'ping'},
+                              socket_path=socket_path)
+                response = pydocstring.daemon.run(['a.py', '--nowrite', '--no-cache'],
+                                                  cwd=dirname, socket_path=socket_path)
+                assert response['daemon'] is False and response['stdout'] == NUMPY + '\n'
+                os.chown(socket_path, os.getuid(), -1)
+
+            # daemon that does not respond
+            start = time.perf_counter()
+            response = pydocstring.daemon.run(['a.py', '--nowrite', '--no-cache'], cwd=dirname,
+                                              socket_path=socket_path, timeout=0.2)
+            assert time.perf_counter() - start < 5
+            assert response['status'] == 1 and response['daemon'] is True
+            assert 'did not respond' in response['stderr']
+
+
+CLIENT_SCRIPT = """
+import sys
+import pydocstring.daemon
+sys.exit(pydocstring.daemon.client_main(sys.argv[1:]))
+"""
+
+
+def test_daemon_filter():
+    """Test the filter of the standard input (-) with the client of pydocstring.daemon."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(pydocstring.daemon.__file__)))
+    with tempfile.TemporaryDirectory() as dirname:
+        socket_path = os.path.join(dirname, 'daemon.sock')
+        env = dict(os.environ, PYDOCSTRING_SOCKET=socket_path,
+                   PYTHONPATH=root + os.pathsep + os.environ.get('PYTHONPATH', ''))
+
+        def client(source):
+            return subprocess.run([sys.executable, '-c', CLIENT_SCRIPT, '-'], cwd=dirname,
+                                  env=env, input=source.encode(), stdout=subprocess.PIPE,
+                                  stderr=subprocess.PIPE)
+
+        # run in the client's process, with or without a daemon
+        for is_running in [False, True]:
+            if is_running:
+                thread = start_daemon(socket_path)
+            try:
+                process = client(SOURCE)
+                assert process.returncode == 0, process.stderr
+                assert process.stdout.decode() == NUMPY and process.stderr == b''
+                process = client(SOURCE + EXAMPLE)
+                assert process.returncode == 1
+                assert process.stdout.decode() == NUMPY + EXAMPLE
+                assert process.stderr.decode().startswith('-: TypeError')
+                if is_running:
+                    # standard input is not forwarded to the daemon
+                    response = pydocstring.daemon.request({'argv': ['-'], 'cwd': dirname},
+                                                          socket_path=socket_path)
+                    assert response['status'] == 2 and response['invalid']
+            finally:
+                if is_running:
+                    pydocstring.daemon.request({'command': 'stop'}, socket_path=socket_path)
+                    thread.join(10)
@@ -552,6 +552,80 @@ def test_docstring_inherit():
     assert test_one.info['parameters'][0].types == ['int']
 
 
+    # duplicate entries in the inherited docstring
+    test_one = docstring.Docstring(parameters=[{'name': 'a', 'descs': 'one'}])
+    test_two = docstring.Docstring(parameters=[{'name': 'a', 'descs': 'two'},
+                                               {'name': 'a', 'descs': 'three'}])
+    test_one.inherit(test_two)
+    assert [i.descs for i in test_one.info['parameters']] == [['one'], ['three']]
+
+
+def test_docstring_get_entry():
+    """Test pydocstring.docstring.Docstring.get_entry, has_entry, and iter_entries."""
+    test = docstring.Docstring(parameters=[{'name': 'a', 'descs': 'one'},
+                                           {'name': 'b', 'descs': 'two'}],
+                               notes='something')
+    assert test.get_entry('parameters', 'a').descs == ['one']
+    assert test.get_entry('Parameters', 'b').descs == ['two']
+    assert test.has_entry('parameters', 'a')
+    assert not test.has_entry('parameters', 'c')
+    assert not test.has_entry('methods', 'a')
+    assert not test.has_entry('notes', 'something')
+    assert_raises(KeyError, test.get_entry, 'parameters', 'c')
+    assert [name for name, _ in test.iter_entries('parameters')] == ['a', 'b']
+    assert list(test.iter_entries('notes')) == []
+
+    # inherit
+    test.inherit(docstring.Docstring(parameters={'name': 'c', 'descs': 'three'},
+                                     methods={'name': 'f', 'signature': '(x)'}))
+    assert test.get_entry('parameters', 'c').descs == ['three']
+    assert test.get_entry('methods', 'f').signature == '(x)'
+    assert [name for name, _ in test.iter_entries('parameters')] == ['c', 'a', 'b']
+
+    # modifications of info
+    test.info['parameters'].append(docstring.TabbedInfo('d'))
+    assert test.has_entry('parameters', 'd')
+    del test.info['parameters'][0]
+    assert not test.has_entry('parameters', 'c')
+    assert test.get_entry('parameters', 'a').descs == ['one']
+    # in place (the index is discarded explicitly)
+    test.info['parameters'][0].name = 'e'
+    assert not test.has_entry('parameters', 'e')
+    test.reindex('Parameters')
+    assert test.has_entry('parameters', 'e')
+    assert not test.has_entry('parameters', 'a')
+    test.info['parameters'][1] = docstring.TabbedInfo('z')
+    assert not test.has_entry('parameters', 'z')
+    test.reindex()
+    assert test.get_entry('parameters', 'z') is test.info['parameters'][1]
+    assert not test.has_entry('parameters', 'b')
+    test.info['parameters'][1].name = 'g'
+    test.info['parameters'][0] = docstring.TabbedInfo('y')
+    test.reindex('parameters')
+    assert test.get_entry('parameters', 'g') is test.info['parameters'][1]
+    test.inherit(docstring.Docstring(parameters={'name': 'y', 'descs': 'inherited'}))
+    assert [name for name, _ in test.iter_entries('parameters')] == ['y', 'g', 'd']
+    assert test.get_entry('parameters', 'y').descs == []
+
+    # missing names are looked up in the index (without scanning the section)
+    index = test._section_index
+    rebuilt = []
+    test._section_index = lambda section, rebuild=False: (rebuilt.append(rebuild)
+                                                          or index(section, rebuild=rebuild))
+    assert not test.has_entry('parameters', 'missing')
+    assert_raises(KeyError, test.get_entry, 'parameters', 'missing')
+    test.inherit(docstring.Docstring(parameters={'name': 'x'}))
+    assert not any(rebuilt)
+    del test._section_index
+    test.info['parameters'] = [docstring.TabbedInfo('f')]
+    assert test.has_entry('parameters', 'f')
+    assert not test.has_entry('parameters', 'a')
+
+    # decoded docstring
+    test = docstring.Docstring.from_bytes(test.to_bytes())
+    assert test.has_entry('parameters', 'f')
+
+
 def test_docstring_make_numpy_equations():
     """Test pydocstring.docstring.Docstring.make_numpy with equations."""
     test = docstring.Docstring(**{'extended': '.. math::\n\n    x=2'})
@@ -612,3 +686,55 @@ def test_docstring_make_numpy_equations():
                                  'c_{\mathbf{m}} \ket{\mathbf{m}}\n\n'
                                  '    something\n\n'
                                  '"""')
+
+
+def test_docstring_to_dict():
+    """Test pydocstring.docstring.Docstring.to_dict and Docstring.from_dict."""
+    test = docstring.Docstring(summary='a', extended=['b', 'c'],
+                               parameters=[{'name': 'x', 'types': ['int', 'float'], 'descs': 'd'},
+                                           {'name': 'y', 'signature': '(z)'}])
+    data = test.to_dict()
+    assert data == {'summary': 'a', 'extended': ['b', 'c'],
+                    'parameters': [{'name': 'x', 'signature': '', 'types': ['int', 'float'],
+                                    'descs': ['d']},
+                                   {'name': 'y', 'signature': '(z)', 'types': [], 'descs': []}]}
+    new_test = docstring.Docstring.from_dict(data)
+    assert new_test.to_dict() == data
+    assert new_test.make_numpy() == test.make_numpy()
+    assert_raises(TypeError, docstring.Docstring.from_dict, {'summary': ['a']})
+
+
+def test_docstring_to_bytes():
+    """Test pydocstring.docstring.Docstring.to_bytes and Docstring.from_bytes."""
+    test = docstring.Docstring(summary='a', extended=['b', 'a'], notes='b',
+                               parameters=[{'name': 'a', 'types': ['int', 'a'], 'descs': 'b'},
+                                           {'name': 'y', 'signature': '(z)'}],
+                               returns={'name': 'a', 'types': 'int'})
+    data = test.to_bytes()
+    assert isinstance(data, bytes)
+    new_test = docstring.Docstring.from_bytes(data)
+    assert isinstance(new_test, docstring.Docstring)
+    assert new_test.to_dict() == test.to_dict()
+    assert list(new_test.info) == list(test.info)
+    assert all(isinstance(i, docstring.TabbedInfo) for i in new_test.info['parameters'])
+    assert new_test.make_numpy() == test.make_numpy()
+    # empty docstring
+    assert docstring.Docstring.from_bytes(docstring.Docstring().to_bytes()).info == {}
+    # bad data
+    assert_raises(ValueError, docstring.Docstring.from_bytes, b'')
+    assert_raises(ValueError, docstring.Docstring.from_bytes, b'abcdefg')
+    assert_raises(ValueError, docstring.Docstring.from_bytes, b'PDS\xff' + data[4:])
+    assert_raises(ValueError, docstring.Docstring.from_bytes, data[:-10])
+
+
+def test_docstring_pickle():
+    """Test pickling of pydocstring.docstring.Docstring and TabbedInfo."""
+    import pickle
+    test = docstring.Docstring(summary='a', extended=['b'],
+                               parameters=[{'name': 'x', 'types': 'int', 'descs': 'b'}])
+    new_test = pickle.loads(pickle.dumps(test))
+    assert new_test.to_dict() == test.to_dict()
+
+    info = docstring.TabbedInfo('x', signature='(a)', types=['int'], descs=['b'])
+    new_info = pickle.loads(pickle.dumps(info))
+    assert new_info.to_dict() == info.to_dict()
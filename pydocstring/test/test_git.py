@@ -0,0 +1,92 @@
+import os
+import subprocess
+import tempfile
+from nose.tools import assert_raises
+import pydocstring.git
+
+
+DIFF = '''diff --git a.py a.py
+index 1111111..2222222 100644
+--- a.py
++++ a.py
+@@ -3 +3 @@ def f():
+-    """Old."""
++    """New."""
+@@ -10,2 +10,0 @@ def g():
+-    x = 1
+-    y = 2
+@@ -20,0 +19,3 @@ def h():
++++ added line that looks like a header
++
++
+diff --git "b \\"quoted\\".py" "b \\"quoted\\".py"
+new file mode 100644
+--- /dev/null
++++ "b \\"quoted\\".py"
+@@ -0,0 +1 @@
++x = 1
+diff --git c.py d.py
+similarity index 100%
+rename from c.py
+rename to d.py
+'''
+
+
+def git(dirname, *args):
+    """Run a git command (with an identity) in the directory."""
+    subprocess.check_output(['git', '-c', 'user.name=Test', '-c', 'user.email=test@example.com']
+                            + list(args), cwd=dirname, stderr=subprocess.STDOUT)
+
+
+def test_parse_diff():
+    """Test pydocstring.git.parse_diff."""
+    assert pydocstring.git.parse_diff(DIFF) == {'a.py': [(3, 3), (10, 11), (19, 21)],
+                                                'b "quoted".py': [(1, 1)]}
+    assert pydocstring.git.parse_diff('') == {}
+
+
+def test_changed_lines():
+    """Test pydocstring.git.changed_lines."""
+    with tempfile.TemporaryDirectory() as dirname:
+        assert_raises(ValueError, pydocstring.git.changed_lines, cwd=dirname)
+
+        git(dirname, 'init', '-q')
+        os.makedirs(os.path.join(dirname, 'pkg'))
+        for name in ['a.py', 'deleted.py', 'renamed.py', os.path.join('pkg', 'b.py')]:
+            with open(os.path.join(dirname, name), 'w') as f:
+                f.write(''.join('line {0}\n'.format(i) for i in range(1, 11)))
+        with open(os.path.join(dirname, '.gitignore'), 'w') as f:
+            f.write('ignored.py\n')
+        git(dirname, 'add', '.')
+        git(dirname, 'commit', '-q', '-m', 'Initial commit')
+        assert pydocstring.git.changed_lines(cwd=dirname) == {}
+
+        with open(os.path.join(dirname, 'a.py'), 'w') as f:
+            f.write(''.join('line {0}\n'.format(i) for i in range(1, 11) if i != 5)
+                    .replace('line 8', 'changed 8'))
+        with open(os.path.join(dirname, 'pkg', 'b.py'), 'a') as f:
+            f.write('line 11\n')
+        git(dirname, 'add', 'pkg')
+        os.remove(os.path.join(dirname, 'deleted.py'))
+        git(dirname, 'mv', 'renamed.py', 'moved.py')
+        for name in ['untracked.py', 'ignored.py']:
+            with open(os.path.join(dirname, name), 'w') as f:
+                f.write('x = 1\n')
+
+        changes = {'a.py': [(4, 5), (7, 7)], os.path.join('pkg', 'b.py'): [(11, 11)],
+                   'untracked.py': None}
+        assert pydocstring.git.changed_lines(cwd=dirname) == changes
+        # relative to the working directory
+        assert pydocstring.git.changed_lines(cwd=os.path.join(dirname, 'pkg')) == {
+            os.path.join('..', 'a.py'): [(4, 5), (7, 7)], 'b.py': [(11, 11)],
+            os.path.join('..', 'untracked.py'): None
+        }
+        assert pydocstring.git.changed_lines(cwd=dirname, untracked=False) == {
+            'a.py': [(4, 5), (7, 7)], os.path.join('pkg', 'b.py'): [(11, 11)]
+        }
+
+        git(dirname, 'commit', '-q', '-m', 'Second commit')
+        assert pydocstring.git.changed_lines('HEAD~1', cwd=dirname, untracked=False) == {
+            'a.py': [(4, 5), (7, 7)], os.path.join('pkg', 'b.py'): [(11, 11)]
+        }
+        assert_raises(ValueError, pydocstring.git.changed_lines, 'unknown', cwd=dirname)
@@ -0,0 +1,726 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from nose.tools import assert_raises
+import pydocstring.cache
+from pydocstring.scripts.pydocstring_to_instance import (
+    STAGES, check_file, check_files, convert_file, convert_files, convert_stream, find_files, main,
+    replace_docstrings, shard_files
+)
+
+
+SOURCE = '''"""Module docstring."""
+
+
+class A:
+    r"""Summary of A.
+
+    Parameters
+    ----------
+    x : int
+        Raw \\parameter.
+    """
+    def f(self):
+        """Same summary.
+
+        Returns
+        -------
+        y : int
+            Some value.
+        """
+
+    def g(self):
+        """Same summary.
+
+        Returns
+        -------
+        y : int
+            Some value.
+        """
+
+
+class B: """Same summary."""
+'''
+
+NUMPY = '''"""Module docstring."""
+
+
+class A:
+    r"""Summary of A.
+
+    Parameters
+    ----------
+    x : int
+        Raw \\parameter.
+
+    """
+    def f(self):
+        """Same summary.
+
+        Returns
+        -------
+        y : int
+            Some value.
+
+        """
+
+    def g(self):
+        """Same summary.
+
+        Returns
+        -------
+        y : int
+            Some value.
+
+        """
+
+
+class B: """Same summary."""
+'''
+
+
+def test_replace_docstrings():
+    """Test pydocstring.scripts.pydocstring_to_instance.replace_docstrings."""
+    with tempfile.TemporaryDirectory() as dirname:
+        filename = os.path.join(dirname, 'test.py')
+        with open(filename, 'w') as f:
+            f.write(SOURCE)
+        replace_docstrings(filename, 'numpy')
+        with open(filename) as f:
+            assert f.read() == NUMPY
+        with open(filename + '.bak') as f:
+            assert f.read() == SOURCE
+
+        # newlines and encoding of the file are kept
+        with open(filename, 'wb') as f:
+            f.write('# -*- coding: latin-1 -*-\r\n"""Module é.\r\n\r\nNotes\r\n-----\r\n'
+                    'Some é.\r\n"""\r\n'.encode('latin-1'))
+        replace_docstrings(filename, 'numpy')
+        with open(filename, 'rb') as f:
+            assert f.read().decode('latin-1') == ('# -*- coding: latin-1 -*-\r\n"""Module é.\r\n'
+                                                  '\r\nNotes\r\n-----\r\nSome é.\r\n\r\n'
+                                                  '"""\r\n')
+
+        assert_raises(NotImplementedError, replace_docstrings, filename, 'google')
+
+
+# section that cannot be parsed (TypeError)
+EXAMPLE = 'def f():\n    """Summary.\n\n    Example\n    -------\n    >>> f()\n    """\n'
+
+
+def make_tree(dirname, files):
+    """Write the files (dictionary of the relative names to the contents) in the directory."""
+    for name, contents in files.items():
+        filename = os.path.join(dirname, *name.split('/'))
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'w') as f:
+            f.write(contents)
+
+
+def untimed(results):
+    """Return the results without their times (which differ between runs)."""
+    return [dict(result, times=None) for result in results]
+
+
+def test_find_files():
+    """Test pydocstring.scripts.pydocstring_to_instance.find_files."""
+    with tempfile.TemporaryDirectory() as dirname:
+        make_tree(dirname, {'a.py': '', 'b.txt': '', 'pkg/c.py': '', 'pkg/build/d.py': '',
+                            'pkg/sub/e.py': '', 'pkg/sub/test_e.py': ''})
+
+        def relative(filenames):
+            return [os.path.relpath(filename, dirname).replace(os.sep, '/')
+                    for filename in filenames]
+
+        assert relative(find_files([dirname])) == ['a.py', 'pkg/build/d.py', 'pkg/c.py',
+                                                   'pkg/sub/e.py', 'pkg/sub/test_e.py']
+        assert relative(find_files([dirname], exclude=['build', 'test_*'])) == [
+            'a.py', 'pkg/c.py', 'pkg/sub/e.py'
+        ]
+        assert relative(find_files([dirname], include=['*.txt', 'sub/*.py'])) == [
+            'b.txt', 'pkg/sub/e.py', 'pkg/sub/test_e.py'
+        ]
+        # globs, explicit files (not filtered by include), and duplicates
+        assert relative(find_files([os.path.join(dirname, '**', 'e.py'),
+                                    os.path.join(dirname, 'b.txt'),
+                                    os.path.join(dirname, 'pkg', 'sub')])) == [
+            'b.txt', 'pkg/sub/e.py', 'pkg/sub/test_e.py'
+        ]
+        # file lists
+        files_from = os.path.join(dirname, 'files.txt')
+        with open(files_from, 'w') as f:
+            f.write('# comment\n\n{0}\n{1}\n'.format(os.path.join(dirname, 'a.py'),
+                                                     os.path.join(dirname, 'pkg', 'build')))
+        assert relative(find_files([], files_from=files_from)) == ['a.py', 'pkg/build/d.py']
+
+        assert_raises(FileNotFoundError, find_files, [os.path.join(dirname, 'missing*.py')])
+
+
+def test_convert_files():
+    """Test pydocstring.scripts.pydocstring_to_instance.convert_files."""
+    with tempfile.TemporaryDirectory() as dirname:
+        # files of different sizes
+        files = {'module{0}.py'.format(i): SOURCE + '\n' * i for i in range(6)}
+        files['invalid.py'] = 'def f(:\n'
+        make_tree(dirname, files)
+        filenames = find_files([dirname])
+
+        results = convert_files(filenames, 'numpy', write=False)
+        assert [result['filename'] for result in results] == filenames
+        assert results[0]['error'].startswith('SyntaxError')
+        for result in results[1:]:
+            assert result['error'] is None
+            assert result['docstrings'] == 5
+            assert result['code'] == NUMPY + '\n' * (result['bytes'] - len(SOURCE))
+        # results (except the times) do not depend on the number of processes
+        assert untimed(convert_files(filenames, 'numpy', write=False, jobs=3)) == untimed(results)
+
+        results = convert_files(filenames[1:], 'numpy', jobs=2)
+        assert all(result['code'] is None for result in results)
+        for filename in filenames[1:]:
+            with open(filename) as f:
+                assert f.read() == NUMPY + '\n' * (len(files[os.path.basename(filename)])
+                                                    - len(SOURCE))
+
+        assert_raises(NotImplementedError, convert_files, filenames, 'google')
+
+
+def test_files_errors():
+    """Test that an error of a file does not stop the conversion (or the check) of the others."""
+    with tempfile.TemporaryDirectory() as dirname:
+        make_tree(dirname, {'a.py': SOURCE, 'b.py': EXAMPLE, 'c.py': SOURCE + '\n'})
+        filenames = find_files([dirname])
+        for jobs in [1, 2]:
+            results = check_files(filenames, 'numpy', jobs=jobs)
+            assert [result['error'] is None for result in results] == [True, False, True]
+            assert results[1]['error'].startswith('TypeError')
+            assert [result['changed'] for result in results] == [True, False, True]
+            results = convert_files(filenames, 'numpy', write=False, jobs=jobs)
+            assert [result['error'] is None for result in results] == [True, False, True]
+            assert results[1]['error'].startswith('TypeError')
+            assert results[2]['code'] == NUMPY + '\n'
+
+        report_filename = os.path.join(dirname, 'r.json')
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            assert main([dirname, '--jobs', '2', '--no-cache', '--report', report_filename]) == 1
+        assert 'b.py: TypeError' in stderr.getvalue()
+        assert stderr.getvalue().splitlines()[-1].startswith('3 files (1 failed, 0 cached, '
+                                                             '2 changed)')
+        with open(report_filename) as f:
+            assert json.load(f)['totals']['failed'] == 1
+        for name in ['a.py', 'c.py']:
+            assert os.path.exists(os.path.join(dirname, name + '.bak'))
+            assert not convert_file(os.path.join(dirname, name), 'numpy', write=False)['changed']
+        with open(os.path.join(dirname, 'b.py')) as f:
+            assert f.read() == EXAMPLE
+
+
+def test_convert_file_cache():
+    """Test pydocstring.scripts.pydocstring_to_instance.convert_file with a cache."""
+    with tempfile.TemporaryDirectory() as dirname:
+        make_tree(dirname, {'a.py': SOURCE, 'b.py': NUMPY, 'c.py': NUMPY + '\n'})
+        filename = os.path.join(dirname, 'a.py')
+        cache_dir = os.path.join(dirname, 'cache')
+        cache = pydocstring.cache.ConversionCache(cache_dir)
+
+        result = convert_file(filename, 'numpy', cache=cache)
+        assert result['changed'] and not result['cached'] and result['docstrings'] == 5
+        # original and converted contents are cached
+        assert len(result['cache_entries']) == 2
+        assert os.path.exists(filename + '.bak')
+        os.remove(filename + '.bak')
+        mtime = os.stat(filename).st_mtime_ns
+
+        # converted file is not parsed (nor rewritten)
+        result = convert_file(filename, 'numpy', cache=cache)
+        assert result['cached'] and not result['changed'] and result['docstrings'] == 5
+        assert result['code'] is None
+        assert convert_file(filename, 'numpy', write=False, cache=cache)['code'] == NUMPY
+        # other options
+        assert not convert_file(filename, 'numpy', width=80, cache=cache)['cached']
+        # unchanged files are not rewritten even without a cache
+        result = convert_file(filename, 'numpy')
+        assert not result['changed'] and not result['cached']
+        assert os.stat(filename).st_mtime_ns == mtime
+        assert not os.path.exists(filename + '.bak')
+
+        # cache is shared with the workers and is keyed by the contents (not the names)
+        cache.save()
+        cache = pydocstring.cache.ConversionCache(cache_dir)
+        results = convert_files(find_files([dirname]), 'numpy', jobs=2, cache=cache)
+        assert [result['cached'] for result in results] == [True, True, False]
+        results = convert_files(find_files([dirname]), 'numpy', jobs=2, cache=cache)
+        assert [result['cached'] for result in results] == [True, True, True]
+        cache.save()
+        assert pydocstring.cache.ConversionCache(cache_dir).entries == cache.entries
+
+        # through the script
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            assert main([dirname, '--cache-dir', cache_dir]) == 0
+        assert stderr.getvalue().startswith('3 files (0 failed, 3 cached, 0 changed)')
+
+
+def test_convert_file_stream():
+    """Test pydocstring.scripts.pydocstring_to_instance.convert_file on a memory-mapped file."""
+    with tempfile.TemporaryDirectory() as dirname:
+        source = '# -*- coding: latin-1 -*-\r\n' + SOURCE.replace('Some value', 'Valeur é')
+        source = source.replace('\n', '\r\n').replace('\r\r', '\r')
+        filename = os.path.join(dirname, 'a.py')
+        with open(filename, 'wb') as f:
+            f.write(source.encode('latin-1'))
+        os.chmod(filename, 0o640)
+
+        # same as the conversion in memory
+        expected = convert_file(filename, 'numpy', write=False)['code']
+        result = convert_file(filename, 'numpy', stream=True)
+        assert result['changed'] and result['docstrings'] == 5 and result['code'] is None
+        with open(filename, 'rb') as f:
+            assert f.read() == expected.encode('latin-1')
+        assert result['bytes_out'] == len(expected.encode('latin-1'))
+        with open(filename + '.bak', 'rb') as f:
+            assert f.read() == source.encode('latin-1')
+        # temporary file is renamed
+        assert sorted(os.listdir(dirname)) == ['a.py', 'a.py.bak']
+        assert os.stat(filename).st_mode & 0o777 == 0o640
+
+        # unchanged file is not replaced
+        os.remove(filename + '.bak')
+        mtime = os.stat(filename).st_mtime_ns
+        assert not convert_file(filename, 'numpy', stream=True)['changed']
+        assert os.stat(filename).st_mtime_ns == mtime
+        assert os.listdir(dirname) == ['a.py']
+
+        # memory does not depend on the size of the file
+        filename = os.path.join(dirname, 'b.py')
+        with open(filename, 'w') as f:
+            f.write(SOURCE + ('# ' + 'x' * 1000 + '\n') * 2000 + 'x = 1\n')
+        tracemalloc.start()
+        try:
+            assert convert_file(filename, 'numpy', stream=True)['changed']
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert peak < os.path.getsize(filename) / 10
+        with open(filename) as f:
+            assert f.read() == NUMPY + ('# ' + 'x' * 1000 + '\n') * 2000 + 'x = 1\n'
+
+
+def test_convert_stream():
+    """Test pydocstring.scripts.pydocstring_to_instance.convert_stream."""
+    source = '# -*- coding: latin-1 -*-\r\n' + SOURCE.replace('Some value', 'Valeur é')
+    source = source.replace('\n', '\r\n').replace('\r\r', '\r').encode('latin-1')
+    with tempfile.TemporaryDirectory() as dirname:
+        filename = os.path.join(dirname, 'a.py')
+        with open(filename, 'wb') as f:
+            f.write(source)
+        expected = convert_file(filename, 'numpy', write=False)['code'].encode('latin-1')
+    output = io.BytesIO()
+    result = convert_stream(io.BytesIO(source), output, 'numpy')
+    assert output.getvalue() == expected
+    assert result['changed'] and result['docstrings'] == 5 and result['code'] is None
+    assert result['bytes'] == len(source) and result['bytes_out'] == len(expected)
+    output = io.BytesIO()
+    assert not convert_stream(io.BytesIO(expected), output, 'numpy')['changed']
+    assert output.getvalue() == expected
+
+    # code is written as it is read (except for the line that is being tokenized)
+    class Input(io.BytesIO):
+        def readline(self):
+            positions.append((self.tell(), len(output.getvalue())))
+            return super().readline()
+
+    line = b'x = 1\n'
+    output = io.BytesIO()
+    positions = []
+    convert_stream(Input(SOURCE.encode() + line * 1000), output, 'numpy')
+    assert output.getvalue() == NUMPY.encode() + line * 1000
+    growth = len(NUMPY.encode()) - len(SOURCE.encode())
+    assert all(size == position - len(line) + growth for position, size in positions[-1000:])
+
+    # code after an error is written unchanged
+    source = SOURCE + 'def f(:\n    """\n' + SOURCE
+    output = io.BytesIO()
+    assert_raises(SyntaxError, convert_stream, io.BytesIO(source.encode()), output, 'numpy')
+    assert output.getvalue().decode() == NUMPY + source[len(SOURCE):]
+    assert_raises(ValueError, convert_stream, io.BytesIO(b'"""A."""\rx = 1\r'), io.BytesIO(),
+                  'numpy')
+    # any error (e.g. TypeError of a section that cannot be parsed)
+    source = SOURCE + EXAMPLE + SOURCE
+    output = io.BytesIO()
+    assert_raises(TypeError, convert_stream, io.BytesIO(source.encode()), output, 'numpy')
+    assert output.getvalue().decode() == NUMPY + EXAMPLE + SOURCE
+
+
+def test_check_files():
+    """Test pydocstring.scripts.pydocstring_to_instance.check_files."""
+    with tempfile.TemporaryDirectory() as dirname:
+        make_tree(dirname, {'a.py': SOURCE, 'b.py': NUMPY, 'c.py': SOURCE + '\n',
+                            'd.py': 'def f(:\n'})
+        filenames = find_files([dirname])
+        differences = [(5, 'A'), (13, 'A.f'), (22, 'A.g')]
+
+        result = check_file(filenames[0], 'numpy')
+        assert result['changed'] and result['docstrings'] == 5
+        assert result['differences'] == differences
+        # stops at the first difference
+        result = check_file(filenames[0], 'numpy', max_differences=1)
+        assert result['differences'] == differences[:1] and result['docstrings'] == 2
+        result = check_file(filenames[1], 'numpy')
+        assert not result['changed'] and result['differences'] == []
+
+        results = check_files(filenames, 'numpy')
+        assert [result['differences'] for result in results] == [differences, [], differences,
+                                                                 []]
+        assert results[3]['error'].startswith('SyntaxError')
+        for max_differences in [1, 3, 4]:
+            results = check_files(filenames, 'numpy', max_differences=max_differences)
+            assert untimed(check_files(filenames, 'numpy', max_differences=max_differences,
+                                       jobs=2)) == untimed(results)
+            assert sum(len(result['differences']) for result in results) == max_differences
+        assert [result['filename'] for result in results] == filenames[:3]
+        assert [result['differences'] for result in results] == [differences, [],
+                                                                 differences[:1]]
+        # files are not modified
+        assert sorted(os.listdir(dirname)) == ['a.py', 'b.py', 'c.py', 'd.py']
+        with open(filenames[0]) as f:
+            assert f.read() == SOURCE
+
+        # files that are in the format are cached
+        cache = pydocstring.cache.ConversionCache(os.path.join(dirname, 'cache'))
+        results = check_files(filenames, 'numpy', cache=cache, jobs=2)
+        assert [result['cached'] for result in results] == [False, False, False, False]
+        results = check_files(filenames, 'numpy', cache=cache)
+        assert [result['cached'] for result in results] == [False, True, False, False]
+        assert not results[1]['changed']
+
+        # through the script
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            assert main([dirname, '--check', '--no-cache', '--exclude', 'd.py']) == 1
+        assert stdout.getvalue() == '{0}:5: A\n'.format(filenames[0])
+        assert stderr.getvalue().startswith('1 docstrings are not in the numpy format (check '
+                                            'stopped).\n1 files (0 failed, 0 cached, 1 changed)')
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            assert main([dirname, '--check', '--no-cache', '--max-differences', '0',
+                         '--exclude', 'd.py']) == 1
+        assert stdout.getvalue() == ''.join('{0}:{1}: {2}\n'.format(filename, *difference)
+                                            for filename in [filenames[0], filenames[2]]
+                                            for difference in differences)
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            assert main([filenames[1], '--check', '--no-cache']) == 0
+
+
+def test_main():
+    """Test pydocstring.scripts.pydocstring_to_instance.main."""
+    with tempfile.TemporaryDirectory() as dirname:
+        make_tree(dirname, {'a.py': SOURCE, 'pkg/b.py': SOURCE})
+        filename = os.path.join(dirname, 'a.py')
+
+        # single file and format (as positional arguments)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            assert main([filename, 'numpy', '--nowrite', '--no-cache']) == 0
+        assert stdout.getvalue() == NUMPY + '\n'
+        assert stderr.getvalue() == ''
+
+        # directory in parallel, with a summary
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            assert main([dirname, '--jobs', '2', '--no-cache']) == 0
+        assert stderr.getvalue().startswith('2 files (0 failed, 0 cached, 2 changed), 10 '
+                                            'docstrings')
+        for name in ['a.py', 'pkg/b.py']:
+            with open(os.path.join(dirname, *name.split('/'))) as f:
+                assert f.read() == NUMPY
+
+        # errors
+        make_tree(dirname, {'invalid.py': 'def f(:\n'})
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            assert main([dirname, '--exclude', 'pkg', '--no-cache']) == 1
+        assert 'invalid.py: SyntaxError' in stderr.getvalue()
+
+
+def test_main_filter():
+    """Test pydocstring.scripts.pydocstring_to_instance.main on the standard input."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(pydocstring.cache.__file__)))
+    env = dict(os.environ, PYTHONPATH=root + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    script = ('import sys\nfrom pydocstring.scripts.pydocstring_to_instance import main\n'
+              'sys.exit(main(sys.argv[1:]))\n')
+    # code is not imported (nor written to a file)
+    source = SOURCE + 'raise SystemExit(5)\n'
+    with tempfile.TemporaryDirectory() as dirname:
+        process = subprocess.run([sys.executable, '-c', script, '-', 'numpy'], cwd=dirname,
+                                 env=env, input=source.encode(), stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE)
+        assert process.returncode == 0, process.stderr
+        assert process.stdout.decode() == NUMPY + 'raise SystemExit(5)\n'
+        assert process.stderr == b''
+        assert os.listdir(dirname) == []
+
+        # code after an error is unchanged
+        process = subprocess.run([sys.executable, '-c', script, '-', '--report', 'r.json'],
+                                 cwd=dirname, env=env, input=(source + 'def f(:\n').encode(),
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        assert process.returncode == 1
+        assert process.stdout.decode() == NUMPY + 'raise SystemExit(5)\ndef f(:\n'
+        assert process.stderr.decode().startswith('-: SyntaxError')
+        with open(os.path.join(dirname, 'r.json')) as f:
+            assert json.load(f)['totals']['failed'] == 1
+
+        # any error
+        process = subprocess.run([sys.executable, '-c', script, '-'], cwd=dirname, env=env,
+                                 input=(SOURCE + EXAMPLE + SOURCE).encode(),
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        assert process.returncode == 1
+        assert process.stdout.decode() == NUMPY + EXAMPLE + SOURCE
+        assert process.stderr.decode().startswith('-: TypeError')
+
+    stderr = io.StringIO()
+    for args in [['-', 'a.py'], ['-', '--check'], ['-', '--checkpoint', 'c.jsonl']]:
+        with contextlib.redirect_stderr(stderr):
+            assert_raises(SystemExit, main, args)
+
+
+def test_report():
+    """Test pydocstring.scripts.pydocstring_to_instance.report."""
+    with tempfile.TemporaryDirectory() as dirname:
+        make_tree(dirname, {'a.py': SOURCE, 'b.py': NUMPY, 'invalid.py': 'def f(:\n'})
+        report_filename = os.path.join(dirname, 'report.json')
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            assert main([dirname, '--no-cache', '--report', report_filename]) == 1
+        with open(report_filename) as f:
+            report_data = json.load(f)
+
+    assert report_data['jobs'] == 1
+    assert [file_data['filename'] for file_data in report_data['files']] == [
+        os.path.join(dirname, name) for name in ['a.py', 'b.py', 'invalid.py']
+    ]
+    a_data, b_data, invalid_data = report_data['files']
+    assert a_data['changed'] and a_data['docstrings'] == 5 and a_data['error'] is None
+    assert (a_data['bytes'], a_data['bytes_out']) == (len(SOURCE), len(NUMPY))
+    assert not b_data['changed'] and b_data['bytes'] == b_data['bytes_out'] == len(NUMPY)
+    assert sorted(a_data['times']) == sorted(STAGES + ('total',))
+    assert all(time >= 0 for time in a_data['times'].values())
+    assert a_data['times']['total'] >= sum(a_data['times'][stage] for stage in STAGES) - 1e-6
+    assert invalid_data['error'].startswith('SyntaxError') and invalid_data['times'] is None
+
+    totals = report_data['totals']
+    assert (totals['files'], totals['failed'], totals['changed'], totals['docstrings']) == \
+        (3, 1, 1, 10)
+    assert totals['bytes'] == len(SOURCE) + len(NUMPY)
+    assert totals['times']['parse'] == a_data['times']['parse'] + b_data['times']['parse']
+    assert abs(report_data['throughput']['files'] * report_data['elapsed'] - 3) < 1e-6
+
+
+def test_shard_files():
+    """Test pydocstring.scripts.pydocstring_to_instance.shard_files."""
+    with tempfile.TemporaryDirectory() as dirname:
+        files = {'module{0}.py'.format(i): 'x = 1\n' * (i * 37 % 50) for i in range(40)}
+        make_tree(dirname, files)
+        filenames = find_files([dirname])
+        largest = max(os.path.getsize(filename) for filename in filenames)
+
+        for count in range(1, 6):
+            shards = [shard_files(filenames, index, count) for index in range(1, count + 1)]
+            # union of the shards is all files, each once, in their order
+            assert sorted(sum(shards, [])) == sorted(filenames)
+            for shard in shards:
+                assert shard == [filename for filename in filenames if filename in shard]
+            # shards have about the same size
+            sizes = [sum(os.path.getsize(filename) + 1 for filename in shard) for shard in shards]
+            assert max(sizes) - min(sizes) <= largest + 1
+            # shards do not depend on the order of the files
+            assert shard_files(filenames[::-1], 1, count) == shards[0][::-1]
+
+        assert shard_files([], 1, 3) == []
+        assert_raises(ValueError, shard_files, filenames, 0, 3)
+        assert_raises(ValueError, shard_files, filenames, 4, 3)
+
+
+def test_main_shards():
+    """Test pydocstring.scripts.pydocstring_to_instance.main with shards and their reports."""
+    files = {'src/module{0}.py'.format(i): SOURCE + '\n' * i for i in range(7)}
+    cwd = os.getcwd()
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with tempfile.TemporaryDirectory() as dirname:
+        # each shard is converted in its own copy of the files (e.g. on another machine)
+        report_filenames = []
+        try:
+            for index in [1, 2, 3]:
+                node_dirname = os.path.join(dirname, 'node{0}'.format(index))
+                make_tree(node_dirname, files)
+                report_filenames.append(os.path.join(dirname, 'report{0}.json'.format(index)))
+                os.chdir(node_dirname)
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                    assert main(['src', '--shard', '{0}/3'.format(index), '--no-cache',
+                                 '--report', report_filenames[-1]]) == 0
+        finally:
+            os.chdir(cwd)
+        merged_filename = os.path.join(dirname, 'report.json')
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            assert main(['--merge-reports'] + report_filenames + ['--report', merged_filename]) == 0
+            # shard that is given twice, and invalid shard
+            assert_raises(SystemExit, main, ['--merge-reports', report_filenames[0],
+                                             report_filenames[0]])
+            assert_raises(SystemExit, main, ['src', '--shard', '4/3'])
+        with open(merged_filename) as f:
+            merged = json.load(f)
+
+        # every file is converted by exactly one shard
+        assert [file_data['filename'] for file_data in merged['files']] == sorted(files)
+        assert all(file_data['changed'] for file_data in merged['files'])
+        for name in files:
+            assert sum(os.path.exists(os.path.join(dirname, 'node{0}'.format(index), 'src',
+                                                   os.path.basename(name) + '.bak'))
+                       for index in [1, 2, 3]) == 1
+        assert merged['shards'] == [[1, 2, 3], 3]
+        assert merged['totals']['files'] == 7 and merged['totals']['docstrings'] == 35
+        assert merged['totals']['bytes'] == sum(len(SOURCE) + i for i in range(7))
+
+
+CRASH_SCRIPT = '''
+import os
+import sys
+import pydocstring.checkpoint
+import pydocstring.scripts.pydocstring_to_instance as script
+
+# process is killed (without any clean-up) at the given call of the given function
+module, name, num_calls = sys.argv[1], sys.argv[2], int(sys.argv[3])
+module = {'shutil': script.shutil, 'Checkpoint': pydocstring.checkpoint.Checkpoint}[module]
+function = getattr(module, name)
+calls = []
+
+
+def crash(*args, **kwargs):
+    calls.append(args)
+    if len(calls) == num_calls:
+        os._exit(3)
+    return function(*args, **kwargs)
+
+
+setattr(module, name, crash)
+sys.exit(script.main(sys.argv[4:]))
+'''
+
+
+def test_main_checkpoint():
+    """Test pydocstring.scripts.pydocstring_to_instance.main with a checkpoint and a crash."""
+    files = {'module{0}.py'.format(i): SOURCE + '\n' * i for i in range(6)}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(pydocstring.cache.__file__)))
+    env = dict(os.environ, PYTHONPATH=root + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    stderr = io.StringIO()
+    # killed before the backup of the 4th file, or after the 4th file is written but before it is
+    # recorded
+    for crash in [['shutil', 'copyfile', '4'], ['Checkpoint', 'add', '4']]:
+        with tempfile.TemporaryDirectory() as dirname:
+            make_tree(dirname, files)
+            checkpoint = os.path.join(dirname, 'checkpoint.jsonl')
+            args = [dirname, '--no-cache', '--checkpoint', checkpoint]
+            process = subprocess.run([sys.executable, '-c', CRASH_SCRIPT] + crash + args,
+                                     env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            assert process.returncode == 3, process.stderr
+            filenames = find_files([dirname])
+            assert [convert_file(filename, 'numpy', write=False)['changed']
+                    for filename in filenames] == [False] * 3 + [crash[0] == 'shutil'] + [True] * 2
+
+            with contextlib.redirect_stderr(stderr):
+                assert main(args + ['--resume', '--report', os.path.join(dirname, 'r.json')]) == 0
+            with open(os.path.join(dirname, 'r.json')) as f:
+                report_data = json.load(f)['files']
+            # recorded files are skipped and the others are converted once
+            assert [file_data['cached'] for file_data in report_data] == [True] * 3 + [False] * 3
+            assert [file_data['changed'] for file_data in report_data] == \
+                [False] * 3 + [crash[0] == 'shutil'] + [True] * 2
+            for filename in filenames:
+                with open(filename) as f:
+                    assert f.read() == NUMPY + '\n' * (len(files[os.path.basename(filename)])
+                                                        - len(SOURCE))
+                with open(filename + '.bak') as f:
+                    assert f.read() == files[os.path.basename(filename)]
+                assert not [name for name in os.listdir(dirname) if name.endswith('.tmp')]
+
+            # files that changed since they were recorded are converted again, and an
+            # interrupted line of the manifest is ignored
+            with open(checkpoint, 'a') as f:
+                f.write('{"filename": ')
+            with open(filenames[0], 'w') as f:
+                f.write(SOURCE)
+            with contextlib.redirect_stderr(stderr):
+                assert main(args + ['--resume', '--report', os.path.join(dirname, 'r.json')]) == 0
+            with open(os.path.join(dirname, 'r.json')) as f:
+                report_data = json.load(f)['files']
+            assert [file_data['changed'] for file_data in report_data] == [True] + [False] * 5
+            assert [file_data['cached'] for file_data in report_data] == [False] + [True] * 5
+
+            # files that are already recorded are not recorded again
+            with open(checkpoint) as f:
+                num_lines = len(f.readlines())
+            with contextlib.redirect_stderr(stderr):
+                assert main(args + ['--resume']) == 0
+            with open(checkpoint) as f:
+                assert len(f.readlines()) == num_lines
+
+            # other options
+            with contextlib.redirect_stderr(stderr):
+                assert_raises(SystemExit, main, args + ['--resume', '--width', '80'])
+                assert_raises(SystemExit, main, [dirname, '--resume'])
+
+    # files are recorded by the workers
+    with tempfile.TemporaryDirectory() as dirname:
+        make_tree(dirname, files)
+        args = [dirname, '--no-cache', '--checkpoint', os.path.join(dirname, 'checkpoint.jsonl'),
+                '--jobs', '3']
+        with contextlib.redirect_stderr(stderr):
+            assert main(args) == 0
+            with open(os.path.join(dirname, 'checkpoint.jsonl')) as f:
+                num_lines = len(f.readlines())
+            assert main(args + ['--resume', '--report', os.path.join(dirname, 'r.json')]) == 0
+        with open(os.path.join(dirname, 'r.json')) as f:
+            assert all(file_data['cached'] for file_data in json.load(f)['files'])
+        with open(os.path.join(dirname, 'checkpoint.jsonl')) as f:
+            assert len(f.readlines()) == num_lines
+
+
+def test_main_changed():
+    """Test pydocstring.scripts.pydocstring_to_instance.main with the changes in a git repo."""
+    with tempfile.TemporaryDirectory() as dirname:
+        make_tree(dirname, {'a.py': SOURCE, 'pkg/b.py': SOURCE})
+        for args in [['init', '-q'], ['add', '.'], ['commit', '-q', '-m', 'Initial commit']]:
+            subprocess.check_output(['git', '-c', 'user.name=Test', '-c',
+                                     'user.email=test@example.com'] + args, cwd=dirname)
+        # docstring of A.g is changed and d.py is new
+        make_tree(dirname, {'a.py': SOURCE.replace('Some value.\n        """\n\n\nclass B',
+                                                   'Other value.\n        """\n\n\nclass B'),
+                            'd.py': SOURCE})
+
+        cwd = os.getcwd()
+        stdout, stderr = io.StringIO(), io.StringIO()
+        try:
+            os.chdir(dirname)
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                assert main(['--changed', '--check', '--max-differences', '0', '--no-cache']) == 1
+                assert stdout.getvalue() == ('a.py:22: A.g\nd.py:5: A\nd.py:13: A.f\n'
+                                             'd.py:22: A.g\n')
+                # paths restrict the changed files
+                stdout.seek(0)
+                stdout.truncate()
+                assert main(['d.py', '--changed', 'HEAD', '--check', '--no-cache']) == 1
+                assert stdout.getvalue() == 'd.py:5: A\n'
+
+                assert main(['--changed', '--no-cache']) == 0
+                # only the changed docstring is converted
+                assert check_file('a.py', 'numpy')['differences'] == [(5, 'A'), (13, 'A.f')]
+                assert not os.path.exists(os.path.join('pkg', 'b.py.bak'))
+                with open('d.py') as f:
+                    assert f.read() == NUMPY
+        finally:
+            os.chdir(cwd)
@@ -0,0 +1,136 @@
+import io
+import os
+import tempfile
+from nose.tools import assert_raises
+import pydocstring.source
+
+
+SOURCE = '''"""Module docstring."""
+import os
+
+
+class A:
+    r\'\'\'Class A.
+
+    Raw \\docstring.
+    \'\'\'
+    def f(self):
+        "Method f." ' Continued.'
+
+    @property
+    def p(self):
+        """Property p."""
+
+    if os:
+        async def g(self):
+            """Method g."""
+
+
+def func():
+    x = 1
+    """Not a docstring."""
+
+    def inner():
+        u"""Inner function."""
+    return inner
+'''
+
+
+def test_extract_docstrings():
+    """Test pydocstring.source.extract_docstrings."""
+    literals = pydocstring.source.extract_docstrings(SOURCE)
+    assert [(literal.name, literal.kind) for literal in literals] == [
+        ('', 'module'), ('A', 'class'), ('A.f', 'function'), ('A.p', 'property'),
+        ('A.g', 'function'), ('func.<locals>.inner', 'function')
+    ]
+    assert [literal.docstring for literal in literals] == [
+        'Module docstring.', 'Class A.\n\n    Raw \\docstring.\n    ', 'Method f. Continued.',
+        'Property p.', 'Method g.', 'Inner function.'
+    ]
+    assert [SOURCE[literal.start:literal.end] for literal in literals] == [
+        '"""Module docstring."""', "r'''Class A.\n\n    Raw \\docstring.\n    '''",
+        '"Method f." \' Continued.\'', '"""Property p."""', '"""Method g."""',
+        'u"""Inner function."""'
+    ]
+    assert [literal.prefix for literal in literals] == ['', 'r', '', '', '', 'u']
+    assert [literal.quote for literal in literals] == ['"""', "'''", '"', '"""', '"""', '"""']
+    assert [literal.indent for literal in literals] == ['', '    ', '        ', '        ',
+                                                       '            ', '        ']
+    assert [literal.lineno for literal in literals] == [1, 6, 11, 15, 19, 27]
+    assert [literal.end_lineno for literal in literals] == [1, 9, 11, 15, 19, 27]
+    assert [literal.is_raw for literal in literals] == [False, True, False, False, False, False]
+
+    # non-ascii characters and newlines
+    source = 'x = "é"; y = 1\r\nclass Bé: "Class é."\r\n'
+    literal, = pydocstring.source.extract_docstrings(source)
+    assert source[literal.start:literal.end] == '"Class é."'
+    assert literal.indent == ''
+
+    assert_raises(SyntaxError, pydocstring.source.extract_docstrings, 'def f(:\n')
+
+
+def test_scan_docstrings():
+    """Test pydocstring.source.scan_docstrings."""
+    def fields(literal, source):
+        return (literal.name, literal.kind, literal.docstring, source[literal.start:literal.end],
+                literal.lineno, literal.end_lineno, literal.prefix, literal.quote, literal.indent)
+
+    # same docstrings as extract_docstrings
+    data = SOURCE.encode('utf-8')
+    assert [fields(literal, data.decode()) for literal in
+            pydocstring.source.scan_docstrings(io.BytesIO(data).readline)] == \
+        [fields(literal, SOURCE) for literal in pydocstring.source.extract_docstrings(SOURCE)]
+
+    # positions in bytes, with a byte order mark, non-ascii characters, and newlines
+    source = ('"""Module é."""\r\nasync def f():\r\n    async with x:\r\n        pass\r\n'
+              '    def g(): "G." ; x = 1\r\n@abc.property\r\ndef é(): """é""" \\\r\n "é"\r\n'
+              'class B:\r\n    b"Bytes."\r\ndef h(): f"F-string."\r\n'
+              'def k(): "Not" + " a docstring."\r\n')
+    data = b'\xef\xbb\xbf' + source.encode('utf-8')
+    literals = list(pydocstring.source.scan_docstrings(io.BytesIO(data).readline))
+    assert [(literal.name, literal.kind, literal.docstring) for literal in literals] == [
+        ('', 'module', 'Module é.'), ('f.<locals>.g', 'function', 'G.'), ('é', 'property', 'éé')
+    ]
+    assert [data[literal.start:literal.end].decode('utf-8') for literal in literals] == [
+        '"""Module é."""', '"G."', '"""é""" \\\r\n "é"'
+    ]
+    assert [(literal.lineno, literal.end_lineno) for literal in literals] == [
+        (1, 1), (5, 5), (7, 8)
+    ]
+
+    # code is released up to the start of the next docstring
+    positions = []
+    literals = []
+    for literal in pydocstring.source.scan_docstrings(io.BytesIO(data).readline,
+                                                      positions.append):
+        assert positions == sorted(positions) and all(i <= literal.start for i in positions)
+        literals.append(literal)
+    assert positions == sorted(positions) and literals[-1].end <= positions[-1]
+    assert positions[0] == data.index(b'async def')
+
+    assert_raises(SyntaxError, list,
+                  pydocstring.source.scan_docstrings(io.BytesIO(b'def f():\n    """').readline))
+
+
+def test_read_docstrings():
+    """Test pydocstring.source.read_docstrings."""
+    with tempfile.TemporaryDirectory() as dirname:
+        filename = os.path.join(dirname, 'test.py')
+        source = '# -*- coding: latin-1 -*-\r\ndef f():\r\n    """Function é."""\r\n'
+        with open(filename, 'wb') as f:
+            f.write(source.encode('latin-1'))
+        literal, = pydocstring.source.read_docstrings(filename)
+    assert literal.docstring == 'Function é.'
+    assert source[literal.start:literal.end] == '"""Function é."""'
+
+
+def test_splice():
+    """Test pydocstring.source.splice."""
+    source = 'abcdefgh'
+    assert pydocstring.source.splice(source, []) == source
+    assert pydocstring.source.splice(source, [(0, 1, 'A'), (3, 3, '-'), (6, 8, 'GH!')]) == \
+        'Abc-defGH!'
+    assert_raises(ValueError, pydocstring.source.splice, source, [(3, 4, ''), (1, 2, '')])
+    assert_raises(ValueError, pydocstring.source.splice, source, [(1, 4, ''), (3, 5, '')])
+    assert_raises(ValueError, pydocstring.source.splice, source, [(2, 1, '')])
+    assert_raises(ValueError, pydocstring.source.splice, source, [(7, 9, '')])
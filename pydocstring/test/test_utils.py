@@ -1,3 +1,9 @@
+import importlib
+import os
+import sys
+import tempfile
+import textwrap
+from nose.tools import assert_raises
 import pydocstring.utils
 
 
@@ -252,3 +258,114 @@ def test_layered_wrap():
            "    [(\n"
            "        'damn'\n"
            "    )]")
+
+
+def test_get_sourcefile():
+    """Test pydocstring.utils.get_sourcefile."""
+    filename = os.path.realpath(__file__)
+    assert pydocstring.utils.get_sourcefile(test_get_sourcefile) == filename
+    assert pydocstring.utils.get_sourcefile(test_get_sourcefile.__code__) == filename
+    assert pydocstring.utils.get_sourcefile(sys.modules[__name__]) == filename
+    assert (pydocstring.utils.get_sourcefile(textwrap.TextWrapper) ==
+            os.path.realpath(textwrap.__file__))
+    assert_raises(TypeError, pydocstring.utils.get_sourcefile, int)
+    assert_raises(TypeError, pydocstring.utils.get_sourcefile, len)
+    assert_raises(TypeError, pydocstring.utils.get_sourcefile, 1)
+    # symbolic link
+    with tempfile.TemporaryDirectory() as dirname:
+        original = os.path.join(dirname, 'original.py')
+        link = os.path.join(dirname, 'link.py')
+        with open(original, 'w') as f:
+            f.write('x = 1\n')
+        os.symlink(original, link)
+        code = compile('x = 1\n', link, 'exec')
+        assert pydocstring.utils.get_sourcefile(code) == os.path.realpath(original)
+
+
+def test_extract_members():
+    """Test pydocstring.utils.extract_members."""
+    class Test(textwrap.TextWrapper):
+        """Test class."""
+        def f(self):
+            """Method f."""
+
+        @property
+        def p(self):
+            """Property p."""
+
+    members = pydocstring.utils.extract_members(Test)
+    assert members == {'f': Test.f, 'p': Test.p}
+
+
+MEMBERS_MODULE = '''
+import sys
+
+
+class A:
+    """Class A."""
+    module = sys.modules[__name__]
+
+    class B:
+        """Class B."""
+        def f(self):
+            """Method f."""
+
+    def g(self):
+        """Method g."""
+
+    h = g
+
+
+def func():
+    """Function."""
+
+
+alias = A
+'''
+
+
+def test_iter_members():
+    """Test pydocstring.utils.iter_members."""
+    with tempfile.TemporaryDirectory() as dirname:
+        with open(os.path.join(dirname, 'test_members_module.py'), 'w') as f:
+            f.write(MEMBERS_MODULE)
+        sys.path.insert(0, dirname)
+        try:
+            module = importlib.import_module('test_members_module')
+            check_members(module)
+        finally:
+            sys.path.remove(dirname)
+            sys.modules.pop('test_members_module', None)
+
+
+def check_members(module):
+    """Check pydocstring.utils.iter_members on the module made from MEMBERS_MODULE."""
+    # each object once (cycle through the module and aliases)
+    members = list(pydocstring.utils.iter_members(module))
+    assert members == [('A', module.A), ('A.B', module.A.B), ('A.B.f', module.A.B.f),
+                       ('A.g', module.A.g), ('func', module.func)]
+    # names are not qualified
+    assert pydocstring.utils.extract_members(module, recursive=True) == {
+        'A': module.A, 'B': module.A.B, 'f': module.A.B.f, 'g': module.A.g, 'func': module.func
+    }
+    assert pydocstring.utils.extract_members(module, recursive=True, max_depth=2) == {
+        'A': module.A, 'B': module.A.B, 'g': module.A.g, 'func': module.func
+    }
+    # limits
+    assert list(pydocstring.utils.iter_members(module, max_depth=1)) == [('A', module.A),
+                                                                         ('func', module.func)]
+    assert list(pydocstring.utils.iter_members(module, max_members=2)) == members[:2]
+    assert list(pydocstring.utils.iter_members(module, max_members=0)) == []
+    # non recursive (aliases are kept)
+    assert pydocstring.utils.extract_members(module) == {'A': module.A, 'alias': module.A,
+                                                         'func': module.func}
+    assert pydocstring.utils.extract_members(module.A, max_members=1) == {'B': module.A.B}
+
+    # nesting deeper than the recursion limit
+    parent = module.A.B
+    for i in range(sys.getrecursionlimit() + 100):
+        child = type('C{0}'.format(i), (), {'__module__': module.__name__})
+        parent.child = child
+        parent = child
+    members = pydocstring.utils.iter_members(module.A.B)
+    assert sum(1 for name, _ in members if name.endswith('child')) == i + 1
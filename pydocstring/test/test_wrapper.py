@@ -1,4 +1,15 @@
 import abc
+import concurrent.futures
+import importlib
+import inspect
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from nose.tools import assert_raises
+import pydocstring.cache
 import pydocstring.docstring
 import pydocstring.wrapper
 
@@ -303,3 +314,618 @@ def test_wrapper_docstring_class():
                             '-------\n'
                             'x()\n'
                             '    Another docstring.\n\n')
+
+
+def test_wrapper_lazy():
+    """Test the lazy mode of the decorators in pydocstring.wrapper."""
+    # class
+    @pydocstring.wrapper.docstring(lazy=True)
+    class Test:
+        """Test docstring.
+
+        Test extended."""
+        pass
+    assert Test in pydocstring.wrapper._pending
+    assert Test.__doc__ == 'Test docstring.\n\nTest extended.\n\n'
+    assert Test not in pydocstring.wrapper._pending
+    assert Test._docstring.info['extended'] == ['Test extended.']
+
+    # class through _docstring and instance
+    @pydocstring.wrapper.docstring_recursive(lazy=True)
+    class Test:
+        """Test docstring.
+
+        Test extended."""
+        def x():
+            """Another docstring."""
+            pass
+    assert Test()._docstring.info['summary'] == 'Test docstring.'
+    assert Test().__doc__ == 'Test docstring.\n\nTest extended.\n\n'
+    assert Test.x._docstring.info['summary'] == 'Another docstring.'
+
+    # function
+    @pydocstring.wrapper.docstring(lazy=True)
+    def test():
+        """Test docstring.
+
+        Test extended."""
+        pass
+    assert not hasattr(test, '_docstring')
+    assert pydocstring.wrapper.get_docstring(test).info['summary'] == 'Test docstring.'
+    assert test.__doc__ == 'Test docstring.\n\nTest extended.\n\n'
+
+    # property is decorated eagerly
+    prop = pydocstring.wrapper.docstring(property(test, doc='Some property.'), lazy=True)
+    assert prop.__doc__ == 'Some property.'
+
+    # inheritance between lazy classes
+    @pydocstring.wrapper.docstring_class(lazy=True)
+    class Parent:
+        """Test docstring.
+
+        Test extended."""
+        def x():
+            """Another docstring."""
+            pass
+
+    @pydocstring.wrapper.docstring_class(lazy=True)
+    class Child(Parent):
+        """Overwritten docstring."""
+        pass
+
+    assert Parent in pydocstring.wrapper._pending
+    assert Child.__doc__ == ('Overwritten docstring.\n\n'
+                             'Test extended.\n\n'
+                             'Methods\n'
+                             '-------\n'
+                             'x()\n'
+                             '    Another docstring.\n\n')
+    assert Parent not in pydocstring.wrapper._pending
+
+    # global configuration
+    pydocstring.wrapper.configure(lazy=True)
+    try:
+        @pydocstring.wrapper.docstring
+        class Test:
+            """Test docstring."""
+        assert Test in pydocstring.wrapper._pending
+    finally:
+        pydocstring.wrapper.configure(lazy=False)
+    assert Test.__doc__ == 'Test docstring.'
+    assert_raises(TypeError, pydocstring.wrapper.configure, something=True)
+
+
+def test_wrapper_verify():
+    """Test the verification of the generated docstrings in pydocstring.wrapper.docstring."""
+    def make_func():
+        def test():
+            """Test docstring.
+
+            Test
+            extended."""
+        return test
+    reports = []
+
+    def reporter(obj, diff):
+        reports.append((obj, diff))
+
+    pydocstring.wrapper.configure(reporter=reporter)
+    try:
+        # diff
+        test = pydocstring.wrapper.docstring(make_func())
+        assert test.__doc__ == 'Test docstring.\n\nTest extended.\n\n'
+        assert len(reports) == 1
+        assert reports[0][0] is test
+        assert '! Test extended.' in reports[0][1]
+        # identical docstrings are not reported
+        pydocstring.wrapper.docstring(test)
+        assert len(reports) == 1
+        # off
+        pydocstring.wrapper.docstring(make_func(), verify='off')
+        assert len(reports) == 1
+        # cheap
+        pydocstring.wrapper.docstring(make_func(), verify='cheap')
+        assert len(reports) == 2
+        assert reports[1][1] is None
+        # strict
+        assert_raises(ValueError, pydocstring.wrapper.docstring, make_func(), verify='strict')
+        assert_raises(ValueError, pydocstring.wrapper.docstring, make_func(), verify='x')
+        assert len(reports) == 2
+        # sampled diff
+        pydocstring.wrapper.configure(diff_sample=0.0)
+        pydocstring.wrapper.docstring(make_func())
+        assert len(reports) == 3
+        assert reports[2][1] is None
+        # global
+        pydocstring.wrapper.configure(verify='off')
+        pydocstring.wrapper.docstring_recursive(make_func())
+        assert len(reports) == 3
+        pydocstring.wrapper.docstring_recursive(make_func(), verify='cheap')
+        assert len(reports) == 4
+        assert_raises(ValueError, pydocstring.wrapper.configure, verify='x')
+    finally:
+        pydocstring.wrapper.configure(verify='diff', diff_sample=1.0,
+                                      reporter=pydocstring.wrapper.print_reporter)
+
+
+def test_wrapper_docstring_recursive_once():
+    """Test that pydocstring.wrapper.docstring_recursive converts each object once."""
+    def test():
+        """Test docstring."""
+        pass
+
+    def test2():
+        """Another docstring."""
+        pass
+
+    # multiple paths to the same object and a cycle
+    test.test2 = test2
+    test.test3 = test2
+    test2.test = test
+
+    pydocstring.wrapper.reset_stats()
+    test = pydocstring.wrapper.docstring_recursive(test)
+    stats = pydocstring.wrapper.get_stats()
+    assert stats['processed'] == 2
+    assert stats['skipped'] == 2
+    assert test.__doc__ == 'Test docstring.'
+    assert test.test2._docstring.info['summary'] == 'Another docstring.'
+
+    # nested classes
+    @pydocstring.wrapper.docstring_recursive
+    class Test:
+        """Test docstring."""
+        class Inner:
+            """Inner docstring.
+
+            Inner extended."""
+            def f():
+                """Some function.
+
+                Function extended."""
+
+    pydocstring.wrapper.reset_stats()
+    pydocstring.wrapper.docstring_recursive(Test)
+    assert pydocstring.wrapper.get_stats()['processed'] == 3
+    assert Test.Inner.__doc__ == 'Inner docstring.\n\n    Inner extended.\n\n'
+    assert Test.Inner.f.__doc__ == 'Some function.\n\n        Function extended.\n\n'
+
+
+def test_wrapper_docstring_class_hierarchy():
+    """Test pydocstring.wrapper.docstring_class on a class hierarchy."""
+    pydocstring.wrapper.configure(verify='off')
+    try:
+        @pydocstring.wrapper.docstring_class
+        class A:
+            """Class A."""
+            def f(self, x):
+                """Method f.
+
+                Parameters
+                ----------
+                x : int
+                    Something.
+                """
+
+            def g(self):
+                """Method g."""
+
+            @property
+            def p(self):
+                """Property p.
+
+                Returns
+                -------
+                int
+                """
+
+        @pydocstring.wrapper.docstring_class
+        class B(A):
+            """Class B."""
+            def f(self, x):
+                """Method f of B."""
+
+            @property
+            def p(self):
+                """Property p of B."""
+
+        pydocstring.wrapper.reset_stats()
+
+        @pydocstring.wrapper.docstring_class
+        class C(B):
+            """Class C."""
+            def g(self):
+                """Method g of C."""
+    finally:
+        pydocstring.wrapper.configure(verify='diff')
+
+    # members inherited from the parents are not converted again
+    assert pydocstring.wrapper.get_stats()['processed'] == 2
+    assert C.__doc__ == ('Class C.\n\n'
+                         'Properties\n'
+                         '----------\n'
+                         'p\n'
+                         '    Property p of B.\n\n'
+                         'Methods\n'
+                         '-------\n'
+                         'f(self, x)\n'
+                         '    Method f of B.\n'
+                         'g(self)\n'
+                         '    Method g of C.\n\n')
+    assert C.f.__doc__ == ('Method f of B.\n\n'
+                           '    Parameters\n'
+                           '    ----------\n'
+                           '    x : int\n'
+                           '        Something.\n\n')
+    assert C.p.__doc__ == ('Property p of B.\n\n'
+                           '    Returns\n'
+                           '    -------\n'
+                           '    int\n\n')
+    records = pydocstring.wrapper._class_records
+    assert records[C][1]['f'] is records[B][1]['f']
+
+
+def test_wrapper_property_side_table():
+    """Test the side table of the Docstring instances of the properties."""
+    parse_numpy = pydocstring.wrapper.parse_numpy
+    parsed = []
+
+    def counted_parse_numpy(doc, **kwargs):
+        parsed.append(doc)
+        return parse_numpy(doc, **kwargs)
+
+    pydocstring.wrapper.parse_numpy = counted_parse_numpy
+    pydocstring.wrapper.configure(verify='off')
+    try:
+        @pydocstring.wrapper.docstring_class
+        class A:
+            """Class A."""
+            @property
+            def p(self):
+                """Property p.
+
+                Returns
+                -------
+                int
+                """
+
+        @pydocstring.wrapper.docstring_class
+        class B(A):
+            """Class B."""
+            @property
+            def p(self):
+                """Property p of B."""
+    finally:
+        pydocstring.wrapper.parse_numpy = parse_numpy
+        pydocstring.wrapper.configure(verify='diff')
+
+    # each property is parsed once
+    assert len(parsed) == 4
+    assert B.p.__doc__ == ('Property p of B.\n\n'
+                           '    Returns\n'
+                           '    -------\n'
+                           '    int\n\n')
+    docstring = pydocstring.wrapper.get_docstring(B.p)
+    assert docstring.info['summary'] == 'Property p of B.'
+    assert 'returns' in docstring.info
+    assert pydocstring.wrapper.get_docstring(A.p).info['summary'] == 'Property p.'
+    # changed docstring
+    A.p.__doc__ = 'Changed.'
+    assert_raises(AttributeError, pydocstring.wrapper.get_docstring, A.p)
+    # property without a getter
+    p = property(doc='Property without a getter.')
+    pydocstring.wrapper.docstring(p)
+    assert pydocstring.wrapper.get_docstring(p).info['summary'] == 'Property without a getter.'
+    assert_raises(AttributeError, pydocstring.wrapper.get_docstring, property(doc='Summary.'))
+
+    # objects that are kept alive by the side table are bounded
+    size = pydocstring.wrapper.SIDE_TABLE_SIZE
+    pydocstring.wrapper.SIDE_TABLE_SIZE = 2
+    try:
+        properties = [property(doc='Property {0}.'.format(i)) for i in range(3)]
+        for i, prop in enumerate(properties):
+            pydocstring.wrapper.docstring(prop)
+            if i == 1:
+                # most recently used entry is kept
+                pydocstring.wrapper.get_docstring(properties[0])
+        assert len(pydocstring.wrapper._side_table) == 2
+        assert pydocstring.wrapper.get_docstring(properties[0]).info['summary'] == 'Property 0.'
+        assert_raises(AttributeError, pydocstring.wrapper.get_docstring, properties[1])
+        assert pydocstring.wrapper.get_docstring(properties[2]).info['summary'] == 'Property 2.'
+    finally:
+        pydocstring.wrapper.SIDE_TABLE_SIZE = size
+
+
+def test_wrapper_member_table():
+    """Test pydocstring.wrapper._member_table."""
+    def member_table(obj, members, records):
+        """Build the tables of the members by inheriting one member at a time (as before)."""
+        member_doc = pydocstring.docstring.Docstring()
+        for name, member in members.items():
+            if name not in records:
+                continue
+            _, doc, signature = records[name]
+            contents = {'name': name, 'signature': '', 'types': '', 'descs': []}
+            if 'returns' in doc.info:
+                contents['types'] = [i for entry in doc.info['returns'] for i in entry.types]
+            if 'summary' in doc.info:
+                contents['descs'] = doc.info['summary']
+            abstract = 'abstract ' if name in getattr(obj, '__abstractmethods__', ()) else ''
+            if inspect.isfunction(member):
+                section = abstract + 'methods'
+                contents['signature'] = signature
+            elif isinstance(member, property):
+                section = abstract + 'properties'
+            else:
+                section = 'attributes'
+            member_doc.inherit(pydocstring.docstring.Docstring(**{section: contents}),
+                               to_end=True)
+        return member_doc
+
+    class A(abc.ABC):
+        def f(self):
+            pass
+
+        @abc.abstractmethod
+        def g(self):
+            pass
+
+        @property
+        @abc.abstractmethod
+        def p(self):
+            pass
+
+        @property
+        def q(self):
+            pass
+
+        @abc.abstractmethod
+        def h(self):
+            pass
+
+        s = staticmethod(len)
+
+    members = {name: A.__dict__[name] for name in ['g', 'f', 'p', 'h', 'q', 's']}
+    records = {}
+    for i, name in enumerate(members):
+        docstring = pydocstring.docstring.Docstring(
+            summary='Summary of {0}.'.format(name),
+            returns=[{'name': 'x', 'types': ['int']}] if i % 2 else []
+        )
+        records[name] = (members[name], docstring, '(self)')
+    del records['q']
+
+    # same tables as inheriting each member
+    expected = member_table(A, members, records)
+    assert pydocstring.wrapper._member_table(A, members, records).to_dict() == expected.to_dict()
+    assert [entry.name for entry in expected.info['methods']] == ['f', 'h']
+    assert [entry.name for entry in expected.info['abstract methods']] == ['g']
+
+    # Docstring is created once, without inheritance, and the number of entries that are built
+    # grows linearly with the number of members (i.e. in one pass over the members)
+    def count(num_members):
+        """Return the numbers of Docstring operations and of entries built for the members."""
+        created, built = [], []
+        inherit = pydocstring.docstring.Docstring.inherit
+        init = pydocstring.docstring.TabbedInfo.__init__
+
+        class Docstring(pydocstring.docstring.Docstring):
+            def __init__(self, **kwargs):
+                created.append('init')
+                super().__init__(**kwargs)
+
+            def inherit(self, *args, **kwargs):
+                created.append('inherit')
+                return inherit(self, *args, **kwargs)
+
+        def tabbed_init(self, *args, **kwargs):
+            built.append(None)
+            init(self, *args, **kwargs)
+
+        many_members = {'f{0}'.format(i): A.f for i in range(num_members)}
+        many_records = {name: (A.f, records['f'][1], '(self)') for name in many_members}
+        pydocstring.wrapper.Docstring = Docstring
+        pydocstring.docstring.TabbedInfo.__init__ = tabbed_init
+        try:
+            member_doc = pydocstring.wrapper._member_table(A, many_members, many_records)
+        finally:
+            pydocstring.wrapper.Docstring = pydocstring.docstring.Docstring
+            pydocstring.docstring.TabbedInfo.__init__ = init
+        assert [entry.name for entry in member_doc.info['methods']] == list(many_members)
+        return len(created), len(built)
+
+    created_small, built_small = count(1000)
+    created_large, built_large = count(4000)
+    assert created_small == created_large == 1
+    assert built_small >= 1000
+    assert built_large <= 4 * built_small
+
+
+STRESS_MODULE = '''
+import pydocstring.wrapper
+from {base} import Base
+
+
+@pydocstring.wrapper.docstring_class
+class Child(Base):
+    """Child class."""
+    def f(self, x):
+        """Method f of Child."""
+
+    @property
+    def p(self):
+        """Property p of Child."""
+
+
+@pydocstring.wrapper.docstring_class(lazy=True)
+class Lazy(Child):
+    """Lazy class."""
+    def g(self):
+        """Method g of Lazy.
+
+        Returns
+        -------
+        int
+        """
+'''
+
+STRESS_BASE = '''
+import pydocstring.wrapper
+
+
+@pydocstring.wrapper.docstring_class
+class Base:
+    """Base class."""
+    def f(self, x):
+        """Method f.
+
+        Parameters
+        ----------
+        x : int
+            Something.
+        """
+
+    def g(self):
+        """Method g."""
+
+    @property
+    def p(self):
+        """Property p.
+
+        Returns
+        -------
+        int
+        """
+'''
+
+
+def test_wrapper_threads():
+    """Test the decorators on modules that are imported from multiple threads."""
+    num_modules = 32
+    switch_interval = sys.getswitchinterval()
+    with tempfile.TemporaryDirectory() as dirname:
+        with open(os.path.join(dirname, 'stress_base.py'), 'w') as f:
+            f.write(STRESS_BASE)
+        for i in range(num_modules + 1):
+            with open(os.path.join(dirname, 'stress_module{0}.py'.format(i)), 'w') as f:
+                f.write(STRESS_MODULE.format(base='stress_base'))
+        sys.path.insert(0, dirname)
+        importlib.invalidate_caches()
+        pydocstring.wrapper.configure(verify='off', cache=True)
+        try:
+            # reference (single thread)
+            reference = importlib.import_module('stress_module{0}'.format(num_modules))
+            pydocstring.wrapper.reset_stats()
+            reference.Lazy.__doc__
+            lazy_stats = pydocstring.wrapper.get_stats()
+            pydocstring.wrapper.reset_stats()
+
+            # import in parallel
+            sys.setswitchinterval(1e-6)
+            with concurrent.futures.ThreadPoolExecutor(8) as executor:
+                modules = list(executor.map(importlib.import_module,
+                                            ['stress_module{0}'.format(i)
+                                             for i in range(num_modules)]))
+            assert pydocstring.wrapper.get_stats()['processed'] == 3 * num_modules
+
+            # access the deferred docstrings in parallel
+            pydocstring.wrapper.reset_stats()
+            barrier = threading.Barrier(8)
+
+            def access(module):
+                barrier.wait()
+                return module.Lazy.__doc__, pydocstring.wrapper.get_docstring(module.Lazy)
+
+            # NOTE: each module is accessed by all eight threads at once
+            with concurrent.futures.ThreadPoolExecutor(8) as executor:
+                results = list(executor.map(access, [module for module in modules
+                                                     for _ in range(8)]))
+        finally:
+            sys.setswitchinterval(switch_interval)
+            pydocstring.wrapper.configure(verify='diff', cache=False)
+            pydocstring.cache.flush()
+            pydocstring.cache._caches.clear()
+            sys.path.remove(dirname)
+            for i in range(num_modules + 1):
+                sys.modules.pop('stress_module{0}'.format(i), None)
+            sys.modules.pop('stress_base', None)
+
+    # each deferred decoration is applied once
+    assert (pydocstring.wrapper.get_stats()['processed'] ==
+            lazy_stats['processed'] * num_modules)
+    for module in modules:
+        assert module.Child.__doc__ == reference.Child.__doc__
+        assert module.Child.p.__doc__ == reference.Child.p.__doc__
+    for doc, docstring in results:
+        assert doc == reference.Lazy.__doc__
+        assert docstring.make_numpy(include_quotes=False) == reference.Lazy.__doc__
+
+
+def test_wrapper_profile():
+    """Test the profile of the decorators."""
+    pydocstring.wrapper.reset_profile()
+
+    @pydocstring.wrapper.docstring_class
+    class A:
+        """Class A."""
+        def f(self):
+            """Method f."""
+
+    assert pydocstring.wrapper.get_profile() == {}
+
+    pydocstring.wrapper.configure(profile=True, verify='off')
+    try:
+        @pydocstring.wrapper.docstring_class
+        class B(A):
+            """Class B."""
+            def f(self):
+                """Method f of B."""
+
+            @property
+            def p(self):
+                """Property p."""
+    finally:
+        pydocstring.wrapper.configure(profile=False, verify='diff')
+    profile = pydocstring.wrapper.get_profile()
+    name = B.__module__ + '.test_wrapper_profile.<locals>.B'
+    assert set(profile) == {name, name + '.f', name + '.p'}
+    assert profile[name]['parse calls'] == 1
+    assert profile[name]['extract calls'] == 2
+    assert profile[name]['inherit calls'] == 1
+    assert profile[name]['render calls'] == 2
+    assert profile[name + '.f']['parse calls'] == 1
+    assert profile[name + '.f']['inherit calls'] == 1
+    assert all(time >= 0 for record in profile.values() for time in record.values())
+
+    report = pydocstring.wrapper.profile_report().split('\n')
+    assert report[0].split() == ['object', 'total', '(ms)', 'parse', '(ms)', 'render', '(ms)',
+                                 'diff', '(ms)', 'extract', '(ms)', 'inherit', '(ms)']
+    assert len(report) == 4
+    assert report[1].split()[0] == name
+    assert len(pydocstring.wrapper.profile_report(limit=1).split('\n')) == 2
+    records = json.loads(pydocstring.wrapper.profile_report(fmt='json'))
+    assert records[0]['object'] == name
+    totals = [record['total'] for record in records]
+    assert totals == sorted(totals, reverse=True)
+    assert records[0]['extract calls'] == 2
+    assert_raises(ValueError, pydocstring.wrapper.profile_report, fmt='html')
+
+    pydocstring.wrapper.reset_profile()
+    assert pydocstring.wrapper.get_profile() == {}
+
+
+def test_wrapper_profile_environ():
+    """Test the profile of the decorators enabled with the environment variable."""
+    script = ('import pydocstring.wrapper\n'
+              '@pydocstring.wrapper.docstring\n'
+              'def f():\n'
+              '    """Function f."""\n')
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    with tempfile.TemporaryDirectory() as dirname:
+        filename = os.path.join(dirname, 'profile.json')
+        env = dict(os.environ, PYTHONPATH=root, PYDOCSTRING_PROFILE=filename)
+        subprocess.check_call([sys.executable, '-c', script], env=env)
+        with open(filename) as f:
+            records = json.load(f)
+    assert [record['object'] for record in records] == ['__main__.f']
+    assert records[0]['parse calls'] == 1
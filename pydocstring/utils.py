@@ -5,6 +5,10 @@ import re
 import textwrap
 
 
+# normalized source files of the file names of the objects (see `get_sourcefile`)
+_sourcefiles = {}
+
+
 def remove_indent(text, include_firstline=False):
     """Removes leading whitespace from the provided text.
 
@@ -331,25 +335,69 @@ def layered_wrap(dict_edges_contents, width=100, indent_level=0, tabsize=4, edge
     return output
 
 
-# NOTE: use tokenize instead?
-def extract_members(module, recursive=False):
-    """Extracts all members of a module that are defined in the same file.
+def get_sourcefile(obj):
+    """Return the normalized path of the Python source file in which the object is defined.
+
+    Same as `inspect.getsourcefile`, except that the path is normalized (absolute, case-normalized
+    on case-insensitive file systems, and without symbolic links) and that it is cached by the file
+    name of the object (from `inspect.getfile`, which does not access the file system). Objects are
+    defined in the same file if their source files are equal (except for hard links), and the file
+    system is accessed once per file.
 
     Parameters
     ----------
-    module : instance
-        Any python module.
+    obj : module, class, method, function, traceback, frame, code
+        Object whose source file is returned.
 
     Returns
     -------
+    sourcefile : {str, None}
+        Normalized path of the source file.
+        None if the source file cannot be found (e.g. extension modules).
+
+    Raises
+    ------
+    TypeError
+        If the object is built-in or is not one of the supported types.
+    """
+    filename = inspect.getfile(obj)
+    try:
+        return _sourcefiles[filename]
+    except KeyError:
+        pass
+    sourcefile = inspect.getsourcefile(obj)
+    if sourcefile is not None:
+        sourcefile = os.path.normcase(os.path.realpath(sourcefile))
+    _sourcefiles[filename] = sourcefile
+    return sourcefile
+
+
+def _defined_members(obj):
+    """Return the members of an object that are defined in the same file.
+
+    Parameters
+    ----------
+    obj : module, class, function
+        Object whose members are returned.
+
+    Returns
+    -------
+    members : list of 2-tuple
+        Names and members that are defined in the same file as the object, in the order of
+        `inspect.getmembers`.
+
+    Raises
+    ------
+    TypeError
+        If the source file of the object cannot be found (see `get_sourcefile`).
     """
     # get file location
-    filename = inspect.getsourcefile(module)
+    # NOTE: source files are cached and normalized so that they can be compared without accessing
+    #       the file system
+    filename = get_sourcefile(obj)
     # find objects that are defined in the provided module
-    all_members = inspect.getmembers(module)
-    defined_names = []
     defined_members = []
-    for name, member in all_members:
+    for name, member in inspect.getmembers(obj):
         # skip code objects
         if name == '__code__':
             continue
@@ -359,24 +407,106 @@ def extract_members(module, recursive=False):
             # cannot getsourcefile of property objects
             # NOTE: all property objects that belong to an instance is assumed to be defined within
             #       that instance (i.e. not inherited)
-            defined_names.append(name)
-            defined_members.append(member)
+            defined_members.append((name, member))
 
         # other objects
         try:
-            sourcefile = inspect.getsourcefile(member)
+            sourcefile = get_sourcefile(member)
         except TypeError:
             continue
         else:
-            if os.path.samefile(sourcefile, filename):
-                defined_names.append(name)
-                defined_members.append(member)
-
-    # extract objects
-    output = {}
-    for name, member in zip(defined_names, defined_members):
-        output[name] = member
-        # recurse
-        if not isinstance(member, property) and recursive:
-            output.update(extract_members(member))
-    return output
+            if sourcefile is not None and sourcefile == filename:
+                defined_members.append((name, member))
+    return defined_members
+
+
+def iter_members(obj, max_depth=None, max_members=None):
+    """Yield the members of an object (and their members) that are defined in the same file.
+
+    Members are traversed depth first with an explicit stack, i.e. without recursion, and the
+    members of each object are only extracted when the traversal reaches it. Each object is yielded
+    (and its members are traversed) once, with the name through which it is first reached, even if
+    it can be reached through multiple names (e.g. aliases or references to the module).
+
+    Parameters
+    ----------
+    obj : module, class, function
+        Object whose members are yielded.
+    max_depth : {int, None}
+        Maximum depth of the members, where the members of the object have depth 1.
+        Default is no limit.
+    max_members : {int, None}
+        Maximum number of members that are yielded.
+        Default is no limit.
+
+    Yields
+    ------
+    qualified_name : str
+        Name of the member relative to the object, e.g. 'Class.method'.
+    member
+        Member of the object.
+
+    Raises
+    ------
+    TypeError
+        If the source file of the object cannot be found (see `get_sourcefile`).
+    """
+    if max_members is not None and max_members <= 0:
+        return
+    # NOTE: objects are stored (not just their ids) so that the ids are not reused during the
+    #       traversal
+    visited = {id(obj): obj}
+    num_members = 0
+    stack = [(iter(_defined_members(obj)), '', 1)]
+    while stack:
+        members, prefix, depth = stack[-1]
+        try:
+            name, member = next(members)
+        except StopIteration:
+            stack.pop()
+            continue
+        if id(member) in visited:
+            continue
+        visited[id(member)] = member
+
+        qualified_name = prefix + name
+        yield qualified_name, member
+        num_members += 1
+        if max_members is not None and num_members >= max_members:
+            return
+        if isinstance(member, property) or (max_depth is not None and depth >= max_depth):
+            continue
+        stack.append((iter(_defined_members(member)), qualified_name + '.', depth + 1))
+
+
+# NOTE: use tokenize instead?
+def extract_members(module, recursive=False, max_depth=None, max_members=None):
+    """Extracts all members of a module that are defined in the same file.
+
+    Parameters
+    ----------
+    module : instance
+        Any python module.
+    recursive : bool
+        True if the members of the members (and so on) are also extracted (see `iter_members`).
+        Default is False.
+    max_depth : {int, None}
+        Maximum depth of the members that are extracted recursively, where the members of the
+        module have depth 1.
+        Default is no limit.
+    max_members : {int, None}
+        Maximum number of members that are extracted.
+        Default is no limit.
+
+    Returns
+    -------
+    members : dict
+        Dictionary of the names of the members to the members.
+        If `recursive`, then each member is extracted once, and a member overwrites the previous
+        members with the same name (e.g. methods of different classes). Use `iter_members` for the
+        qualified names of the members, e.g. 'Class.method'.
+    """
+    if recursive:
+        return {qualified_name.rsplit('.', 1)[-1]: member for qualified_name, member in
+                iter_members(module, max_depth=max_depth, max_members=max_members)}
+    return dict(_defined_members(module)[:max_members])
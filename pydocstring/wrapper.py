@@ -1,6 +1,17 @@
+import atexit
+import collections
+import contextlib
 import difflib
 import inspect
+import json
+import os
+import random
+import sys
+import threading
+import time
+import weakref
 from functools import wraps
+from pydocstring.cache import get_cache
 from pydocstring.docstring import Docstring
 from pydocstring.numpy_docstring import parse_numpy
 from pydocstring.utils import extract_members, remove_indent
@@ -39,9 +50,710 @@ def kwarg_wrapper(wrapper):
     return new_wrapper
 
 
+def print_reporter(obj, diff):
+    """Print the difference between the original and the generated docstrings of an object.
+
+    This is the default reporter of the verification of the generated docstrings.
+
+    Parameters
+    ----------
+    obj
+        Object whose generated docstring is different from the original.
+    diff : {list of str, None}
+        Lines of the context diff between the original and the generated docstrings.
+        None if the diff was not computed.
+    """
+    print('WARNING: generated numpy docstring is different from the original')
+    if diff is None:
+        print('original and generated docstrings of {0} are different'.format(obj))
+    else:
+        print('\n'.join(diff))
+
+
+# default options of the decorators that can be changed with `configure`
+_config = {'lazy': False, 'verify': 'diff', 'diff_sample': 1.0, 'reporter': print_reporter,
+           'cache': False, 'cache_dir': None, 'profile': False}
+
+VERIFY_MODES = ('off', 'cheap', 'diff', 'strict')
+
+PROFILE_PHASES = ('parse', 'render', 'diff', 'extract', 'inherit')
+
+# NOTE: decorators can be applied from multiple threads (e.g. modules imported in parallel). Each
+#       operation on the tables below is atomic, unless noted otherwise, and each deferred
+#       decoration is applied under the lock of its object (see `_resolve`).
+
+# number of objects processed by the decorators (see `get_stats`)
+# NOTE: incrementing a counter is not atomic
+_stats = collections.Counter()
+_stats_lock = threading.Lock()
+
+# objects whose decoration is deferred (lazy mode) to the decorator and its keyword arguments
+_pending = weakref.WeakKeyDictionary()
+# locks of the objects whose decoration is deferred, until their decoration is applied
+_resolve_locks = weakref.WeakKeyDictionary()
+
+# Docstring instances of the objects that cannot store them in `_docstring` (e.g. property)
+# NOTE: property cannot be weakly referenced, so its entries are weakly keyed by its getter, i.e.
+#       {fget: {id of property: (__doc__, Docstring instance)}}, and live as long as the getter.
+#       Other objects (that can neither store an attribute nor be weakly referenced) are stored
+#       with their ids, i.e. {id: (object, __doc__, Docstring instance)}, so that the ids are not
+#       reused. These objects are kept alive by the table, so only the `SIDE_TABLE_SIZE` most
+#       recently stored or loaded entries are kept (and the others are parsed again if needed).
+#       __doc__ is stored to detect the entries that are no longer up to date.
+_weak_side_table = weakref.WeakKeyDictionary()
+_side_table = collections.OrderedDict()
+_side_table_lock = threading.Lock()
+
+SIDE_TABLE_SIZE = 1024
+
+# time spent (in seconds) in each phase and the number of times each phase is run, by the name of
+# the object (see `get_profile`)
+# NOTE: {name of object: Counter({phase: time, phase + ' calls': count})}
+_profile = collections.defaultdict(collections.Counter)
+_profile_lock = threading.Lock()
+_no_profile = contextlib.nullcontext()
+
+
+def configure(**options):
+    """Change the default options of the decorators.
+
+    Parameters
+    ----------
+    lazy : bool
+        True if the decorators only record the docstring and the options, and the docstring is
+        converted when it is first accessed.
+        Default is False.
+    verify : {'off', 'cheap', 'diff', 'strict'}
+        Verification of the generated docstring against the original (numpy style only).
+        If 'off', the generated docstring is not verified.
+        If 'cheap', the difference is reported without computing the diff.
+        If 'diff', the diff of the docstrings is computed and reported.
+        If 'strict', ValueError is raised if the docstrings are different.
+        In all cases, the diff is computed only if the docstrings are different.
+        Default is 'diff'.
+    diff_sample : float
+        Fraction of the different docstrings for which the diff is computed in the 'diff' mode. The
+        remaining differences are reported without the diff.
+        Default is 1.0.
+    reporter : function
+        Function that reports the difference between the docstrings. It is called with the object
+        and the lines of the diff (None if the diff is not computed).
+        Default is `print_reporter`.
+    cache : bool
+        True if the generated docstrings are stored on disk and loaded from there, rather than
+        generated, in the subsequent runs (see `pydocstring.cache`).
+        Default is False.
+    cache_dir : {str, None}
+        Directory in which the cache files are stored.
+        Default is the `__pycache__` directory next to the source file of each module.
+    profile : bool
+        True if the time spent in each phase of the decorators is recorded for each object (see
+        `get_profile`).
+        Default is False, unless the environment variable PYDOCSTRING_PROFILE is set.
+
+    Raises
+    ------
+    TypeError
+        If an unknown option is given.
+    ValueError
+        If `verify` is not one of 'off', 'cheap', 'diff', and 'strict'.
+    """
+    for option, value in options.items():
+        if option not in _config:
+            raise TypeError('Unknown option, {0}.'.format(option))
+        if option == 'verify' and value not in VERIFY_MODES:
+            raise ValueError('`verify` must be one of {0}.'.format(', '.join(VERIFY_MODES)))
+        _config[option] = value
+
+
+def _verify(obj, original, generated, mode):
+    """Verify that the generated docstring is the same as the original docstring.
+
+    Parameters
+    ----------
+    obj
+        Object whose docstring is verified.
+    original : str
+        Original docstring.
+    generated : str
+        Generated docstring.
+    mode : {'off', 'cheap', 'diff', 'strict'}
+        Verification mode (see `configure`).
+
+    Raises
+    ------
+    ValueError
+        If `mode` is 'strict' and the docstrings are different.
+        If `mode` is not one of 'off', 'cheap', 'diff', and 'strict'.
+    """
+    if mode not in VERIFY_MODES:
+        raise ValueError('`verify` must be one of {0}.'.format(', '.join(VERIFY_MODES)))
+    # NOTE: this is equivalent to checking that the diff is empty
+    original = original.strip()
+    generated = generated.strip()
+    if mode == 'off' or original == generated:
+        return
+
+    diff = None
+    if mode == 'strict' or (mode == 'diff' and random.random() < _config['diff_sample']):
+        diff = list(difflib.context_diff(original.split('\n'), generated.split('\n'),
+                                         fromfile='original-{0}'.format(obj),
+                                         tofile='generated-{0}'.format(obj)))
+    if mode == 'strict':
+        raise ValueError('Generated numpy docstring is different from the original:\n{0}'
+                         ''.format('\n'.join(diff)))
+    _config['reporter'](obj, diff)
+
+
+def get_stats():
+    """Return the number of objects that have been processed by the decorators.
+
+    Returns
+    -------
+    stats : dict
+        Dictionary of the following counters to their values:
+        'processed' - number of docstrings converted by `docstring`
+        'cache hits' - number of docstrings loaded from the on-disk cache
+        'skipped' - number of members skipped by `docstring_recursive` because they were
+        already converted
+    """
+    with _stats_lock:
+        return {key: _stats[key] for key in ['processed', 'cache hits', 'skipped']}
+
+
+def reset_stats():
+    """Reset the counters of the processed objects (see `get_stats`)."""
+    with _stats_lock:
+        _stats.clear()
+
+
+def _count(key):
+    """Increment the counter of the processed objects (see `get_stats`).
+
+    Parameters
+    ----------
+    key : {'processed', 'cache hits', 'skipped'}
+        Name of the counter.
+    """
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def _object_name(obj):
+    """Return the name of the object in the profile.
+
+    Parameters
+    ----------
+    obj : function, module, class, property
+        Object whose docstring is processed.
+
+    Returns
+    -------
+    name : str
+        Module and qualified name of the object.
+    """
+    if isinstance(obj, property) and obj.fget is not None:
+        obj = obj.fget
+    name = getattr(obj, '__qualname__', getattr(obj, '__name__', repr(obj)))
+    module = getattr(obj, '__module__', None)
+    if module is None or inspect.ismodule(obj):
+        return name
+    return '{0}.{1}'.format(module, name)
+
+
+@contextlib.contextmanager
+def _profiled(phase, obj):
+    """Record the time spent in the phase for the object.
+
+    Parameters
+    ----------
+    phase : {'parse', 'render', 'diff', 'extract', 'inherit'}
+        Phase of the decorator.
+    obj
+        Object whose docstring is processed.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        name = _object_name(obj)
+        with _profile_lock:
+            record = _profile[name]
+            record[phase] += elapsed
+            record[phase + ' calls'] += 1
+
+
+def _timed(phase, obj):
+    """Return the context manager that records the time spent in the phase, if profiling.
+
+    Parameters
+    ----------
+    phase : {'parse', 'render', 'diff', 'extract', 'inherit'}
+        Phase of the decorator.
+    obj
+        Object whose docstring is processed.
+
+    Returns
+    -------
+    context : context manager
+        Context manager that records the time spent inside it (see `_profiled`).
+        Context manager that does nothing if profiling is disabled.
+    """
+    if not _config['profile']:
+        return _no_profile
+    return _profiled(phase, obj)
+
+
+def get_profile():
+    """Return the time spent by the decorators in each phase for each object.
+
+    Profiling must be enabled with `configure(profile=True)` or with the environment variable
+    PYDOCSTRING_PROFILE.
+
+    Returns
+    -------
+    profile : dict
+        Dictionary of the names of the objects to the dictionary of their times (in seconds) and
+        the number of calls in each phase, i.e. {phase: time, phase + ' calls': count}, where the
+        phases are 'parse', 'render', 'diff', 'extract', and 'inherit'.
+    """
+    with _profile_lock:
+        return {name: dict(record) for name, record in _profile.items()}
+
+
+def reset_profile():
+    """Remove the recorded times of the objects (see `get_profile`)."""
+    with _profile_lock:
+        _profile.clear()
+
+
+def profile_report(fmt='text', limit=None):
+    """Return the report of the recorded times of the objects, sorted by their total time.
+
+    Parameters
+    ----------
+    fmt : {'text', 'json'}
+        Format of the report.
+        Default is 'text'.
+    limit : {int, None}
+        Maximum number of objects in the report.
+        Default is all objects.
+
+    Returns
+    -------
+    report : str
+        Report of the objects and their times (in seconds) in each phase.
+
+    Raises
+    ------
+    ValueError
+        If `fmt` is not 'text' or 'json'.
+    """
+    if fmt not in ['text', 'json']:
+        raise ValueError('`fmt` must be one of text and json.')
+    records = []
+    for name, record in get_profile().items():
+        entry = {'object': name, 'total': sum(record.get(phase, 0.0) for phase in PROFILE_PHASES)}
+        for phase in PROFILE_PHASES:
+            entry[phase] = record.get(phase, 0.0)
+            entry[phase + ' calls'] = record.get(phase + ' calls', 0)
+        records.append(entry)
+    records.sort(key=lambda entry: (-entry['total'], entry['object']))
+    records = records[:limit]
+
+    if fmt == 'json':
+        return json.dumps(records, indent=2)
+    width = max([len('object')] + [len(entry['object']) for entry in records])
+    columns = ('total',) + PROFILE_PHASES
+    lines = ['{0:<{1}}'.format('object', width) +
+             ''.join(' {0:>12}'.format(column + ' (ms)') for column in columns)]
+    for entry in records:
+        lines.append('{0:<{1}}'.format(entry['object'], width) +
+                     ''.join(' {0:>12.3f}'.format(1000 * entry[column]) for column in columns))
+    return '\n'.join(lines)
+
+
+def _dump_profile(destination):
+    """Write the report of the recorded times (see `profile_report`).
+
+    Parameters
+    ----------
+    destination : str
+        Name of the file to which the report is written. The report is in JSON if the file ends
+        with '.json'. Otherwise, the report is in text.
+        If '1', the text report is written to the standard error.
+    """
+    if destination == '1':
+        print(profile_report(), file=sys.stderr)
+        return
+    fmt = 'json' if destination.endswith('.json') else 'text'
+    with open(destination, 'w') as f:
+        f.write(profile_report(fmt=fmt))
+        f.write('\n')
+
+
+# NOTE: PYDOCSTRING_PROFILE=1 writes the report to the standard error at exit, and
+#       PYDOCSTRING_PROFILE=filename writes it to the file
+if os.environ.get('PYDOCSTRING_PROFILE', '') not in ['', '0']:
+    _config['profile'] = True
+    atexit.register(_dump_profile, os.environ['PYDOCSTRING_PROFILE'])
+
+
+class _LazyAttribute:
+    """Descriptor of a class attribute that triggers the deferred decoration of its class.
+
+    Attributes
+    ----------
+    owner : class
+        Class whose decoration is deferred.
+    name : str
+        Name of the attribute, i.e. '__doc__' or '_docstring'.
+    value
+        Value of the attribute before the decoration.
+    """
+    def __init__(self, owner, name, value=None):
+        """Initialize.
+
+        Parameters
+        ----------
+        owner : class
+            Class whose decoration is deferred.
+        name : str
+            Name of the attribute.
+        value
+            Value of the attribute before the decoration.
+        """
+        # NOTE: weak reference is used to avoid a cycle between the class and the descriptor
+        self.owner = weakref.ref(owner)
+        self.name = name
+        self.value = value
+
+    def __get__(self, instance, owner):
+        """Decorate the class and return the attribute."""
+        owner = self.owner()
+        _resolve(owner)
+        # NOTE: descriptor is replaced once the decoration is applied. Until then, i.e. within the
+        #       decoration by the current thread, the attribute has its original value.
+        if owner.__dict__.get(self.name) is self:
+            return self.value
+        return getattr(owner if instance is None else instance, self.name)
+
+
+def _defer(obj, decorator, **kwargs):
+    """Defer the decoration of the object until its docstring is accessed.
+
+    The decoration of a class is triggered by accessing its `__doc__` or `_docstring`. Since the
+    `__doc__` of other objects (e.g. functions) cannot be intercepted, their decoration is triggered
+    by `get_docstring` or when it is needed by another decorator.
+
+    Parameters
+    ----------
+    obj : function, class
+        Object that will be decorated.
+    decorator : function
+        Decorator that is applied to the object.
+    kwargs : dict
+        Keyword arguments of the decorator.
+
+    Returns
+    -------
+    is_deferred : bool
+        True if the decoration is deferred.
+        False if the object does not support the deferral (e.g. property).
+    """
+    if not (inspect.isclass(obj) or inspect.isfunction(obj)):
+        return False
+    # apply the previous decoration (in the order of decorators)
+    _resolve(obj)
+
+    kwargs['lazy'] = False
+    _resolve_locks[obj] = threading.RLock()
+    _pending[obj] = (decorator, kwargs)
+    if inspect.isclass(obj):
+        obj.__doc__ = _LazyAttribute(obj, '__doc__', obj.__dict__.get('__doc__'))
+        obj._docstring = _LazyAttribute(obj, '_docstring')
+    return True
+
+
+def _resolve(obj):
+    """Apply the deferred decoration of the object, if there is one.
+
+    The decoration is applied exactly once. If it is being applied by another thread, this function
+    waits until it is finished.
+
+    Parameters
+    ----------
+    obj
+        Object that may have a deferred decoration.
+    """
+    try:
+        lock = _resolve_locks[obj]
+    except (KeyError, TypeError):
+        # TypeError is raised if the object cannot be weakly referenced
+        return
+    with lock:
+        try:
+            decorator, kwargs = _pending.pop(obj)
+        except KeyError:
+            # applied by another thread or being applied by the current thread
+            return
+        try:
+            if inspect.isclass(obj):
+                # NOTE: __doc__ is replaced by the decorator (see `_LazyAttribute.__get__`)
+                del obj._docstring
+            decorator(obj, **kwargs)
+        finally:
+            _resolve_locks.pop(obj, None)
+
+
+def _store_docstring(obj, docstring_instance):
+    """Store the Docstring instance of the object.
+
+    Docstring instance is stored in the attribute `_docstring` of the object. If the attribute
+    cannot be set (e.g. property, slotted descriptors, and builtins), then it is stored in the side
+    table along with the current docstring of the object. Entry of a property is kept as long as
+    its getter exists. Entries of the other objects are kept until `SIDE_TABLE_SIZE` more recently
+    used objects are stored in the side table.
+
+    Parameters
+    ----------
+    obj
+        Object whose docstring has been parsed.
+    docstring_instance : Docstring
+        Docstring instance of the object.
+    """
+    if not isinstance(obj, property):
+        try:
+            obj._docstring = docstring_instance
+            return
+        except (AttributeError, TypeError):
+            pass
+    if isinstance(obj, property) and obj.fget is not None:
+        try:
+            _weak_side_table.setdefault(obj.fget, {})[id(obj)] = (obj.__doc__, docstring_instance)
+            return
+        except TypeError:
+            # getter cannot be weakly referenced
+            pass
+    with _side_table_lock:
+        _side_table[id(obj)] = (obj, obj.__doc__, docstring_instance)
+        _side_table.move_to_end(id(obj))
+        while len(_side_table) > SIDE_TABLE_SIZE:
+            _side_table.popitem(last=False)
+
+
+def _load_docstring(obj):
+    """Return the stored Docstring instance of the object (see `_store_docstring`).
+
+    Parameters
+    ----------
+    obj
+        Object whose docstring may have been parsed.
+
+    Returns
+    -------
+    docstring : {Docstring, None}
+        Docstring instance of the object.
+        None if the object does not have a Docstring instance, if its docstring has changed since
+        the instance was stored, or if the instance is no longer in the side table.
+    """
+    if not isinstance(obj, property):
+        try:
+            return obj._docstring
+        except AttributeError:
+            pass
+    entry = None
+    if isinstance(obj, property) and obj.fget is not None:
+        try:
+            entry = _weak_side_table.get(obj.fget, {}).get(id(obj))
+        except TypeError:
+            pass
+    if entry is None:
+        with _side_table_lock:
+            entry = _side_table.get(id(obj))
+            if entry is None or entry[0] is not obj:
+                return None
+            _side_table.move_to_end(id(obj))
+        entry = entry[1:]
+    doc, docstring_instance = entry
+    if doc != obj.__doc__:
+        return None
+    return docstring_instance
+
+
+def get_docstring(obj):
+    """Return the Docstring instance of the decorated object.
+
+    Deferred (lazy) decoration of the object is applied if it has not been applied yet.
+
+    Parameters
+    ----------
+    obj : function, module, class, property
+        Object that has been decorated.
+
+    Returns
+    -------
+    docstring : Docstring
+        Docstring instance of the object.
+
+    Raises
+    ------
+    AttributeError
+        If the object has not been decorated.
+    """
+    _resolve(obj)
+    docstring_instance = _load_docstring(obj)
+    if docstring_instance is None:
+        raise AttributeError('{0} has not been decorated.'.format(obj))
+    return docstring_instance
+
+
+def _get_cache(obj, style='numpy'):
+    """Return the on-disk cache of the generated docstrings of the object, if it is enabled.
+
+    Parameters
+    ----------
+    obj
+        Object whose docstring is generated.
+    style : str
+        Style of the original docstring.
+
+    Returns
+    -------
+    cache : {pydocstring.cache.ModuleCache, None}
+        Cache of the module of the object.
+        None if the cache is disabled or the module does not have a source file.
+    """
+    if style != 'numpy' or not _config['cache']:
+        return None
+    return get_cache(obj, cache_dir=_config['cache_dir'])
+
+
+def _render(docstring_instance, cache, width=100, indent_level=0, tabsize=4, is_raw=False):
+    """Return the numpy docstring of the Docstring instance, using the cache if given.
+
+    Parameters
+    ----------
+    docstring_instance : Docstring
+        Docstring instance that will be rendered.
+    cache : {pydocstring.cache.ModuleCache, None}
+        Cache of the rendered docstrings.
+        If None, the docstring is rendered without the cache.
+    width : int
+        Maximum number of characters allowed in each width.
+    indent_level : int
+        Number of indents (tabs) that are needed for the docstring.
+    tabsize : int
+        Number of spaces that corresponds to a tab.
+    is_raw : bool
+        True if the generated numpy documentation string is a raw string.
+
+    Returns
+    -------
+    new_doc : str
+        Numpy docstring (without the quotes).
+    """
+    if cache is None:
+        return docstring_instance.make_numpy(width=width, indent_level=indent_level,
+                                             tabsize=tabsize, is_raw=is_raw, include_quotes=False)
+    key = ('render', docstring_instance.to_bytes(), width, indent_level, tabsize, is_raw)
+    new_doc = cache.get(key)
+    if new_doc is None:
+        new_doc = docstring_instance.make_numpy(width=width, indent_level=indent_level,
+                                                tabsize=tabsize, is_raw=is_raw,
+                                                include_quotes=False)
+        cache.set(key, new_doc)
+    return new_doc
+
+
+def _convert(obj, style='numpy', width=100, indent_level=0, tabsize=4, is_raw=False,
+             verify=None):
+    """Return the converted docstring of the object and its Docstring instance.
+
+    The object is not modified.
+
+    Parameters
+    ----------
+    obj : function, module, class, property
+        Object that contains a docstring.
+    style : {'numpy', 'google', str}
+        Style of the docstring.
+    width : int
+        Maximum number of characters allowed in each width.
+    indent_level : int
+        Number of indents (tabs) that are needed for the docstring.
+    tabsize : int
+        Number of spaces that corresponds to a tab.
+    is_raw : bool
+        True if the generated numpy documentation string is a raw string.
+    verify : {'off', 'cheap', 'diff', 'strict', None}
+        Verification of the generated docstring against the original (see `configure`).
+
+    Returns
+    -------
+    new_doc : str
+        Converted docstring.
+    docstring_instance : Docstring
+        Docstring instance of the object.
+
+    Raises
+    ------
+    ValueError
+        If `verify` is 'strict' and the generated docstring is different from the original.
+    NotImplementedError
+        If `style` is not 'numpy'
+    """
+    original = obj.__doc__
+    if original is None:
+        original = ''
+    if verify is None:
+        verify = _config['verify']
+
+    # load from cache
+    cache = _get_cache(obj, style=style)
+    key = ('parse', original, width, indent_level, tabsize, is_raw)
+    cached = None if cache is None else cache.get(key)
+    _count('processed')
+    if cached is not None:
+        _count('cache hits')
+        new_doc, data, is_same = cached
+        with _timed('parse', obj):
+            docstring_instance = Docstring.from_bytes(data)
+        if not is_same:
+            with _timed('diff', obj):
+                _verify(obj, original, new_doc, verify)
+    else:
+        doc = remove_indent(original, include_firstline=False)
+
+        if style == 'numpy':
+            with _timed('parse', obj):
+                docstring_instance = Docstring(**parse_numpy(doc, contains_quotes=False))
+        elif style == 'code':
+            docstring_instance = doc
+        else:
+            raise NotImplementedError('Only numpy and code (Docstring instance) style are '
+                                      'supported at the moment.')
+        # generate new docstring
+        with _timed('render', obj):
+            new_doc = docstring_instance.make_numpy(width=width, indent_level=indent_level,
+                                                    tabsize=tabsize, is_raw=is_raw,
+                                                    include_quotes=False)
+        # compare to original
+        if style == 'numpy':
+            with _timed('diff', obj):
+                _verify(obj, original, new_doc, verify)
+        # store in cache
+        if cache is not None:
+            cache.set(key, (new_doc, docstring_instance.to_bytes(),
+                            original.strip() == new_doc.strip()))
+    return new_doc, docstring_instance
+
+
 # TODO: check that docstring is parsed properly
 @kwarg_wrapper
-def docstring(obj, style='numpy', width=100, indent_level=0, tabsize=4, is_raw=False):
+def docstring(obj, style='numpy', width=100, indent_level=0, tabsize=4, is_raw=False, lazy=None,
+              verify=None):
     """Wrapper for converting docstring of an object from one format to another.
 
     Parameters
@@ -60,56 +772,100 @@ def docstring(obj, style='numpy', width=100, indent_level=0, tabsize=4, is_raw=F
         True if the generated numpy documentation string is a raw string. Docstring should be
         raw when backslash is used (e.g. math equations).
         Default is False.
+    lazy : {bool, None}
+        True if the conversion is deferred until the docstring is accessed (see `_defer`).
+        Default is the value set by `configure` (False, unless changed).
+    verify : {'off', 'cheap', 'diff', 'strict', None}
+        Verification of the generated docstring against the original (see `configure`).
+        Default is the value set by `configure` ('diff', unless changed).
 
     Raises
     ------
     TypeError
         If the obj's __doc__ is neither str nor Docstring instance.
+    ValueError
+        If `verify` is 'strict' and the generated docstring is different from the original.
     NotImplementedError
         If `style` is not 'numpy'
     """
-    if obj.__doc__ is None:
-        obj.__doc__ = ''
-    doc = obj.__doc__
-    doc = remove_indent(doc, include_firstline=False)
-
-    if style == 'numpy':
-        docstring = Docstring(**parse_numpy(doc, contains_quotes=False))
-    elif style == 'code':
-        docstring = doc
-    else:
-        raise NotImplementedError('Only numpy and code (Docstring instance) style are supported at '
-                                  'the moment.')
-    # generate new docstring
-    new_doc = docstring.make_numpy(width=width, indent_level=indent_level, tabsize=tabsize,
-                                   is_raw=is_raw, include_quotes=False)
-    # compare to original
-    if style == 'numpy':
-        # FIXME: move to a better location
-        diff = list(difflib.context_diff(obj.__doc__.strip().split('\n'),
-                                         new_doc.strip().split('\n'),
-                                         fromfile='original-{0}'.format(obj),
-                                         tofile='generated-{0}'.format(obj)))
-        if len(diff) != 0:
-            print('WARNING: generated numpy docstring is different from the original')
-            print('\n'.join(diff))
+    if lazy is None:
+        lazy = _config['lazy']
+    if lazy and _defer(obj, docstring, style=style, width=width, indent_level=indent_level,
+                       tabsize=tabsize, is_raw=is_raw, verify=verify):
+        return obj
+    _resolve(obj)
+
+    new_doc, docstring_instance = _convert(obj, style=style, width=width,
+                                           indent_level=indent_level, tabsize=tabsize,
+                                           is_raw=is_raw, verify=verify)
     # overwrite
     obj.__doc__ = new_doc
 
     # store Docstring instance
-    # because attributes of property cannot be set
-    if not isinstance(obj, property):
-        obj._docstring = docstring
+    _store_docstring(obj, docstring_instance)
 
     return obj
 
 
+def _convert_members(obj, visited, style='numpy', width=100, indent_level=0, tabsize=4,
+                     is_raw=False, verify=None, include_self=True):
+    """Convert the docstrings of the object and of its members (and their members) once.
+
+    Parameters
+    ----------
+    obj : function, module, class
+        Object that contains a docstring.
+    visited : dict
+        Objects (by their ids) that will not be converted, e.g. because they have already been
+        converted.
+        Converted objects are added.
+    style : {'numpy', 'google', str}
+        Style of the docstring.
+    width : int
+        Maximum number of characters allowed in each width.
+    indent_level : int
+        Number of indents (tabs) that are needed for the docstring of the object.
+    tabsize : int
+        Number of spaces that corresponds to a tab.
+    is_raw : bool
+        True if the generated numpy documentation string is a raw string.
+    verify : {'off', 'cheap', 'diff', 'strict', None}
+        Verification of the generated docstring against the original (see `configure`).
+    include_self : bool
+        True if the docstring of the object is also converted.
+        Default is True.
+    """
+    # wrap self and the members (and their members) in the order they are found
+    # NOTE: objects are stored (not just their ids) so that the ids are not reused during the
+    #       traversal
+    queue = collections.deque([(obj, indent_level)])
+    visited[id(obj)] = obj
+    while queue:
+        current, current_indent_level = queue.popleft()
+        if current is not obj or include_self:
+            docstring(current, style=style, width=width, indent_level=current_indent_level,
+                      tabsize=tabsize, is_raw=is_raw, lazy=False, verify=verify)
+        # property
+        if isinstance(current, property):
+            continue
+        with _timed('extract', current):
+            members = extract_members(current, recursive=False)
+        for member in members.values():
+            if id(member) in visited:
+                _count('skipped')
+                continue
+            visited[id(member)] = member
+            queue.append((member, current_indent_level + 1))
+
+
 @kwarg_wrapper
-def docstring_recursive(obj, style='numpy', width=100, indent_level=0, tabsize=4, is_raw=False):
+def docstring_recursive(obj, style='numpy', width=100, indent_level=0, tabsize=4, is_raw=False,
+                        lazy=None, verify=None):
     """Wrapper for recursively converting docstrings within an object from one format to another.
 
     This wrapper recursively converts every member of the object (and their members) if their
-    source code is located in the same file.
+    source code is located in the same file. Each object is converted exactly once, even if it can
+    be reached through multiple members, with the indentation of the first (shallowest) member.
 
     Parameters
     ----------
@@ -127,11 +883,19 @@ def docstring_recursive(obj, style='numpy', width=100, indent_level=0, tabsize=4
         True if the generated numpy documentation string is a raw string. Docstring should be
         raw when backslash is used (e.g. math equations).
         Default is False.
+    lazy : {bool, None}
+        True if the conversion is deferred until the docstring is accessed (see `_defer`).
+        Default is the value set by `configure` (False, unless changed).
+    verify : {'off', 'cheap', 'diff', 'strict', None}
+        Verification of the generated docstring against the original (see `configure`).
+        Default is the value set by `configure` ('diff', unless changed).
 
     Raises
     ------
     TypeError
         If the obj's __doc__ is neither str nor Docstring instance.
+    ValueError
+        If `verify` is 'strict' and a generated docstring is different from the original.
     NotImplementedError
         If `style` is not 'numpy'.
 
@@ -141,32 +905,142 @@ def docstring_recursive(obj, style='numpy', width=100, indent_level=0, tabsize=4
         Wrapped object where the docstring is in the selected format and the corresponding Docstring
         instance is stored in `_docstring`.
     """
-    # wrap self
-    obj = docstring(obj, style=style, width=width, indent_level=indent_level, tabsize=tabsize,
-                    is_raw=is_raw)
-
-    # property
-    if isinstance(obj, property):
+    if lazy is None:
+        lazy = _config['lazy']
+    if lazy and _defer(obj, docstring_recursive, style=style, width=width,
+                       indent_level=indent_level, tabsize=tabsize, is_raw=is_raw, verify=verify):
         return obj
 
-    # wrap members
-    members = extract_members(obj, recursive=False)
-    for name in members.keys():
-        # apply wrapper docstring to member
-        inner_obj = docstring(getattr(obj, name), style=style, width=width,
-                              indent_level=indent_level+1, tabsize=tabsize, is_raw=is_raw)
-        # recurse for all members of member
-        inner_obj = docstring_recursive(inner_obj, style=style, width=width,
-                                        indent_level=indent_level+1, tabsize=tabsize, is_raw=is_raw)
-        # set new member
-        setattr(obj, name, inner_obj)
-
+    _convert_members(obj, {}, style=style, width=width, indent_level=indent_level,
+                     tabsize=tabsize, is_raw=is_raw, verify=verify)
     return obj
 
 
+# resolved docstrings and signatures of the members of the classes decorated by docstring_class
+# NOTE: {class: (options, {name of member: (member, Docstring instance, signature)})}
+_class_records = weakref.WeakKeyDictionary()
+
+
+def _member_docstring(member):
+    """Return the Docstring instance of a member of a class.
+
+    Parameters
+    ----------
+    member
+        Member of a class.
+
+    Returns
+    -------
+    docstring : {Docstring, None}
+        Docstring instance of the member.
+        None if the member does not have a Docstring instance.
+    """
+    docstring_instance = _load_docstring(member)
+    if docstring_instance is None and isinstance(member, property):
+        # property that has not been converted (or whose docstring has changed) is parsed once
+        with _timed('parse', member):
+            docstring_instance = Docstring(**parse_numpy(member.__doc__, contains_quotes=False))
+        _store_docstring(member, docstring_instance)
+    return docstring_instance
+
+
+def _parent_member_docstring(parent, parent_record, name):
+    """Return the Docstring instance of a member of a parent class.
+
+    Parameters
+    ----------
+    parent : class
+        Parent class.
+    parent_record : dict
+        Records of the members of the parent (see `_class_records`).
+    name : str
+        Name of the member.
+
+    Returns
+    -------
+    docstring : {Docstring, None}
+        Docstring instance of the member of the parent.
+        None if the parent does not have the member or if the member does not have a Docstring
+        instance.
+    """
+    try:
+        parent_member = getattr(parent, name)
+    except AttributeError:
+        return None
+    if name in parent_record and parent_record[name][0] is parent_member:
+        return parent_record[name][1]
+    _resolve(parent_member)
+    return _member_docstring(parent_member)
+
+
+def _member_table(obj, members, records):
+    """Return the Docstring instance of the tables of the members of a class.
+
+    Entries are collected by section in one pass and the Docstring instance is created once. An
+    abstract member is added to the concrete section (e.g. 'methods' instead of
+    'abstract methods') if the concrete section already has an entry.
+
+    Parameters
+    ----------
+    obj : class
+        Class whose members are tabulated.
+    members : dict
+        Members of the class (see `pydocstring.utils.extract_members`).
+    records : dict
+        Records of the members of the class (see `_class_records`).
+
+    Returns
+    -------
+    member_doc : Docstring
+        Docstring instance with the methods, properties, and attributes of the class.
+    """
+    sections = {}
+    for name, member in members.items():
+        if name not in records:
+            continue
+        _, doc, signature = records[name]
+
+        # fill contents
+        contents = {'name': name, 'signature': '', 'types': '', 'descs': []}
+        if 'returns' in doc.info:
+            contents['types'] = [i for entry in doc.info['returns'] for i in entry.types]
+        if 'summary' in doc.info:
+            contents['descs'] = doc.info['summary']
+
+        # get section name
+        #  methods
+        if inspect.isfunction(member):
+            try:
+                is_abstract = name in obj.__abstractmethods__
+            except AttributeError:
+                section = 'methods'
+            else:
+                section = 'abstract methods' if is_abstract else 'methods'
+            contents['signature'] = signature
+
+        #  properties
+        elif isinstance(member, property):
+            try:
+                is_abstract = name in obj.__abstractmethods__
+            except AttributeError:
+                section = 'properties'
+            else:
+                section = 'abstract properties' if is_abstract else 'properties'
+        # CHECK: this is a little redundant b/c extract_members does not contain attributes
+        elif hasattr(obj, name):
+            section = 'attributes'
+        else:
+            continue
+
+        if 'abstract' in section and section.replace('abstract ', '') in sections:
+            section = section.replace('abstract ', '')
+        sections.setdefault(section, []).append(contents)
+    return Docstring(**sections)
+
+
 @kwarg_wrapper
 def docstring_class(obj, style='numpy', width=100, indent_level=0, tabsize=4,
-                    is_raw=False):
+                    is_raw=False, lazy=None, verify=None):
     """Wrapper for inheriting docstrings from parents and methods.
 
     Parameters
@@ -185,12 +1059,20 @@ def docstring_class(obj, style='numpy', width=100, indent_level=0, tabsize=4,
         True if the generated numpy documentation string is a raw string. Docstring should be
         raw when backslash is used (e.g. math equations).
         Default is False.
+    lazy : {bool, None}
+        True if the conversion is deferred until the docstring is accessed (see `_defer`).
+        Default is the value set by `configure` (False, unless changed).
+    verify : {'off', 'cheap', 'diff', 'strict', None}
+        Verification of the generated docstring against the original (see `configure`).
+        Default is the value set by `configure` ('diff', unless changed).
 
     Raises
     ------
     TypeError
         If the `obj` is not a class.
         If the obj's __doc__ is neither str nor Docstring instance.
+    ValueError
+        If `verify` is 'strict' and a generated docstring is different from the original.
     NotImplementedError
         If `style` is not 'numpy'.
 
@@ -204,91 +1086,89 @@ def docstring_class(obj, style='numpy', width=100, indent_level=0, tabsize=4,
     if not inspect.isclass(obj):
         raise TypeError('This decorator can only decorate classes.')
 
+    if lazy is None:
+        lazy = _config['lazy']
+    if lazy and _defer(obj, docstring_class, style=style, width=width,
+                       indent_level=indent_level, tabsize=tabsize, is_raw=is_raw, verify=verify):
+        return obj
+
+    # parents must be decorated before their docstrings are inherited
+    for parent in obj.__bases__:
+        _resolve(parent)
+    cache = _get_cache(obj, style=style)
+    options = (style, width, indent_level, tabsize, is_raw)
+    parent_records = [_class_records[parent][1] if parent in _class_records
+                      and _class_records[parent][0] == options else {}
+                      for parent in obj.__bases__]
+
     # create docstrings
-    obj = docstring_recursive(obj, style=style, width=width, indent_level=indent_level,
-                              tabsize=tabsize, is_raw=is_raw)
+    # NOTE: members that are inherited (i.e. not overridden) from a parent that has been decorated
+    #       with the same options have already been converted
+    visited = {}
+    for parent_record in parent_records:
+        for name, (member, _, _) in parent_record.items():
+            if getattr(obj, name, None) is member:
+                visited[id(member)] = member
+    _resolve(obj)
+    # NOTE: docstring of the class is written once it is complete, so that the incomplete docstring
+    #       is never visible (e.g. to other threads while a deferred decoration is applied)
+    _, docstring_instance = _convert(obj, style=style, width=width, indent_level=indent_level,
+                                     tabsize=tabsize, is_raw=is_raw, verify=verify)
+    _convert_members(obj, visited, style=style, width=width, indent_level=indent_level,
+                     tabsize=tabsize, is_raw=is_raw, verify=verify, include_self=False)
 
     # inherit from parents
-    for name, member in extract_members(obj).items():
-        # FIXME: need to check if multiple parents have conflicting docstrings
-        for parent in obj.__bases__:
-            try:
-                parent_member = getattr(parent, name)
-                # the following is placed here rather than an else block b/c if parent does not have
-                # _docstring attribute, AtributeError is also raised
-                if isinstance(member, property):
-                    # yet another pain the ass caused by property
-                    member_docstring = Docstring(**parse_numpy(member.__doc__,
-                                                               contains_quotes=False))
-                    parent_docstring = Docstring(**parse_numpy(parent_member.__doc__,
-                                                               contains_quotes=False))
-                else:
-                    member_docstring = member._docstring
-                    parent_docstring = parent_member._docstring
-            except AttributeError as error:
-                continue
-            else:
-                member_docstring.inherit(parent_docstring, to_end=False)
-                if hasattr(member, '_docstring'):
-                    member._docstring = member_docstring
-                member.__doc__ = member_docstring.make_numpy(width=width,
-                                                             indent_level=indent_level+1,
-                                                             tabsize=tabsize,
-                                                             is_raw=is_raw,
-                                                             include_quotes=False)
-
-    # inherit docstring its contents
-    member_doc = Docstring()
-    for name, member in extract_members(obj).items():
-        # because we cannot change the attributes of a property, it needs to be parsed and then
-        # put back together...
-        if isinstance(member, property):
-            doc = Docstring(**parse_numpy(member.__doc__, contains_quotes=False))
+    # NOTE: the members that are inherited from (i.e. not overridden) a decorated parent reuse the
+    #       records of the parent
+    with _timed('extract', obj):
+        members = extract_members(obj)
+    records = {}
+    for name, member in members.items():
+        for parent_record in parent_records:
+            if name in parent_record and parent_record[name][0] is member:
+                records[name] = parent_record[name]
+                break
         else:
-            doc = member._docstring
-
-        # fill contents
-        contents = {'name': name, 'signature': '', 'types': '', 'descs': []}
-        if 'returns' in doc.info:
-            contents['types'] = [i for entry in doc.info['returns'] for i in entry.types]
-        if 'summary' in doc.info:
-            contents['descs'] = doc.info['summary']
+            member_docstring = _member_docstring(member)
+            if member_docstring is None:
+                continue
+            is_inherited = False
+            # FIXME: need to check if multiple parents have conflicting docstrings
+            for parent, parent_record in zip(obj.__bases__, parent_records):
+                parent_docstring = _parent_member_docstring(parent, parent_record, name)
+                if parent_docstring is None:
+                    continue
+                with _timed('inherit', member):
+                    member_docstring.inherit(parent_docstring, to_end=False)
+                is_inherited = True
+            if is_inherited:
+                with _timed('render', member):
+                    member.__doc__ = _render(member_docstring, cache, width=width,
+                                             indent_level=indent_level+1, tabsize=tabsize,
+                                             is_raw=is_raw)
+                _store_docstring(member, member_docstring)
 
-        # get section name
-        #  methods
-        if inspect.isfunction(member):
-            try:
-                is_abstract = name in obj.__abstractmethods__
-            except AttributeError:
-                section = 'methods'
-            else:
-                section = 'abstract methods' if is_abstract else 'methods'
+            signature = ''
             # FIXME: only python 3.5+ has inspect.signature, I think.
-            if hasattr(inspect, 'signature'):
-                contents['signature'] = str(inspect.signature(member))
-
-        #  properties
-        elif isinstance(member, property):
-            try:
-                is_abstract = name in obj.__abstractmethods__
-            except AttributeError:
-                section = 'properties'
-            else:
-                section = 'abstract properties' if is_abstract else 'properties'
-        # CHECK: this is a little redundant b/c extract_members does not contain attributes
-        elif hasattr(obj, name):
-            section = 'attributes'
+            if inspect.isfunction(member) and hasattr(inspect, 'signature'):
+                signature = str(inspect.signature(member))
+            records[name] = (member, member_docstring, signature)
+    _class_records[obj] = (options, records)
 
-        member_doc.inherit(Docstring(**{section: contents}), to_end=True)
-    obj._docstring.inherit(member_doc, to_end=False)
+    # inherit docstring its contents
+    with _timed('inherit', obj):
+        member_doc = _member_table(obj, members, records)
+        docstring_instance.inherit(member_doc, to_end=False)
 
-    for parent in obj.__bases__:
-        if not hasattr(parent, '_docstring'):
-            continue
-        # FIXME: need to check if multiple parents have conflicting docstrings
-        obj._docstring.inherit(parent._docstring, to_end=False)
+        for parent in obj.__bases__:
+            if not hasattr(parent, '_docstring'):
+                continue
+            # FIXME: need to check if multiple parents have conflicting docstrings
+            docstring_instance.inherit(parent._docstring, to_end=False)
 
-    obj.__doc__ = obj._docstring.make_numpy(width=width, indent_level=indent_level,
-                                            tabsize=tabsize, is_raw=is_raw, include_quotes=False)
+    _store_docstring(obj, docstring_instance)
+    with _timed('render', obj):
+        obj.__doc__ = _render(docstring_instance, cache, width=width, indent_level=indent_level,
+                              tabsize=tabsize, is_raw=is_raw)
 
     return obj
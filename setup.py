@@ -26,5 +26,7 @@ setup(name='pydocstring',
       extras_require={},
       package_data={},
       data_files=[],
-      entry_points={'console_scripts': ['pydocstring_to_instance=pydocstring.scripts.pydocstring_to_instance:main']},
+      entry_points={'console_scripts': ['pydocstring_to_instance=pydocstring.scripts.pydocstring_to_instance:main',
+                                        'pydocstring_daemon=pydocstring.daemon:main',
+                                        'pydocstring_client=pydocstring.daemon:client_main']},
       )